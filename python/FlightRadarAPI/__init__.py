@@ -14,30 +14,78 @@ https://www.flightradar24.com/terms-and-conditions
 __author__ = "Jean Loui Bernard Silva de Jesus"
 __version__ = "1.6.0"
 
-from .api import FlightRadar24API
-from .core import Countries
-from .entities import Airport, Entity, Flight
-from .errors import (
-    AirportNotFoundError,
-    CloudflareError,
-    DecompressionLimitError,
-    FlightRadarError,
-    LoginError,
-)
-from .flight_tracker_config import FlightTrackerConfig
-from .request import RetryPolicy
-
-__all__ = [
-    "FlightRadar24API",
-    "Countries",
-    "Airport",
-    "Entity",
-    "Flight",
-    "AirportNotFoundError",
-    "CloudflareError",
-    "DecompressionLimitError",
-    "FlightRadarError",
-    "LoginError",
-    "FlightTrackerConfig",
-    "RetryPolicy",
-]
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .api import FlightRadar24API
+    from .cassette import Cassette
+    from .circuit import CircuitBreaker
+    from .core import Countries
+    from .deadline import Deadline
+    from .entities import Airport, Entity, Flight, FlightList
+    from .errors import (
+        AirportNotFoundError,
+        CassetteMissError,
+        CircuitOpenError,
+        CloudflareError,
+        DeadlineExceededError,
+        DecompressionLimitError,
+        FlightRadarError,
+        LoginError,
+    )
+    from .flight_tracker_config import FlightTrackerConfig
+    from .negotiation import EncodingNegotiator
+    from .request import RetryBudget, RetryPolicy
+    from .scheduler import RequestScheduler
+    from .timing import RequestTiming
+    from .trail import Trail, simplify_trail, simplify_trails
+
+# Public names and the submodule each one lives in. Nothing is imported until a
+# name is first used (PEP 562), so "import FlightRadarAPI" does not pay for
+# curl_cffi, the parsers and the rest of the client up front.
+_EXPORTS = {
+    "FlightRadar24API": ".api",
+    "Cassette": ".cassette",
+    "CircuitBreaker": ".circuit",
+    "Countries": ".core",
+    "Deadline": ".deadline",
+    "Airport": ".entities",
+    "Entity": ".entities",
+    "Flight": ".entities",
+    "FlightList": ".entities",
+    "AirportNotFoundError": ".errors",
+    "CassetteMissError": ".errors",
+    "CircuitOpenError": ".errors",
+    "CloudflareError": ".errors",
+    "DeadlineExceededError": ".errors",
+    "DecompressionLimitError": ".errors",
+    "FlightRadarError": ".errors",
+    "LoginError": ".errors",
+    "FlightTrackerConfig": ".flight_tracker_config",
+    "EncodingNegotiator": ".negotiation",
+    "RetryBudget": ".request",
+    "RetryPolicy": ".request",
+    "RequestScheduler": ".scheduler",
+    "RequestTiming": ".timing",
+    "Trail": ".trail",
+    "simplify_trail": ".trail",
+    "simplify_trails": ".trail",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+
+    # Cache it, so later lookups never come back here.
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -1,18 +1,34 @@
 # -*- coding: utf-8 -*-
 
+import contextlib
+import contextvars
 import dataclasses
 import math
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from typing import Any, ContextManager, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from urllib.parse import quote
 
+from .cassette import Cassette
 from .core import Core, Countries
 from .entities.airport import Airport
-from .entities.flight import Flight
-from .errors import AirportNotFoundError, LoginError
+from .entities.flight import Flight, FlightList
+from .circuit import CircuitBreaker
+from .deadline import Deadline
+from .errors import AirportNotFoundError, DeadlineExceededError, LoginError
 from .flight_tracker_config import FlightTrackerConfig
-from .parsers import country_to_slug, parse_airlines_html, parse_airports_json
+from .negotiation import EncodingNegotiator
+from .parsers import (
+    AirportFeedParser,
+    FlightFeedParser,
+    country_to_slug,
+    iter_airports_json,
+    parse_airlines_html,
+    parse_airports_json,
+)
+from .profiling import Profiler, profiled
 from .request import APIClient, RetryPolicy
+from .scheduler import BACKGROUND, RequestScheduler, current_priority, prioritised
+from .timing import DETAILS_SKIPPED, FANOUT_QUEUE_DEPTH, FEED_REROLL, EventHook, RequestHook
 
 # Some FR24 live-feed backends answer 200 with a well-formed envelope but no
 # flight entries -- indistinguishable from a legitimately empty result. The
@@ -21,6 +37,10 @@ from .request import APIClient, RetryPolicy
 FEED_STICKY_COOKIES = ("AWSALB", "AWSALBCORS")
 FEED_EMPTY_RETRIES = 4
 
+# Share of a get_flights(details=True) deadline the feed, its retries and its
+# re-rolls may take: the rest is kept for the details.
+FEED_DEADLINE_SHARE = 0.5
+
 
 class FlightRadar24API:
     """
@@ -35,6 +55,14 @@ class FlightRadar24API:
         max_workers: int = 8,
         impersonate: Optional[str] = None,
         retry: Optional[RetryPolicy] = None,
+        cassette: Optional[Cassette] = None,
+        encoding_negotiator: Optional[EncodingNegotiator] = None,
+        stream_parse: bool = False,
+        json_backend: Optional[str] = None,
+        lean_responses: bool = False,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        base_urls: Optional[Dict[str, str]] = None,
     ):
         """
         Constructor of the FlightRadar24API class.
@@ -48,25 +76,102 @@ class FlightRadar24API:
             See ``FlightRadarAPI.request.DEFAULT_IMPERSONATE`` for the current default.
         :param retry: Optional :class:`RetryPolicy` applied to transient failures
             (``CloudflareError`` and curl_cffi network errors). Defaults to no retry.
-        """
+        :param cassette: Optional :class:`Cassette` to record every response to,
+            or to replay them from instead of the network.
+        :param encoding_negotiator: Optional :class:`EncodingNegotiator` choosing the
+            Accept-Encoding of each request by the measured cost of each encoding.
+        :param stream_parse: Parse the flights and airports feeds as they are decoded,
+            building each Flight or Airport as soon as its row arrives, so the decoded
+            body never exists in full.
+        :param json_backend: Library that parses JSON responses: "orjson", "msgspec"
+            or "json". Defaults to the fastest one installed; falls back to json
+            for a document the faster one rejects.
+        :param lean_responses: Have get_flights(), get_flight_details() and get_airports()
+            keep nothing of a response but its result once parsed, so a long-running
+            poller holds the data it uses rather than the bodies it arrived in.
+        :param circuit_breaker: Optional :class:`CircuitBreaker` failing requests to a host
+            that keeps failing at once. get_flights(details=True) then returns the flights
+            it could not enrich as they are, rather than waiting on each one.
+        :param scheduler: Optional :class:`RequestScheduler` bounding the requests running
+            at once and starting the most urgent first. See priority().
+        :param base_urls: New values for some Core *_base_url attributes, by attribute name,
+            for this instance alone, e.g. to point it at a local stand-in server.
+            See Core.with_base_urls().
+        """
+        self.__core = Core.with_base_urls(**base_urls) if base_urls else Core
         self.__flight_tracker_config = FlightTrackerConfig()
         self.__login_data: Optional[Dict] = None
-        client_kwargs: Dict[str, Any] = {"retry": retry}
+        client_kwargs: Dict[str, Any] = {
+            "retry": retry, "cassette": cassette, "encoding_negotiator": encoding_negotiator,
+            "json_backend": json_backend, "circuit_breaker": circuit_breaker,
+            "scheduler": scheduler,
+        }
         if impersonate:
             client_kwargs["impersonate"] = impersonate
         self.__client = APIClient(**client_kwargs)
+        self.__breaker = circuit_breaker
 
         self.timeout: int = timeout
         self.max_workers: int = max_workers
+        self.stream_parse: bool = stream_parse
+        self.lean_responses: bool = lean_responses
+
+        #: Samples calls for profiling while set; see enable_profiling().
+        self.profiler: Optional[Profiler] = None
 
         if user is not None and password is not None:
             self.login(user, password)
 
+    def add_request_hook(self, hook: RequestHook) -> None:
+        """
+        Call a function with the RequestTiming of every request, once it finishes.
+
+        Failed requests are reported too, with the name of their error. A hook
+        runs on the thread that made the request, so it should be quick.
+
+        :param hook: Function taking a RequestTiming
+        """
+        self.__client.add_hook(hook)
+
+    def add_event_hook(self, hook: EventHook) -> None:
+        """
+        Call a function with the name and value of every client event.
+
+        Events are FEED_REROLL, with value 1, each time get_flights() drops
+        a backend that served an empty feed, and FANOUT_QUEUE_DEPTH, with the
+        number of detail requests still pending, as get_flights(details=True)
+        submits and completes them. Both are defined in FlightRadarAPI.timing.
+
+        :param hook: Function taking the event name and its value
+        """
+        self.__client.add_event_hook(hook)
+
+    def disable_profiling(self) -> None:
+        """
+        Stop profiling calls. Profiles already written are kept.
+        """
+        self.profiler = None
+
+    def enable_profiling(self, directory: str, **options: Any) -> Profiler:
+        """
+        Start profiling a sample of the calls to some methods, and return the Profiler.
+
+        Each sampled call is run under cProfile, and optionally tracemalloc,
+        and its stats are written to ``directory``. Can be switched on and off
+        at any time; see FlightRadarAPI.profiling.Profiler for the options:
+        sample_rate, methods, memory, max_files and seed.
+
+        :param directory: Where the profiles are written
+        """
+        self.profiler = Profiler(directory, **options)
+        return self.profiler
+
+    @profiled
     def get_airlines(self) -> List[Dict]:
         """
         Return a list with all airlines.
         """
-        response = self.__client.request(Core.airlines_data_url, headers=Core.html_headers, timeout=self.timeout)
+        response = self.__client.request(self.__core.airlines_data_url, headers=self.__core.html_headers, timeout=self.timeout)
         return parse_airlines_html(response.get_bytes_content())
 
     def get_airline_logo(self, iata: str, icao: str) -> Optional[Tuple[bytes, str]]:
@@ -75,11 +180,11 @@ class FlightRadar24API:
         """
         iata, icao = iata.upper(), icao.upper()
 
-        first_logo_url = Core.airline_logo_url.format(iata, icao)
+        first_logo_url = self.__core.airline_logo_url.format(iata, icao)
 
         # Try to get the image by the first URL option.
         response = self.__client.request(
-            first_logo_url, headers=Core.image_headers,
+            first_logo_url, headers=self.__core.image_headers,
             allowed_error_codes=[403, 404], timeout=self.timeout,
         )
         status_code = response.get_status_code()
@@ -88,10 +193,10 @@ class FlightRadar24API:
             return response.get_bytes_content(), first_logo_url.split(".")[-1]
 
         # Get the image by the second airline logo URL.
-        second_logo_url = Core.alternative_airline_logo_url.format(icao)
+        second_logo_url = self.__core.alternative_airline_logo_url.format(icao)
 
         response = self.__client.request(
-            second_logo_url, headers=Core.image_headers,
+            second_logo_url, headers=self.__core.image_headers,
             allowed_error_codes=[403, 404], timeout=self.timeout,
         )
         status_code = response.get_status_code()
@@ -101,6 +206,7 @@ class FlightRadar24API:
 
         return None
 
+    @profiled
     def get_airport(self, code: str, *, details: bool = False) -> Airport:
         """
         Return basic information about a specific airport.
@@ -117,8 +223,8 @@ class FlightRadar24API:
             return airport
 
         response = self.__client.request(
-            Core.airport_data_url.format(code),
-            headers=Core.json_headers, timeout=self.timeout,
+            self.__core.airport_data_url.format(code),
+            headers=self.__core.json_headers, timeout=self.timeout,
         )
         content = response.get_json_content()
 
@@ -127,6 +233,7 @@ class FlightRadar24API:
 
         return Airport(info=content["details"])
 
+    @profiled
     def get_airport_details(self, code: str, flight_limit: int = 100, page: int = 1) -> Dict:
         """
         Return the airport details from FlightRadar24.
@@ -150,9 +257,9 @@ class FlightRadar24API:
 
         # Request details from the FlightRadar24.
         response = self.__client.request(
-            Core.api_airport_data_url,
+            self.__core.api_airport_data_url,
             params=request_params,
-            headers=Core.json_headers,
+            headers=self.__core.json_headers,
             allowed_error_codes=[400],
             timeout=self.timeout,
         )
@@ -182,11 +289,12 @@ class FlightRadar24API:
         Return airport disruptions.
         """
         response = self.__client.request(
-            Core.airport_disruptions_url,
-            headers=Core.json_headers, timeout=self.timeout,
+            self.__core.airport_disruptions_url,
+            headers=self.__core.json_headers, timeout=self.timeout,
         )
         return response.get_json_content()
 
+    @profiled
     def get_airports(
         self, countries: Optional[Union[Iterable[Union[Countries, str]], Countries, str]] = None,
     ) -> List[Airport]:
@@ -196,25 +304,59 @@ class FlightRadar24API:
         :param countries: Country names from the Countries enum, or their slug strings,
             as any iterable or a single value. Every country when omitted.
         """
-        wanted: Optional[List[Union[Countries, str]]] = None
-
-        if isinstance(countries, (Countries, str)):
-            wanted = [countries]
-        elif countries is not None:
-            # Materialised: a generator has no len() and is consumed once.
-            wanted = list(countries)
+        wanted = self.__wanted_countries(countries)
 
         if wanted is not None and len(wanted) == 0:
             return []
 
+        if self.stream_parse:
+            response = self.__client.request(
+                self.__core.airports_json_url, headers=self.__core.json_headers, timeout=self.timeout,
+                body_parser=lambda: AirportFeedParser(wanted), lean=self.lean_responses,
+            )
+            return response.get_parsed()
+
         response = self.__client.request(
-            Core.airports_json_url, headers=Core.json_headers, timeout=self.timeout,
+            self.__core.airports_json_url, headers=self.__core.json_headers, timeout=self.timeout, lean=self.lean_responses,
         )
 
         # get_content(), not get_json_content(): an html body reaches the parser's
         # guard; a malformed JSON body still raises. The parser slugifies `wanted`.
         return parse_airports_json(response.get_content(), wanted)
 
+    def iter_airports(
+        self, countries: Optional[Union[Iterable[Union[Countries, str]], Countries, str]] = None,
+    ) -> Iterator[Airport]:
+        """
+        Yield all airports, optionally narrowed to some countries, as the payload is decoded.
+
+        Unlike get_airports(), the payload is never decoded whole, so peak memory
+        stays near the size of the body. A body found malformed part-way ends the
+        iteration with a warning rather than raising.
+
+        :param countries: Country names from the Countries enum, or their slug strings,
+            as any iterable or a single value. Every country when omitted.
+        """
+        wanted = self.__wanted_countries(countries)
+
+        if wanted is not None and len(wanted) == 0:
+            return
+
+        response = self.__client.request(
+            self.__core.airports_json_url, headers=self.__core.json_headers, timeout=self.timeout,
+        )
+        yield from iter_airports_json(response.get_body(), wanted)
+
+    @staticmethod
+    def __wanted_countries(
+        countries: Optional[Union[Iterable[Union[Countries, str]], Countries, str]],
+    ) -> Optional[List[Union[Countries, str]]]:
+        if isinstance(countries, (Countries, str)):
+            return [countries]
+
+        # Materialised: a generator has no len() and is consumed once.
+        return list(countries) if countries is not None else None
+
     def get_bookmarks(self) -> Dict:
         """
         Get the bookmarks from the FlightRadar24 account.
@@ -222,9 +364,9 @@ class FlightRadar24API:
         if self.__login_data is None:
             raise LoginError("You must log in to your account.")
 
-        headers = {**Core.json_headers, "accesstoken": self.get_login_data()["accessToken"]}
+        headers = {**self.__core.json_headers, "accesstoken": self.get_login_data()["accessToken"]}
 
-        response = self.__client.request(Core.bookmarks_url, headers=headers, timeout=self.timeout)
+        response = self.__client.request(self.__core.bookmarks_url, headers=headers, timeout=self.timeout)
         return response.get_json_content()
 
     def get_bounds(self, zone: Dict[str, float]) -> str:
@@ -310,8 +452,8 @@ class FlightRadar24API:
         if not slug:
             return None
 
-        flag_url = Core.country_flag_url.format(slug)
-        headers = Core.image_headers.copy()
+        flag_url = self.__core.country_flag_url.format(slug)
+        headers = self.__core.image_headers.copy()
 
         headers.pop("origin", None)  # Does not work for this request.
 
@@ -326,17 +468,24 @@ class FlightRadar24API:
 
         return None
 
-    def get_flight_details(self, flight: Flight) -> Dict[Any, Any]:
+    @profiled
+    def get_flight_details(
+        self, flight: Flight, deadline: Optional[Union[float, Deadline]] = None
+    ) -> Dict[Any, Any]:
         """
         Return the flight details from Data Live FlightRadar24.
 
         :param flight: A Flight instance
+        :param deadline: Seconds, or a Deadline, the request and its retries must be done in
         """
-        response = self.__client.request_standalone(
-            Core.flight_data_url.format(flight.id), headers=Core.json_headers, timeout=self.timeout,
+        template = self.__client.template(self.__core.flight_data_url, self.__core.json_headers)
+        response = self.__client.send(
+            template, flight.id, standalone=True, timeout=self.timeout, lean=self.lean_responses,
+            deadline=deadline,
         )
         return response.get_json_content()
 
+    @profiled
     def get_flights(
         self,
         airline: Optional[str] = None,
@@ -344,8 +493,10 @@ class FlightRadar24API:
         registration: Optional[str] = None,
         aircraft_type: Optional[str] = None,
         *,
-        details: bool = False
-    ) -> List[Flight]:
+        details: bool = False,
+        deadline: Optional[Union[float, Deadline]] = None,
+        feed_share: float = FEED_DEADLINE_SHARE
+    ) -> FlightList:
         """
         Return a list of flights. See more options at set_flight_tracker_config() method.
 
@@ -353,9 +504,25 @@ class FlightRadar24API:
         :param bounds: Coordinates (y1, y2 ,x1, x2). Ex: "75.78,-75.78,-427.56,427.56"
         :param registration: Aircraft registration
         :param aircraft_type: Aircraft model code. Ex: "B737"
-        :param details: If True, it returns flights with detailed information
-        """
-        request_params = dataclasses.asdict(self.__flight_tracker_config)
+        :param details: If True, it returns flights with detailed information. Flights whose
+            details the circuit breaker cut off come back without them.
+        :param deadline: Seconds, or a Deadline, the whole call must be done in: the feed
+            request, its retries and the details. Once it is too close for another request,
+            the flights gathered so far are returned, with their "complete" attribute False.
+            Raises DeadlineExceededError if not even the feed could be fetched.
+        :param feed_share: With details, the share of the deadline the feed may take, its
+            retries and re-rolls included, so a slow feed leaves the details the rest. A feed
+            that needs more raises DeadlineExceededError, even if the whole deadline had room.
+        """
+        deadline = Deadline.of(deadline)
+        feed_deadline = deadline.sub(feed_share) if deadline is not None and details else deadline
+        complete = True
+
+        # The config's parameters are encoded once, and again only once it changes.
+        template = self.__client.template(
+            self.__core.real_time_flight_tracker_data_url, self.__core.json_headers, vars(self.__flight_tracker_config),
+        )
+        request_params: Dict[str, Any] = {}
 
         if self.is_logged_in():
             request_params["enc"] = self.__client.get_cookie("_frPl")
@@ -368,37 +535,84 @@ class FlightRadar24API:
 
         flights: List[Flight] = list()
 
-        for _ in range(FEED_EMPTY_RETRIES + 1):
+        for attempt in range(FEED_EMPTY_RETRIES + 1):
+            if attempt and feed_deadline is not None and not feed_deadline.allows():
+                # No time to re-roll: the feed came back empty, and may not be.
+                complete = False
+                break
+
             # Get all flights from Data Live FlightRadar24.
-            response = self.__client.request(
-                Core.real_time_flight_tracker_data_url,
+            response = self.__client.send(
+                template,
                 params=request_params,
-                headers=Core.json_headers,
                 timeout=self.timeout,
+                body_parser=FlightFeedParser if self.stream_parse else None,
+                lean=self.lean_responses,
+                deadline=feed_deadline,
             )
-            content = response.get_json_content()
 
-            # Get flights only.
-            flights = [
-                Flight(flight_id, flight_info)
-                for flight_id, flight_info in content.items()
-                if flight_id[0].isnumeric()
-            ]
+            if self.stream_parse:
+                feed = response.get_parsed()
+                flights, full_count = feed.flights, feed.members.get("full_count")
+            else:
+                content = response.get_json_content()
+
+                # Get flights only.
+                flights = [
+                    Flight(flight_id, flight_info)
+                    for flight_id, flight_info in content.items()
+                    if flight_id[0].isnumeric()
+                ]
+                full_count = content.get("full_count")
 
             # "full_count": 0 means the feed really has nothing to report.
-            if flights or not content.get("full_count"):
+            if flights or not full_count:
                 break
 
             for cookie_name in FEED_STICKY_COOKIES:
                 self.__client.delete_cookie(cookie_name)
 
+            self.__client.emit(FEED_REROLL)
+
+        skipped = 0
+
         if details:
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                futures = {executor.submit(self.get_flight_details, f): f for f in flights}
+            # Bulk work: the details wait behind other requests, unless the caller said otherwise.
+            priority = contextlib.nullcontext() if current_priority() else prioritised(BACKGROUND)
+
+            # The details get the rest of the deadline, whatever the feed left of its share.
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor, priority:
+                # Each task runs in a copy of this context, to make its request at its priority.
+                futures = {
+                    executor.submit(contextvars.copy_context().run, self.get_flight_details, f, deadline): f
+                    for f in flights
+                }
+                pending = len(futures)
+                self.__client.emit(FANOUT_QUEUE_DEPTH, pending)
+
                 for future in as_completed(futures):
-                    futures[future].set_flight_details(future.result())
+                    try:
+                        futures[future].set_flight_details(future.result())
+                    except DeadlineExceededError:
+                        # Out of time: the flight comes back as the feed had it.
+                        skipped += 1
+                    except Exception as err:
+                        # The breaker is there to weather a failing host: the flight
+                        # comes back as the feed had it, whether the host failed this
+                        # request or was already cut off.
+                        if self.__breaker is None or not self.__breaker.cuts_off(err):
+                            raise
+
+                        skipped += 1
+
+                    pending -= 1
+                    self.__client.emit(FANOUT_QUEUE_DEPTH, pending)
+
+                if skipped:
+                    complete = False
+                    self.__client.emit(DETAILS_SKIPPED, skipped)
 
-        return flights
+        return FlightList(flights, complete=complete, missing_details=skipped)
 
     def get_flight_tracker_config(self) -> FlightTrackerConfig:
         """
@@ -422,10 +636,10 @@ class FlightRadar24API:
         if file_type not in ["csv", "kml"]:
             raise ValueError(f"File type '{file_type}' is not supported. Only CSV and KML are supported.")
 
-        headers = {**Core.json_headers, "accesstoken": self.get_login_data()["accessToken"]}
+        headers = {**self.__core.json_headers, "accesstoken": self.get_login_data()["accessToken"]}
 
         response = self.__client.request(
-            Core.historical_data_url.format(flight.id, file_type, timestamp),
+            self.__core.historical_data_url.format(flight.id, file_type, timestamp),
             headers=headers,
             timeout=self.timeout,
         )
@@ -445,16 +659,27 @@ class FlightRadar24API:
         """
         Return the most tracked data.
         """
-        response = self.__client.request(Core.most_tracked_url, headers=Core.json_headers, timeout=self.timeout)
+        response = self.__client.request(self.__core.most_tracked_url, headers=self.__core.json_headers, timeout=self.timeout)
         return response.get_json_content()
 
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the requests made so far, aggregated by endpoint.
+
+        Each endpoint maps to its request, error and retry counts, the counts
+        by status code, the bytes received and decoded, and the sum, mean and
+        maximum of each phase in seconds: name lookup, connect, TLS handshake,
+        time to first byte, total transfer, decoding and JSON parsing.
+        """
+        return self.__client.get_stats()
+
     def get_volcanic_eruptions(self) -> Dict:
         """
         Return boundaries of volcanic eruptions and ash clouds impacting aviation.
         """
         response = self.__client.request(
-            Core.volcanic_eruption_data_url,
-            headers=Core.json_headers, timeout=self.timeout,
+            self.__core.volcanic_eruption_data_url,
+            headers=self.__core.json_headers, timeout=self.timeout,
         )
         return response.get_json_content()
 
@@ -462,7 +687,7 @@ class FlightRadar24API:
         """
         Return all major zones on the globe.
         """
-        zones = Core.static_zones.copy()
+        zones = self.__core.static_zones.copy()
         zones.pop("version", None)
         return zones
 
@@ -471,8 +696,8 @@ class FlightRadar24API:
         Return the search result.
         """
         response = self.__client.request(
-            Core.search_data_url.format(quote(query), limit),
-            headers=Core.json_headers, timeout=self.timeout,
+            self.__core.search_data_url.format(quote(query), limit),
+            headers=self.__core.json_headers, timeout=self.timeout,
         )
         content = response.get_json_content()
         results = content.get("results", [])
@@ -509,8 +734,8 @@ class FlightRadar24API:
         }
 
         response = self.__client.request(
-            Core.user_login_url,
-            headers=Core.json_headers, data=data, timeout=self.timeout,
+            self.__core.user_login_url,
+            headers=self.__core.json_headers, data=data, timeout=self.timeout,
         )
         status_code = response.get_status_code()
         content = response.get_json_content()
@@ -533,11 +758,48 @@ class FlightRadar24API:
 
         self.__login_data = None
         try:
-            response = self.__client.request(Core.user_logout_url, headers=Core.json_headers, timeout=self.timeout)
+            response = self.__client.request(self.__core.user_logout_url, headers=self.__core.json_headers, timeout=self.timeout)
             return 200 <= response.get_status_code() < 300
         finally:
             self.__client.clear_cookies()
 
+    def priority(self, priority: str) -> ContextManager[None]:
+        """
+        Return a context manager making the requests of its block at ``priority``.
+
+        Without a scheduler, it changes nothing. With one, requests are started
+        "interactive" first, then "normal", the default, then "background". The
+        details of get_flights(details=True) are "background" unless made in
+        such a block.
+
+        Ex: ``with api.priority("interactive"): api.search("DAL")``
+
+        :param priority: "interactive", "normal" or "background"
+        """
+        return prioritised(priority)
+
+    def remove_event_hook(self, hook: EventHook) -> None:
+        """
+        Stop calling a function added with add_event_hook().
+
+        :param hook: The function
+        """
+        self.__client.remove_event_hook(hook)
+
+    def remove_request_hook(self, hook: RequestHook) -> None:
+        """
+        Stop calling a function added with add_request_hook().
+
+        :param hook: The function
+        """
+        self.__client.remove_hook(hook)
+
+    def reset_stats(self) -> None:
+        """
+        Forget the requests counted by get_stats().
+        """
+        self.__client.reset_stats()
+
     def set_flight_tracker_config(
         self,
         flight_tracker_config: Optional[FlightTrackerConfig] = None,
@@ -561,3 +823,34 @@ class FlightRadar24API:
                 raise TypeError(f"Value must be a number. Got '{value}' for key '{key}'")
 
             setattr(self.__flight_tracker_config, key, value)
+
+    def stop_keep_alive(self) -> None:
+        """
+        Stop the keep-alive pings started by warm_up().
+        """
+        self.__client.stop_keep_alive()
+
+    def warm_up(self, sessions: Optional[int] = None, keep_alive: Optional[float] = None) -> Dict[str, float]:
+        """
+        Open the connections the first calls will need, so they run as fast as the ones after them.
+
+        Connects to data-cloud and www on this thread, for get_flights(), search()
+        and the rest, and to data-live on ``sessions`` sessions, for
+        get_flight_details() and the details of get_flights(details=True).
+        Return the seconds each host took; one that fails is left out.
+
+        :param sessions: Connections to data-live, max_workers by default
+        :param keep_alive: If set, ping the data-live connections every that many
+            seconds, so they stay open while idle. See stop_keep_alive().
+        """
+        warmed = self.__client.warm_up(
+            (self.__core.data_cloud_base_url + "/", self.__core.flightradar_base_url + "/"),
+            standalone_urls=(self.__core.data_live_base_url + "/",),
+            sessions=self.max_workers if sessions is None else sessions,
+            timeout=self.timeout,
+        )
+
+        if keep_alive is not None:
+            self.__client.start_keep_alive(keep_alive)
+
+        return warmed
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from curl_cffi.requests import Headers, Response
+
+from .errors import CassetteMissError
+
+CASSETTE_VERSION = 1
+
+RECORD = "record"
+REPLAY = "replay"
+
+_Key = Tuple[str, str, Optional[str]]
+
+
+def _data_digest(data: Optional[Dict]) -> Optional[str]:
+    """
+    Identify a request body without storing it: login posts the password.
+    """
+    if data is None:
+        return None
+
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class Cassette:
+    """
+    Recorded HTTP exchanges, for running the request pipeline without a network.
+
+    In record mode, every response an APIClient receives is stored as it came
+    off the wire: status, headers and the body still encoded. In replay mode,
+    those responses are served instead of performing the requests, and go
+    through the same decoding, size limits, Cloudflare check and status check
+    as live ones, so a benchmark or a profile of a replay measures the whole
+    pipeline on a fixed input.
+
+    Requests are matched by method, full URL and a digest of the POST data.
+    Exchanges recorded for the same request are replayed in order and the last
+    one repeats, so a recorded retry sequence replays as it happened. Cookies
+    set by a replayed response are put in the client's jar, as live ones are.
+
+    A recording holds the response headers in full, Set-Cookie included, so
+    treat cassettes of logged-in sessions as credentials.
+
+    :param path: JSON file to load the exchanges from in replay mode, and the default target of save()
+    :param mode: "record" or "replay"
+    :param realtime: In replay mode, take as long as the recorded response took
+    """
+
+    def __init__(self, path: Optional[str] = None, mode: str = REPLAY, realtime: bool = False):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"mode must be {RECORD!r} or {REPLAY!r}, not {mode!r}.")
+
+        self.path = path
+        self.mode = mode
+        self.realtime = realtime
+
+        #: Exchanges in the order they were recorded or loaded.
+        self.exchanges: List[Dict[str, Any]] = []
+
+        self.__pending: Dict[_Key, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self.__lock = threading.Lock()
+
+        if mode == REPLAY and path is not None:
+            self.load(path)
+
+    def __len__(self) -> int:
+        return len(self.exchanges)
+
+    @property
+    def recording(self) -> bool:
+        """
+        Whether responses are stored rather than served.
+        """
+        return self.mode == RECORD
+
+    def load(self, path: str) -> None:
+        """
+        Add the exchanges of a cassette file.
+
+        :param path: JSON file written by save()
+        """
+        with open(path, encoding="utf-8") as f:
+            document = json.load(f)
+
+        if document.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version: {document.get('version')!r}.")
+
+        with self.__lock:
+            for exchange in document["exchanges"]:
+                self.exchanges.append(exchange)
+                self.__pending[self.__key_of(exchange)].append(exchange)
+
+    def save(self, path: Optional[str] = None) -> None:
+        """
+        Write the exchanges to a JSON file.
+
+        :param path: Target file. Defaults to the path the cassette was created with
+        """
+        path = path or self.path
+
+        if path is None:
+            raise ValueError("No path to save the cassette to.")
+
+        with self.__lock:
+            document = {"version": CASSETTE_VERSION, "exchanges": list(self.exchanges)}
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=1)
+
+    def record(self, method: str, url: str, data: Optional[Dict], response: Response, elapsed: float) -> None:
+        """
+        Store a response as it arrived, before anything decoded it.
+
+        :param method: "GET" or "POST"
+        :param url: Full URL of the request, query string included
+        :param data: POST data of the request
+        :param response: The response, with its body still as received
+        :param elapsed: Seconds the request took
+        """
+        exchange = {
+            "method": method,
+            "url": url,
+            "data_sha256": _data_digest(data),
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": [[name, value] for name, value in response.headers.multi_items()],
+            "body": base64.b64encode(response.content).decode("ascii"),
+            "elapsed": round(elapsed, 6),
+        }
+
+        with self.__lock:
+            self.exchanges.append(exchange)
+            self.__pending[self.__key_of(exchange)].append(exchange)
+
+    def play(self, method: str, url: str, data: Optional[Dict]) -> Response:
+        """
+        Return the recorded response to a request.
+
+        Raises CassetteMissError when nothing was recorded for it.
+
+        :param method: "GET" or "POST"
+        :param url: Full URL of the request, query string included
+        :param data: POST data of the request
+        """
+        key = (method, url, _data_digest(data))
+
+        with self.__lock:
+            pending = self.__pending.get(key)
+
+            if not pending:
+                raise CassetteMissError(f"No recorded response for {method} {url}.")
+
+            # The last exchange stays, so it answers every later repeat.
+            exchange = pending.popleft() if len(pending) > 1 else pending[0]
+
+        if self.realtime and exchange.get("elapsed"):
+            time.sleep(exchange["elapsed"])
+
+        response = Response()
+        response.url = url
+        response.status_code = exchange["status"]
+        response.reason = exchange.get("reason") or ""
+        response.ok = 200 <= response.status_code < 400
+        response.headers = Headers([tuple(header) for header in exchange["headers"]])
+        response.content = base64.b64decode(exchange["body"])
+        return response
+
+    @staticmethod
+    def __key_of(exchange: Dict[str, Any]) -> _Key:
+        return exchange["method"], exchange["url"], exchange.get("data_sha256")
+
+
+def set_response_cookies(cookies: Any, response: Response) -> None:
+    """
+    Put the cookies a replayed response sets into a session's jar.
+
+    Only the name and value are honoured: attributes are dropped, and the
+    cookie is scoped to the host the request went to.
+
+    :param cookies: The session's cookie jar
+    :param response: A response built by Cassette.play()
+    """
+    host = urlsplit(response.url).hostname or ""
+
+    for header in response.headers.get_list("set-cookie"):
+        name, _, value = (header or "").split(";", 1)[0].partition("=")
+
+        if name.strip():
+            cookies.set(name.strip(), value.strip(), domain=host)
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from .errors import CircuitOpenError
+from .timing import endpoint_name
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Failures that say a host is in trouble; a 4xx or a Cloudflare block says nothing of its health.
+DEFAULT_TRIP_ON = ("timeout", "connection", "server")
+
+# The failure rate is measured over this many steps of the window.
+_BUCKETS = 10
+
+
+class _Circuit:
+    def __init__(self) -> None:
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probes = 0
+        self.probe_successes = 0
+        self.buckets: List[List[float]] = []  # [start, requests, failures]
+
+
+class CircuitBreaker:
+    """
+    Fails requests fast while their host, or endpoint, keeps failing.
+
+    Each host starts closed: requests go through, and their outcomes are
+    counted over the last ``window`` seconds. Once at least ``min_requests``
+    were made and ``failure_rate`` of them failed, it opens, and requests
+    raise CircuitOpenError at once instead of waiting out their timeout. After
+    ``open_for`` seconds it turns half-open: ``probes`` requests are let
+    through, and closes again if they all succeed, or opens again if one fails.
+
+    Only failures of a class in ``trip_on`` count against a host (see
+    request.classify_error()); anything else that comes back, a 404 included,
+    shows it is answering.
+
+    Give one to APIClient (or FlightRadar24API) ``circuit_breaker``.
+
+    :param failure_rate: Share of failed requests that opens the circuit, from 0 to 1
+    :param min_requests: Requests in the window before the rate is trusted
+    :param window: Seconds over which the failure rate is measured
+    :param open_for: Seconds the circuit stays open before probing the host
+    :param probes: Requests let through while half-open
+    :param trip_on: Classes of failure that count against a host
+    :param per: "host" for a circuit per host name, or "endpoint" for one per Core URL
+    """
+
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        min_requests: int = 10,
+        window: float = 30.0,
+        open_for: float = 30.0,
+        probes: int = 1,
+        *,
+        trip_on: Iterable[str] = DEFAULT_TRIP_ON,
+        per: str = "host",
+    ):
+        if not 0.0 < failure_rate <= 1.0:
+            raise ValueError("failure_rate must be in (0, 1].")
+
+        if min_requests < 1 or probes < 1 or window <= 0 or open_for < 0:
+            raise ValueError("min_requests and probes must be >= 1, window > 0 and open_for >= 0.")
+
+        if per not in ("host", "endpoint"):
+            raise ValueError(f"per must be 'host' or 'endpoint', not {per!r}.")
+
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.window = window
+        self.open_for = open_for
+        self.probes = probes
+        self.trip_on = frozenset(trip_on)
+        self.per = per
+
+        self.__circuits: Dict[str, _Circuit] = {}
+        self.__lock = threading.Lock()
+
+    def key(self, url: str, endpoint: Optional[str] = None) -> str:
+        """
+        Return the name of the circuit a request to ``url`` goes through.
+
+        :param url: URL of the request
+        :param endpoint: Name of its Core URL, when "per" is "endpoint"
+        """
+        if self.per == "endpoint":
+            return endpoint if endpoint is not None else endpoint_name(url)
+
+        return urlsplit(url).hostname or ""
+
+    def __circuit(self, key: str) -> _Circuit:
+        circuit = self.__circuits.get(key)
+
+        if circuit is None:
+            circuit = self.__circuits[key] = _Circuit()
+
+        return circuit
+
+    def before(self, key: str) -> None:
+        """
+        Let a request through ``key``, or raise CircuitOpenError.
+
+        Every request let through must be reported with record().
+
+        :param key: Its circuit, from key()
+        """
+        now = time.monotonic()
+
+        with self.__lock:
+            circuit = self.__circuit(key)
+
+            if circuit.state == OPEN:
+                retry_in = circuit.opened_at + self.open_for - now
+
+                if retry_in > 0:
+                    raise CircuitOpenError(key, retry_in)
+
+                circuit.state = HALF_OPEN
+                circuit.probes = circuit.probe_successes = 0
+
+            if circuit.state == HALF_OPEN:
+                if circuit.probes >= self.probes:
+                    # Probes are out: the host has not been shown healthy yet.
+                    raise CircuitOpenError(key, 0.0)
+
+                circuit.probes += 1
+
+    def record(self, key: str, failure_class: Optional[str]) -> Optional[str]:
+        """
+        Report how a request let through by before() ended.
+
+        Return the state the circuit moved to, or None if it stayed as it was.
+
+        :param key: Its circuit
+        :param failure_class: Class of its failure, or None if it got a response
+        """
+        failed = failure_class in self.trip_on
+        now = time.monotonic()
+
+        with self.__lock:
+            circuit = self.__circuit(key)
+
+            if circuit.state == HALF_OPEN:
+                if failed:
+                    return self.__open(circuit, now)
+
+                circuit.probe_successes += 1
+
+                if circuit.probe_successes < self.probes:
+                    return None
+
+                circuit.state, circuit.buckets = CLOSED, []
+                return CLOSED
+
+            if circuit.state == OPEN:
+                # Let through before it opened, and finished after.
+                return None
+
+            buckets = circuit.buckets
+
+            while buckets and buckets[0][0] <= now - self.window:
+                buckets.pop(0)
+
+            if not buckets or buckets[-1][0] + self.window / _BUCKETS <= now:
+                buckets.append([now, 0, 0])
+
+            buckets[-1][1] += 1
+            buckets[-1][2] += failed
+
+            requests = sum(bucket[1] for bucket in buckets)
+            failures = sum(bucket[2] for bucket in buckets)
+
+            if failed and requests >= self.min_requests and failures >= self.failure_rate * requests:
+                return self.__open(circuit, now)
+
+            return None
+
+    def abandon(self, key: str) -> None:
+        """
+        Report a request let through by before() that ended with no verdict on its host.
+
+        Such as one cut short by the deadline of the call that made it.
+
+        :param key: Its circuit
+        """
+        with self.__lock:
+            circuit = self.__circuit(key)
+
+            if circuit.state == HALF_OPEN and circuit.probes > circuit.probe_successes:
+                circuit.probes -= 1
+
+    @staticmethod
+    def __open(circuit: _Circuit, now: float) -> str:
+        circuit.state, circuit.opened_at, circuit.buckets = OPEN, now, []
+        return OPEN
+
+    def cuts_off(self, err: BaseException) -> bool:
+        """
+        Return True if ``err`` is a failure this breaker counts, or the CircuitOpenError it raises.
+
+        :param err: What a request raised
+        """
+        # Imported here: the request module imports this one.
+        from .request import classify_error
+
+        return isinstance(err, CircuitOpenError) or classify_error(err) in self.trip_on
+
+    def state(self, key: str) -> str:
+        """
+        Return the state of a circuit: "closed", "open" or "half_open".
+
+        An open circuit whose ``open_for`` has passed reads "open" until a
+        request turns it half-open.
+
+        :param key: Host name, or endpoint name
+        """
+        with self.__lock:
+            circuit = self.__circuits.get(key)
+            return circuit.state if circuit is not None else CLOSED
+
+    def reset(self) -> None:
+        """Close every circuit and forget every outcome."""
+        with self.__lock:
+            self.__circuits.clear()
@@ -1,7 +1,19 @@
 # -*- coding: utf-8 -*-
 
+import threading
+import weakref
 from enum import Enum
-from .zones import static_zones
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+
+class _StaticZones:
+    """
+    Class attribute holding the bundled zones, loaded on first access.
+    """
+
+    def __get__(self, instance: Any, owner: Any) -> Dict[str, Any]:
+        from .zones import static_zones
+        return static_zones
 
 
 class Core:
@@ -60,7 +72,7 @@ class Core:
     airline_logo_url = cdn_flightradar_base_url + "/assets/airlines/logotypes/{}_{}.png"
     alternative_airline_logo_url = flightradar_base_url + "/static/images/data/operators/{}_logo0.png"
 
-    static_zones = static_zones
+    static_zones = _StaticZones()
 
     headers = {
         "accept-encoding": "gzip, br",
@@ -110,6 +122,132 @@ class Core:
         ),
     }
 
+    @classmethod
+    def with_base_urls(cls, **base_urls: str) -> Type["Core"]:
+        """
+        Return a Core whose URLs built on some base URLs go somewhere else, leaving Core as it is.
+
+        For one client, e.g. FlightRadar24API(base_urls=...), where set_base_urls()
+        would redirect every client in the process. URLs on the other bases are
+        Core's own.
+
+        :param base_urls: New values for the *_base_url attributes, by attribute name
+        """
+        _check_base_urls(base_urls)
+
+        urls = {
+            name: base_urls[base].rstrip("/") + suffix
+            for name, (base, suffix) in _URL_PARTS.items() if base in base_urls
+        }
+        core: Type[Core] = type("Core", (Core,), urls)
+
+        with _endpoints_lock:
+            # So endpoint_name() knows its URLs too, for as long as it is in use.
+            _derived.add(core)
+            _forget_endpoints()
+
+        return core
+
+    @classmethod
+    def set_base_urls(cls, **base_urls: str) -> None:
+        """
+        Point the URLs built on some base URLs somewhere else, e.g. at a local stand-in server.
+
+        Every URL attribute starting with a replaced base is rebuilt from the new
+        one. This is process-wide: Core is shared by every client, in every
+        thread, and a client reading its URLs while they are rewritten may get
+        some of each. Prefer with_base_urls() for one client. Call
+        reset_base_urls() to undo it.
+
+        :param base_urls: New values for the *_base_url attributes, by attribute name
+        """
+        _check_base_urls(base_urls)
+
+        # Held so two rewrites, or a rewrite and an endpoint table build, do not interleave.
+        with _endpoints_lock:
+            for name, (base, suffix) in _URL_PARTS.items():
+                if base in base_urls:
+                    setattr(cls, name, base_urls[base].rstrip("/") + suffix)
+
+            _forget_endpoints()
+
+    @classmethod
+    def reset_base_urls(cls) -> None:
+        """
+        Restore every URL to its FlightRadar24 default.
+        """
+        with _endpoints_lock:
+            for name, (base, suffix) in _URL_PARTS.items():
+                setattr(cls, name, _BASE_URLS[base] + suffix)
+
+            _forget_endpoints()
+
+
+# Every URL attribute, split into the base URL it is built on and the rest.
+# Longest base first, so a URL is credited to the most specific one.
+_BASE_URLS = {name: value for name, value in vars(Core).items() if name.endswith("_base_url")}
+_URL_PARTS = {
+    name: next(
+        (base, value[len(_BASE_URLS[base]):])
+        for base in sorted(_BASE_URLS, key=lambda base: -len(_BASE_URLS[base]))
+        if value.startswith(_BASE_URLS[base])
+    )
+    for name, value in vars(Core).items()
+    if name.endswith("_url") and isinstance(value, str)
+}
+
+
+def _check_base_urls(base_urls: Dict[str, str]) -> None:
+    unknown = set(base_urls) - set(_BASE_URLS)
+
+    if unknown:
+        raise ValueError(f"Unknown base URL(s): {', '.join(sorted(unknown))}.")
+
+
+# The Cores made by with_base_urls() still in use.
+_derived: "weakref.WeakSet[Type[Core]]" = weakref.WeakSet()
+
+# The endpoint table of endpoint_table(), until the base URLs change.
+_endpoints: Optional[Tuple[Dict[str, str], List[Tuple[str, str]]]] = None
+_endpoints_lock = threading.Lock()
+
+
+def _forget_endpoints() -> None:
+    global _endpoints
+    _endpoints = None
+
+
+def endpoint_table() -> Tuple[Dict[str, str], List[Tuple[str, str]]]:
+    """
+    Return the fixed part of every Core URL with the name of the URL, for timing.endpoint_name().
+
+    Those of the Cores made by with_base_urls() included.
+
+    Both by prefix, for a request URL up to its query string, and as (prefix,
+    name) pairs, longest first. Built on first use, and again after
+    set_base_urls() or reset_base_urls().
+    """
+    global _endpoints
+
+    with _endpoints_lock:
+        if _endpoints is None:
+            prefixes = []
+
+            for core in (Core, *_derived):
+                for name in _URL_PARTS:
+                    # A derived Core's other URLs are Core's own, already listed.
+                    if name.endswith("_base_url") or (core is not Core and name not in vars(core)):
+                        continue
+
+                    # The fixed part of the URL: up to its first placeholder, query string excluded.
+                    value: str = getattr(core, name)
+                    prefixes.append((value.split("{", 1)[0].split("?", 1)[0], name[:-4]))
+
+            prefixes.sort(key=lambda item: -len(item[0]))
+            _endpoints = ({prefix: name for prefix, name in reversed(prefixes)}, prefixes)
+
+        return _endpoints
+
 
 class Countries(Enum):
     """
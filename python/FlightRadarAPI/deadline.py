@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+import time
+from typing import Optional, Union
+
+from .errors import DeadlineExceededError
+
+# A request given less than this is not started: it could only time out.
+DEFAULT_MIN_REQUEST_SECONDS = 0.25
+
+
+class Deadline:
+    """
+    A point in time a call, and every request it makes, must be done by.
+
+    Handed down from a composite call such as get_flights(details=True) to
+    each of its requests, it cuts their timeouts, and their retries' sleeps,
+    to the time left. A request is not started with less than
+    ``min_request_seconds`` left: it raises DeadlineExceededError instead.
+
+    :param seconds: Time from now to the deadline
+    :param min_request_seconds: Least time left for a request to be started
+    """
+
+    def __init__(self, seconds: float, min_request_seconds: float = DEFAULT_MIN_REQUEST_SECONDS):
+        if seconds < 0 or min_request_seconds < 0:
+            raise ValueError("seconds and min_request_seconds must be >= 0.")
+
+        self.expires_at = time.monotonic() + seconds
+        self.min_request_seconds = min_request_seconds
+
+    @classmethod
+    def of(cls, deadline: Optional[Union["Deadline", float]]) -> Optional["Deadline"]:
+        """
+        Return ``deadline`` as a Deadline: itself if it is one, or one that many seconds from now.
+
+        :param deadline: A Deadline, seconds, or None for no deadline
+        """
+        if deadline is None or isinstance(deadline, Deadline):
+            return deadline
+
+        return cls(deadline)
+
+    def sub(self, fraction: float) -> "Deadline":
+        """
+        Return a Deadline for one part of a call: ``fraction`` of the time left, from now.
+
+        The rest is left to the parts after it, which go on under this Deadline.
+
+        :param fraction: Share of the time left, over 0 and at most 1
+        """
+        if not 0 < fraction <= 1:
+            raise ValueError("fraction must be over 0 and at most 1.")
+
+        return Deadline(self.remaining() * fraction, self.min_request_seconds)
+
+    def remaining(self) -> float:
+        """Return the seconds left, 0 once it has passed."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def allows(self, seconds: float = 0.0) -> bool:
+        """
+        Return True if a request can still be started after waiting ``seconds``.
+
+        :param seconds: Time that would pass first, such as a retry's sleep
+        """
+        return self.remaining() - seconds >= self.min_request_seconds
+
+    def timeout(self, timeout: float) -> float:
+        """
+        Return the timeout of a request started now, or raise DeadlineExceededError if none can be.
+
+        :param timeout: The request's own timeout
+        """
+        remaining = self.remaining()
+
+        if remaining < self.min_request_seconds:
+            raise DeadlineExceededError(f"Deadline reached, with {remaining:.2f}s left: request not started.")
+
+        return min(timeout, remaining)
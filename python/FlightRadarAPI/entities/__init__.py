@@ -2,4 +2,4 @@
 
 from .airport import Airport
 from .entity import Entity
-from .flight import Flight
+from .flight import Flight, FlightList
@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 
 from enum import IntEnum
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List
 
+from ..trail import Trail
 from .entity import Entity
 
 
@@ -97,6 +98,18 @@ class Flight(Entity):
 
         return True
 
+    def compact_trail(self) -> Trail:
+        """
+        Replace the trail list set by set_flight_details(...) with a compact Trail and return it.
+        """
+        trail = getattr(self, "trail", [])
+
+        if not isinstance(trail, Trail):
+            trail = Trail(trail)
+            self.trail = trail
+
+        return trail
+
     def get_altitude(self) -> str:
         """
         Return the formatted altitude, with the unit of measure.
@@ -137,6 +150,21 @@ class Flight(Entity):
             return self._default_text
         return f"{self.vertical_speed} fpm"
 
+    def merge_flight_details(self, flight_details: Dict) -> int:
+        """
+        Set flight details like set_flight_details(...), but merge the trail into the one already held.
+
+        Only trail points newer than the last one held are added, so polling
+        the details of a long flight keeps a single compact Trail that grows
+        by the new points. Return how many points were new.
+        """
+        trail = self.compact_trail()
+        self.set_flight_details(flight_details)
+
+        added = trail.merge(flight_details.get("trail") or [])
+        self.trail = trail
+        return added
+
     def set_flight_details(self, flight_details: Dict) -> None:
         """
         Set flight details to the instance. Use FlightRadar24API.get_flight_details(...) method to get it.
@@ -238,3 +266,24 @@ class Flight(Entity):
 
         # Flight trail.
         self.trail = flight_details.get("trail", [])
+
+
+class FlightList(List[Flight]):
+    """
+    The flights get_flights() returns, and whether that is all of them.
+
+    A list in every other respect.
+    """
+
+    def __init__(self, flights: Iterable[Flight] = (), *, complete: bool = True, missing_details: int = 0):
+        """
+        Constructor of the FlightList class.
+
+        :param flights: The flights
+        :param complete: False when the call stopped short, at its deadline or a failing host,
+            and what it returns is partial
+        :param missing_details: Flights returned without the details that were asked for
+        """
+        super().__init__(flights)
+        self.complete = complete
+        self.missing_details = missing_details
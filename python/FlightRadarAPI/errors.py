@@ -10,12 +10,31 @@ class AirportNotFoundError(FlightRadarError):
     pass
 
 
+class CassetteMissError(FlightRadarError):
+    """Raised when a replaying cassette holds no response for a request."""
+    pass
+
+
+class CircuitOpenError(FlightRadarError):
+    """Raised in place of a request to a host the circuit breaker has cut off."""
+
+    def __init__(self, key: str, retry_in: float):
+        super().__init__(f"Circuit for {key!r} is open after repeated failures; not retrying for {retry_in:.1f}s.")
+        self.key = key
+        self.retry_in = retry_in
+
+
 class CloudflareError(FlightRadarError):
     def __init__(self, message: str, response):
         super().__init__(message)
         self.response = response
 
 
+class DeadlineExceededError(FlightRadarError):
+    """Raised when a request cannot finish before the deadline of the call that made it."""
+    pass
+
+
 class DecompressionLimitError(FlightRadarError):
     """Raised when a response body expands past the decompression budget."""
     pass
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+import importlib
+import importlib.util
+import json
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+JSONLoads = Callable[[Union[bytes, str]], Any]
+
+# Tried in this order when no backend is named: fastest first.
+JSON_BACKENDS = ("orjson", "msgspec", "json")
+
+
+def _msgspec_loads() -> JSONLoads:
+    import msgspec
+
+    decode = msgspec.json.decode
+
+    def loads(document: Union[bytes, str]) -> Any:
+        # Callers catch ValueError, as json.loads raises.
+        try:
+            return decode(document)
+        except msgspec.DecodeError as err:
+            raise ValueError(str(err)) from err
+
+    return loads
+
+
+_FACTORIES: Dict[str, Callable[[], JSONLoads]] = {
+    "orjson": lambda: importlib.import_module("orjson").loads,
+    "msgspec": _msgspec_loads,
+    "json": lambda: json.loads,
+}
+
+
+def _with_fallback(loads: JSONLoads) -> JSONLoads:
+    """
+    Fall back to json.loads for a document the faster decoder rejects.
+
+    They disagree at the edges: orjson refuses NaN, a UTF-8 byte order mark
+    and integers past 64 bits, all of which json.loads reads. Retrying costs
+    nothing on the documents that parse, and keeps the backend from changing
+    what parses; a document json.loads rejects too raises its error.
+    """
+    def loads_or_fallback(document: Union[bytes, str]) -> Any:
+        try:
+            return loads(document)
+        except ValueError:
+            return json.loads(document)
+
+    return loads_or_fallback
+
+
+def get_json_loads(backend: Optional[str] = None) -> Tuple[str, JSONLoads]:
+    """
+    Return the name and the loads function of a JSON backend.
+
+    :param backend: "orjson", "msgspec" or "json". The first one installed, in
+        that order, when None. A named backend that is not installed raises ImportError.
+    """
+    if backend is None:
+        backend = next(name for name in JSON_BACKENDS if name == "json" or importlib.util.find_spec(name) is not None)
+
+    if backend not in _FACTORIES:
+        raise ValueError(f"Unknown JSON backend: {backend!r}. Choose one of {', '.join(JSON_BACKENDS)}.")
+
+    loads = _FACTORIES[backend]()
+    return backend, loads if backend == "json" else _with_fallback(loads)
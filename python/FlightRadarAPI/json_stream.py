@@ -0,0 +1,423 @@
+# -*- coding: utf-8 -*-
+
+import codecs
+import json
+import re
+from typing import Any, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Events: a whole top-level member, or one element of an expanded array.
+MEMBER = "member"
+ITEM = "item"
+
+JSONEvent = Tuple[str, str, Any]
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+
+# Consumed text is dropped from the buffer only past this size, so compacting
+# costs one copy per this many characters rather than one per value.
+_COMPACT_AT = 64 * 1024
+
+# Slice size when streaming a body already held in memory.
+CHUNK_SIZE = 64 * 1024
+
+(_START, _FIRST_KEY, _KEY, _COLON, _VALUE, _AFTER_VALUE,
+ _FIRST_ITEM, _ITEM, _AFTER_ITEM, _TOP_VALUE, _DONE) = range(11)
+
+
+class JSONStream:
+    """
+    Incremental parser for a JSON document whose top level is an object.
+
+    Text is fed in chunks of any size and each top-level member is reported as
+    soon as it is complete, so the document never has to exist in full: only
+    the member being read is buffered. Arrays under the keys in ``expand`` are
+    reported element by element instead, which is what bounds memory for a
+    payload that is one huge array under a single key.
+
+    Each value is decoded by ``json.JSONDecoder.raw_decode``, so values come out
+    exactly as ``json.loads`` would produce them.
+
+    :param expand: Top-level keys whose array value is reported one element at a time
+    """
+
+    def __init__(self, expand: Iterable[str] = ()):
+        self.__expand = frozenset(expand)
+        self.__decoder = json.JSONDecoder()
+        self.__text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self.__buffer = ""
+        self.__position = 0
+        self.__state = _START
+        self.__key = ""
+        # Buffer length below which a failed decode is not worth retrying.
+        self.__retry_at = 0
+
+        #: Expanded keys that were found holding an array.
+        self.expanded: List[str] = []
+
+        #: Whether the top level turned out to be an object.
+        self.is_object = True
+
+    def feed(self, chunk: Union[bytes, str]) -> List[JSONEvent]:
+        """
+        Add a chunk of the document and return the events it completed.
+
+        :param chunk: Next piece of the document, as UTF-8 bytes or text
+        """
+        if isinstance(chunk, (bytes, bytearray, memoryview)):
+            chunk = self.__text_decoder.decode(chunk)
+
+        self.__buffer += chunk
+
+        if len(self.__buffer) < self.__retry_at:
+            return []
+
+        return self.__parse(final=False)
+
+    def close(self) -> List[JSONEvent]:
+        """
+        Signal the end of the document and return the events still pending.
+
+        Raises ValueError when the document is malformed or ends early.
+        """
+        self.__buffer += self.__text_decoder.decode(b"", final=True)
+        events = self.__parse(final=True)
+
+        if self.__state != _DONE:
+            raise json.JSONDecodeError("Unexpected end of document", self.__buffer, len(self.__buffer))
+
+        return events
+
+    def __skip_whitespace(self) -> int:
+        match = _WHITESPACE.match(self.__buffer, self.__position)
+        self.__position = match.end() if match else self.__position
+        return self.__position
+
+    def __decode_value(self, final: bool) -> Tuple[bool, Any]:
+        """Decode the value at the current position, or report that more text is needed."""
+        # raw_decode does not skip leading whitespace itself.
+        position = self.__skip_whitespace()
+
+        try:
+            value, end = self.__decoder.raw_decode(self.__buffer, position)
+        except json.JSONDecodeError:
+            if final:
+                raise
+
+            # Most likely cut off by the chunk boundary. Retry only once the
+            # pending text has doubled, so a value spanning many chunks is not
+            # rescanned from its start on every one of them.
+            self.__retry_at = len(self.__buffer) + max(len(self.__buffer) - self.__position, 1)
+            return False, None
+
+        # A number may continue in the next chunk: "12" of "123", or "2.5" of
+        # "2.5e3" when the chunk ends at "2.5e". Every other value ends itself.
+        if not final and isinstance(value, (int, float)) and not isinstance(value, bool):
+            if _NUMBER_TAIL.match(self.__buffer, end).end() >= len(self.__buffer):  # type: ignore[union-attr]
+                self.__retry_at = len(self.__buffer) + 1
+                return False, None
+
+        self.__position = end
+        return True, value
+
+    def __expect_any(self, final: bool) -> Optional[str]:
+        """Return the next significant character, or None when more text is needed."""
+        position = self.__skip_whitespace()
+
+        if position >= len(self.__buffer):
+            if final:
+                raise json.JSONDecodeError("Expecting value", self.__buffer, position)
+            return None
+
+        return self.__buffer[position]
+
+    def __expect(self, expected: str, final: bool) -> Optional[str]:
+        """Return the next significant character if it is one of ``expected``."""
+        position = self.__skip_whitespace()
+
+        if position >= len(self.__buffer):
+            if final:
+                raise json.JSONDecodeError(f"Expecting one of {expected!r}", self.__buffer, position)
+            return None
+
+        char = self.__buffer[position]
+
+        if char not in expected:
+            raise json.JSONDecodeError(f"Expecting one of {expected!r}", self.__buffer, position)
+
+        return char
+
+    def __scan_items(self, events: List[JSONEvent]) -> bool:
+        """Decode array elements in a tight loop, the hot path of an expanded array.
+
+        Return True when the buffer ran out mid-array, or False to hand the
+        next step to the general state machine: the array closed, or something
+        needs its error reporting.
+        """
+        buffer = self.__buffer
+        size = len(buffer)
+        scan = self.__decoder.scan_once  # type: ignore[attr-defined]  # the C scanner raw_decode wraps
+        skip = _WHITESPACE.match
+        key = self.__key
+        position = self.__position
+
+        while True:
+            start = skip(buffer, position).end()  # type: ignore[union-attr]
+
+            try:
+                value, end = scan(buffer, start)
+            except (StopIteration, json.JSONDecodeError):
+                # Cut off by the chunk, or malformed: the general path tells which.
+                break
+
+            after = skip(buffer, end).end()  # type: ignore[union-attr]
+
+            # No delimiter yet, so a number may still continue: "12" of "123".
+            if after >= size:
+                self.__position = start
+                self.__retry_at = size + 1
+                return True
+
+            char = buffer[after]
+
+            if char == ",":
+                events.append((ITEM, key, value))
+                position = after + 1
+            elif char == "]":
+                events.append((ITEM, key, value))
+                self.__position = after + 1
+                self.__state = _AFTER_VALUE
+                return False
+            else:
+                break
+
+        self.__position = position
+        return False
+
+    def __scan_members(self, events: List[JSONEvent]) -> None:
+        """Decode top-level members in a tight loop, the hot path of a wide object.
+
+        Stops at the first member it cannot complete from the buffer, or that
+        opens an expanded array, and leaves it to the general state machine,
+        which knows how to wait for more text and how to report errors.
+        """
+        buffer = self.__buffer
+        size = len(buffer)
+        scan = self.__decoder.scan_once  # type: ignore[attr-defined]
+        skip = _WHITESPACE.match
+        expand = self.__expand
+        position = self.__position
+
+        while True:
+            start = skip(buffer, position).end()  # type: ignore[union-attr]
+
+            if start >= size or buffer[start] != '"':
+                break
+
+            try:
+                key, end = scan(buffer, start)
+                colon = skip(buffer, end).end()  # type: ignore[union-attr]
+
+                if colon >= size or buffer[colon] != ":":
+                    break
+
+                value_start = skip(buffer, colon + 1).end()  # type: ignore[union-attr]
+
+                if value_start < size and buffer[value_start] == "[" and key in expand:
+                    break
+
+                value, end = scan(buffer, value_start)
+            except (StopIteration, json.JSONDecodeError):
+                break
+
+            after = skip(buffer, end).end()  # type: ignore[union-attr]
+
+            # No delimiter yet, so a number may still continue: "12" of "123".
+            if after >= size:
+                break
+
+            char = buffer[after]
+
+            if char == ",":
+                events.append((MEMBER, key, value))
+                position = after + 1
+                self.__state = _KEY
+            elif char == "}":
+                events.append((MEMBER, key, value))
+                position = after + 1
+                self.__state = _DONE
+                break
+            else:
+                break
+
+        self.__position = position
+
+    def __parse(self, final: bool) -> List[JSONEvent]:
+        events: List[JSONEvent] = []
+        self.__retry_at = 0
+
+        while True:
+            state = self.__state
+
+            if state == _START:
+                char = self.__expect_any(final)
+
+                if char is None:
+                    break
+
+                if char == "{":
+                    self.__position += 1
+                    self.__state = _FIRST_KEY
+                else:
+                    self.is_object = False
+                    self.__state = _TOP_VALUE
+
+            elif state == _TOP_VALUE:
+                complete, _ = self.__decode_value(final)
+
+                if not complete:
+                    break
+                self.__state = _DONE
+
+            elif state in (_FIRST_KEY, _KEY):
+                if not final:
+                    self.__scan_members(events)
+
+                    if self.__state != state:
+                        continue
+
+                # Only here may the object close: "{}" is valid, '{"a":1,}' is not.
+                char = self.__expect('"}' if state == _FIRST_KEY else '"', final)
+
+                if char is None:
+                    break
+
+                if char == "}":
+                    self.__position += 1
+                    self.__state = _DONE
+                    continue
+
+                complete, key = self.__decode_value(final)
+
+                if not complete:
+                    break
+                self.__key = key
+                self.__state = _COLON
+
+            elif state == _COLON:
+                if self.__expect(":", final) is None:
+                    break
+
+                self.__position += 1
+                self.__state = _VALUE
+
+            elif state == _VALUE:
+                char = self.__expect_any(final)
+
+                if char is None:
+                    break
+
+                if char == "[" and self.__key in self.__expand:
+                    self.__position += 1
+                    self.expanded.append(self.__key)
+                    self.__state = _FIRST_ITEM
+                    continue
+
+                complete, value = self.__decode_value(final)
+
+                if not complete:
+                    break
+                events.append((MEMBER, self.__key, value))
+                self.__state = _AFTER_VALUE
+
+            elif state == _AFTER_VALUE:
+                char = self.__expect(",}", final)
+
+                if char is None:
+                    break
+
+                self.__position += 1
+                self.__state = _KEY if char == "," else _DONE
+
+            elif state == _FIRST_ITEM:
+                # Only here may the array close: "[]" is valid, "[1,]" is not.
+                char = self.__expect_any(final)
+
+                if char is None:
+                    break
+
+                if char == "]":
+                    self.__position += 1
+                    self.__state = _AFTER_VALUE
+                else:
+                    self.__state = _ITEM
+
+            elif state == _ITEM:
+                if not final and self.__scan_items(events):
+                    break
+
+                complete, value = self.__decode_value(final)
+
+                if not complete:
+                    break
+                events.append((ITEM, self.__key, value))
+                self.__state = _AFTER_ITEM
+
+            elif state == _AFTER_ITEM:
+                char = self.__expect(",]", final)
+
+                if char is None:
+                    break
+
+                self.__position += 1
+                self.__state = _ITEM if char == "," else _AFTER_VALUE
+
+            else:  # _DONE
+                position = self.__skip_whitespace()
+
+                if position < len(self.__buffer):
+                    raise json.JSONDecodeError("Extra data", self.__buffer, position)
+                break
+
+        if self.__position > _COMPACT_AT:
+            self.__buffer = self.__buffer[self.__position:]
+            self.__retry_at = max(self.__retry_at - self.__position, 0)
+            self.__position = 0
+
+        return events
+
+
+def iter_chunks(document: Union[bytes, str, Iterable[Union[bytes, str]]]) -> Iterable[Union[bytes, str]]:
+    """
+    Return ``document`` as chunks to feed a JSONStream.
+
+    A body already in memory is sliced rather than fed whole, so it is still
+    decoded to text a piece at a time.
+
+    :param document: The whole document, or an iterable of its chunks
+    """
+    if isinstance(document, bytes):
+        view = memoryview(document)
+        return (bytes(view[start:start + CHUNK_SIZE]) for start in range(0, len(document), CHUNK_SIZE))
+
+    if isinstance(document, str):
+        return (document[start:start + CHUNK_SIZE] for start in range(0, len(document), CHUNK_SIZE))
+
+    return document
+
+
+def iter_json_events(
+    document: Union[bytes, str, Iterable[Union[bytes, str]]], expand: Iterable[str] = (),
+) -> Iterator[JSONEvent]:
+    """
+    Yield the events of a JSON document as it is parsed; see JSONStream.
+
+    :param document: The whole document, or an iterable of its chunks
+    :param expand: Top-level keys whose array value is reported one element at a time
+    """
+    stream = JSONStream(expand)
+
+    for chunk in iter_chunks(document):
+        yield from stream.feed(chunk)
+
+    yield from stream.close()
@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from .timing import (
+    CIRCUIT_OPENED,
+    DETAILS_SKIPPED,
+    FANOUT_QUEUE_DEPTH,
+    FEED_REROLL,
+    RETRY_BUDGET_EXHAUSTED,
+    RequestTiming,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds of the histogram buckets; +Inf is implied.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTES_BUCKETS = tuple(float(1024 * 4 ** power) for power in range(10))  # 1 KiB to 256 MiB.
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# name: (type, help text)
+_METRICS = {
+    "requests_total": ("counter", "Requests that got a response or failed trying, by endpoint and status code."),
+    "request_errors_total": ("counter", "Requests that raised, by endpoint and error class."),
+    "request_retries_total": ("counter", "Attempts that were retries under the retry policy, by endpoint."),
+    "retry_budget_exhausted_total": ("counter", "Failed attempts not retried because the retry budget was spent."),
+    "circuit_opened_total": ("counter", "Times the circuit breaker cut off a failing host."),
+    "details_skipped_total": ("counter", "Flights get_flights(details=True) returned without details, their host cut off."),
+    "feed_rerolls_total": ("counter", "Empty-feed backends dropped by get_flights() to re-roll the load balancer."),
+    "request_duration_seconds": ("histogram", "Total transfer time of requests, by endpoint."),
+    "response_bytes": ("histogram", "Response body sizes, by endpoint and stage: on the wire or decoded."),
+    "fanout_queue_depth": ("gauge", "Detail requests of get_flights(details=True) still pending."),
+}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Shard:
+    """
+    The samples recorded by one thread.
+
+    Only its own thread writes to it, so recording takes no lock.
+
+    :param thread: The thread recording into it; None for the shard the shards of finished threads are added to
+    """
+
+    def __init__(self, thread: Optional[threading.Thread] = None) -> None:
+        self.thread = thread
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+
+        # (name, labels) -> [count per bucket, +Inf included; sum]
+        self.histograms: Dict[Tuple[str, Labels], List[Any]] = {}
+
+    def add(self, other: "_Shard") -> None:
+        """
+        Add the samples of another shard to this one.
+
+        :param other: A shard no thread writes to any more, or a copy of one
+        """
+        for key, value in list(other.counters.items()):
+            self.counters[key] = self.counters.get(key, 0.0) + value
+
+        for key, (counts, total) in list(other.histograms.items()):
+            histogram = self.histograms.setdefault(key, [[0] * len(counts), 0.0])
+            histogram[0] = [a + b for a, b in zip(histogram[0], counts)]
+            histogram[1] += total
+
+
+class Metrics:
+    """
+    Prometheus metrics of a client's activity.
+
+    attach() subscribes to the request and event hooks of a FlightRadar24API
+    and the metrics are rendered in the text exposition format by render(),
+    or served over HTTP by serve().
+
+    Recording is lock-free: each thread counts into a shard of its own, and
+    render() adds the shards up. The only lock is taken once per thread, the
+    first time it records. The shards of threads that have finished, such as
+    the workers of each get_flights(details=True), are added to one shared
+    shard and dropped, so there are never many more shards than live threads.
+
+    :param namespace: Prefix of every metric name
+    """
+
+    def __init__(self, namespace: str = "flightradarapi"):
+        self.namespace = namespace
+        self.__local = threading.local()
+        self.__shards: List[_Shard] = []
+        self.__finished = _Shard()
+        self.__shards_lock = threading.Lock()
+        self.__gauges: Dict[Tuple[str, Labels], float] = {}
+
+    def attach(self, api: Any) -> "Metrics":
+        """
+        Start recording the activity of a client.
+
+        :param api: A FlightRadar24API
+        """
+        api.add_request_hook(self.observe_request)
+        api.add_event_hook(self.observe_event)
+        return self
+
+    def detach(self, api: Any) -> None:
+        """
+        Stop recording the activity of a client.
+
+        :param api: A FlightRadar24API given to attach()
+        """
+        api.remove_request_hook(self.observe_request)
+        api.remove_event_hook(self.observe_event)
+
+    def __shard(self) -> _Shard:
+        shard = getattr(self.__local, "shard", None)
+
+        if shard is None:
+            shard = self.__local.shard = _Shard(threading.current_thread())
+
+            with self.__shards_lock:
+                self.__fold_finished()
+                self.__shards.append(shard)
+
+        return shard
+
+    def __fold_finished(self) -> None:
+        """Add the shards of finished threads to the shared one, and drop them. Called under the shards lock."""
+        live = []
+
+        for shard in self.__shards:
+            if shard.thread is not None and shard.thread.is_alive():
+                live.append(shard)
+            else:
+                self.__finished.add(shard)
+
+        self.__shards = live
+
+    @staticmethod
+    def __count(shard: _Shard, name: str, labels: Labels, value: float = 1.0) -> None:
+        key = (name, labels)
+        shard.counters[key] = shard.counters.get(key, 0.0) + value
+
+    @staticmethod
+    def __observe(shard: _Shard, name: str, labels: Labels, buckets: Tuple[float, ...], value: float) -> None:
+        key = (name, labels)
+        histogram = shard.histograms.get(key)
+
+        if histogram is None:
+            histogram = shard.histograms[key] = [[0] * (len(buckets) + 1), 0.0]
+
+        # Counted in the first bucket that holds it; render() makes the counts cumulative.
+        histogram[0][bisect.bisect_left(buckets, value)] += 1
+        histogram[1] += value
+
+    def observe_request(self, timing: RequestTiming) -> None:
+        """
+        Record a finished request; the request hook attach() installs.
+
+        :param timing: Its timing record
+        """
+        shard = self.__shard()
+        endpoint = (("endpoint", timing.endpoint),)
+
+        self.__count(shard, "requests_total", endpoint + (("status", str(timing.status)),))
+
+        if timing.error is not None:
+            self.__count(shard, "request_errors_total", endpoint + (("error", timing.error),))
+
+        if timing.retries:
+            self.__count(shard, "request_retries_total", endpoint)
+
+        if timing.status:
+            self.__observe(shard, "request_duration_seconds", endpoint, LATENCY_BUCKETS, timing.total)
+            self.__observe(shard, "response_bytes", endpoint + (("stage", "wire"),), BYTES_BUCKETS, timing.wire_bytes)
+            self.__observe(shard, "response_bytes", endpoint + (("stage", "decoded"),), BYTES_BUCKETS, timing.decoded_bytes)
+
+    def observe_event(self, name: str, value: float) -> None:
+        """
+        Record a client event; the event hook attach() installs.
+
+        :param name: Name of the event
+        :param value: Its value
+        """
+        if name == FEED_REROLL:
+            self.__count(self.__shard(), "feed_rerolls_total", (), value)
+        elif name == RETRY_BUDGET_EXHAUSTED:
+            self.__count(self.__shard(), "retry_budget_exhausted_total", (), value)
+        elif name == CIRCUIT_OPENED:
+            self.__count(self.__shard(), "circuit_opened_total", (), value)
+        elif name == DETAILS_SKIPPED:
+            self.__count(self.__shard(), "details_skipped_total", (), value)
+        elif name == FANOUT_QUEUE_DEPTH:
+            # A single assignment, atomic under the GIL: the last report wins.
+            self.__gauges[("fanout_queue_depth", ())] = value
+
+    def render(self) -> str:
+        """
+        Return every metric in the Prometheus text exposition format.
+        """
+        summed = _Shard()
+
+        with self.__shards_lock:
+            self.__fold_finished()
+            shards = list(self.__shards)
+            # Under the lock: a thread registering its shard may fold others into it.
+            summed.add(self.__finished)
+
+        for shard in shards:
+            # add() copies the keys first: the owning thread may add one while this reads.
+            summed.add(shard)
+
+        counters, histograms = summed.counters, summed.histograms
+
+        samples: Dict[str, List[str]] = {name: [] for name in _METRICS}
+
+        for (name, labels), value in sorted(counters.items()):
+            samples[name].append(f"{self.namespace}_{name}{_format_labels(labels)} {_format_value(value)}")
+
+        for (name, labels), value in sorted(dict(self.__gauges).items()):
+            samples[name].append(f"{self.namespace}_{name}{_format_labels(labels)} {_format_value(value)}")
+
+        for (name, labels), (counts, total) in sorted(histograms.items()):
+            buckets = LATENCY_BUCKETS if name == "request_duration_seconds" else BYTES_BUCKETS
+            cumulative = 0
+
+            for bound, count in zip(buckets + (float("inf"),), counts):
+                cumulative += count
+                bucket_labels = labels + (("le", _format_value(bound)),)
+                samples[name].append(f"{self.namespace}_{name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+
+            samples[name].append(f"{self.namespace}_{name}_sum{_format_labels(labels)} {_format_value(total)}")
+            samples[name].append(f"{self.namespace}_{name}_count{_format_labels(labels)} {cumulative}")
+
+        lines = []
+
+        for name, (kind, help_text) in _METRICS.items():
+            lines.append(f"# HELP {self.namespace}_{name} {help_text}")
+            lines.append(f"# TYPE {self.namespace}_{name} {kind}")
+            lines.extend(samples[name])
+
+        return "\n".join(lines) + "\n"
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> "MetricsServer":
+        """
+        Serve render() at /metrics from a background thread.
+
+        :param host: Interface to listen on
+        :param port: Port to listen on; 0 picks a free one
+        """
+        return MetricsServer(self, host, port)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    server: "_MetricsHTTPServer"
+
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+
+        body = self.server.metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+class _MetricsHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    metrics: Metrics
+
+
+class MetricsServer:
+    """
+    Minimal HTTP endpoint serving a Metrics instance at /metrics.
+
+    Started on creation; stop it with stop() or by using it as a context manager.
+
+    :param metrics: The metrics to serve
+    :param host: Interface to listen on
+    :param port: Port to listen on; 0 picks a free one
+    """
+
+    def __init__(self, metrics: Metrics, host: str = "127.0.0.1", port: int = 0):
+        self.__server: Optional[_MetricsHTTPServer] = _MetricsHTTPServer((host, port), _MetricsHandler)
+        self.__server.metrics = metrics
+        self.__host = host
+        self.__thread = threading.Thread(target=self.__server.serve_forever, name="fr24-metrics", daemon=True)
+        self.__thread.start()
+
+    def __enter__(self) -> "MetricsServer":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        """
+        URL the metrics are served at.
+        """
+        if self.__server is None:
+            raise RuntimeError("The metrics server is stopped.")
+
+        return f"http://{self.__host}:{self.__server.server_port}/metrics"
+
+    def stop(self) -> None:
+        """
+        Stop serving and close the socket.
+        """
+        if self.__server is None:
+            return
+
+        self.__server.shutdown()
+        self.__server.server_close()
+        self.__server = None
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+
+import threading
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+from .timing import RequestTiming
+
+# Link speed assumed for a host until a transfer large enough to measure it arrives.
+DEFAULT_BYTES_PER_SECOND = 2_000_000.0
+
+# Bodies smaller than this mostly measure round trips, not the link.
+_MIN_THROUGHPUT_BYTES = 32 * 1024
+
+
+class _EncodingStats:
+    def __init__(self) -> None:
+        self.asked = 0
+        self.samples = 0
+        self.last_sample = 0
+
+        # Per decoded byte: bytes on the wire, and seconds spent decoding.
+        self.ratio = 0.0
+        self.decode_seconds = 0.0
+
+
+class _HostStats:
+    def __init__(self, encodings: Iterable[str]) -> None:
+        self.requests = 0
+        self.bytes_per_second: Optional[float] = None
+        self.encodings = {encoding: _EncodingStats() for encoding in encodings}
+
+
+class EncodingNegotiator:
+    """
+    Picks the Accept-Encoding of each host by what its encodings cost.
+
+    Every response is measured: its size on the wire and its decode time, per
+    decoded byte, and the host's transfer rate. The cost of an encoding is then
+    the time to transfer a decoded byte's worth of it plus the time to decode
+    it, and the cheapest one is asked for. On a fast link that favours a cheap
+    decoder, or none at all ("identity"); on a slow one, the smallest bodies.
+
+    Each encoding is tried ``min_samples`` times before any choice is made,
+    and every ``explore_every``-th request of a host re-measures the encoding
+    measured least recently, so the choice follows a link that changes. An
+    encoding the server keeps answering with another one is no longer tried.
+
+    Feed it through APIClient (or FlightRadar24API) ``encoding_negotiator``,
+    which asks it for the header of every request and reports every response
+    back through observe().
+
+    :param encodings: Candidates. Defaults to every decodable encoding plus "identity"
+    :param min_samples: Measurements of each encoding before choosing by cost
+    :param explore_every: Re-measure one encoding every this many requests of a host; 0 never does
+    :param smoothing: Weight of a new measurement in the running averages, from 0 to 1
+    :param bytes_per_second: Fixed link speed to assume, instead of measuring it
+    """
+
+    def __init__(
+        self,
+        encodings: Optional[Iterable[str]] = None,
+        *,
+        min_samples: int = 3,
+        explore_every: int = 50,
+        smoothing: float = 0.2,
+        bytes_per_second: Optional[float] = None,
+    ):
+        if encodings is None:
+            # Imported here: the request module imports this one.
+            from .request import APIRequest
+            encodings = APIRequest.supported_encodings.split(", ") + ["identity"]
+
+        self.encodings = tuple(encodings)
+
+        if not self.encodings:
+            raise ValueError("At least one encoding is required.")
+
+        if min_samples < 1 or explore_every < 0 or not 0.0 < smoothing <= 1.0:
+            raise ValueError("min_samples must be >= 1, explore_every >= 0 and smoothing in (0, 1].")
+
+        self.min_samples = min_samples
+        self.explore_every = explore_every
+        self.smoothing = smoothing
+        self.bytes_per_second = bytes_per_second
+
+        self.__hosts: Dict[str, _HostStats] = {}
+        self.__lock = threading.Lock()
+
+    def __host(self, host: str) -> _HostStats:
+        stats = self.__hosts.get(host)
+
+        if stats is None:
+            stats = self.__hosts[host] = _HostStats(self.encodings)
+
+        return stats
+
+    def __declined(self, stats: _EncodingStats) -> bool:
+        """Asked for often, never received: the server does not offer it."""
+        return stats.samples == 0 and stats.asked >= 3 * self.min_samples
+
+    def __cost(self, host: _HostStats, stats: _EncodingStats) -> float:
+        bytes_per_second = self.bytes_per_second or host.bytes_per_second or DEFAULT_BYTES_PER_SECOND
+        return stats.ratio / bytes_per_second + stats.decode_seconds
+
+    def accept_encoding(self, host: str) -> str:
+        """
+        Return the Accept-Encoding to send on the next request to ``host``.
+
+        :param host: Host name of the request
+        """
+        with self.__lock:
+            state = self.__host(host)
+            state.requests += 1
+            candidates = [(name, stats) for name, stats in state.encodings.items() if not self.__declined(stats)]
+
+            if not candidates:
+                return self.encodings[0]
+
+            unmeasured = [(name, stats) for name, stats in candidates if stats.samples < self.min_samples]
+
+            if unmeasured:
+                choice = min(unmeasured, key=lambda item: item[1].asked)[0]
+            elif self.explore_every and state.requests % self.explore_every == 0:
+                choice = min(candidates, key=lambda item: item[1].last_sample)[0]
+            else:
+                choice = min(candidates, key=lambda item: self.__cost(state, item[1]))[0]
+
+            state.encodings[choice].asked += 1
+            return choice
+
+    def observe(self, timing: RequestTiming) -> None:
+        """
+        Measure a finished request; the request hook APIClient installs.
+
+        :param timing: Its timing record
+        """
+        if timing.error is not None or timing.status != 200 or not timing.decoded_bytes:
+            return
+
+        encoding = timing.encoding or "identity"
+        host = urlsplit(timing.url).hostname or ""
+        weight = self.smoothing
+
+        with self.__lock:
+            state = self.__host(host)
+            stats = state.encodings.get(encoding)
+
+            if stats is None:
+                return
+
+            ratio = timing.wire_bytes / timing.decoded_bytes
+            decode_seconds = timing.decode / timing.decoded_bytes
+
+            if stats.samples:
+                stats.ratio += weight * (ratio - stats.ratio)
+                stats.decode_seconds += weight * (decode_seconds - stats.decode_seconds)
+            else:
+                stats.ratio, stats.decode_seconds = ratio, decode_seconds
+
+            stats.samples += 1
+            stats.last_sample = state.requests
+
+            # libcurl's times are cumulative: the body took total - starttransfer.
+            transfer = timing.total - timing.starttransfer
+
+            if timing.wire_bytes >= _MIN_THROUGHPUT_BYTES and transfer > 0:
+                rate = timing.wire_bytes / transfer
+                previous = state.bytes_per_second
+                state.bytes_per_second = rate if previous is None else previous + weight * (rate - previous)
+
+    def estimates(self, host: str) -> Dict[str, Optional[float]]:
+        """
+        Return the estimated seconds per decoded megabyte of each encoding for ``host``.
+
+        None for an encoding not measured yet.
+
+        :param host: Host name
+        """
+        with self.__lock:
+            state = self.__host(host)
+            return {
+                name: self.__cost(state, stats) * 1_000_000 if stats.samples else None
+                for name, stats in state.encodings.items()
+            }
@@ -1,22 +1,26 @@
 # -*- coding: utf-8 -*-
 
-import json
+import functools
 import logging
 import math
 import re
 import unicodedata
 from enum import Enum
-from typing import Dict, Iterable, List, Optional, Union
-
-from bs4 import BeautifulSoup
+from html.entities import name2codepoint
+from html.parser import HTMLParser
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
 from .entities.airport import Airport
+from .entities.flight import Flight
+from .json_stream import ITEM, JSONStream, iter_chunks
 
 _logger = logging.getLogger(__name__)
 
 # ASCII only: \d would otherwise match Unicode digits such as "٤٣".
 NUMERIC_PATTERN = re.compile(r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$", re.ASCII)
 
+NON_SLUG_PATTERN = re.compile(r"[^a-z0-9]+")
+
 # str.strip() and trim() disagree on U+001C-U+001F and U+FEFF: pick one set.
 SURROUNDING_SPACE = " \t\n\r\f\v"
 
@@ -24,17 +28,301 @@ SURROUNDING_SPACE = " \t\n\r\f\v"
 MAX_EXACT_INTEGER = 2 ** 53 - 1
 
 
-def parse_airlines_html(html: bytes) -> List[Dict]:
+# Elements html.parser never holds content in: they close as soon as they open.
+_VOID_ELEMENTS = frozenset({
+    "area", "base", "basefont", "bgsound", "br", "col", "command", "embed", "frame", "hr", "image", "img",
+    "input", "isindex", "keygen", "link", "menuitem", "meta", "nextid", "param", "source", "spacer", "track", "wbr",
+})
+
+# Inside the airlines table these only turn up on a page the fast path does not
+# know: BeautifulSoup decides what their nesting or text means.
+_STRUCTURAL_ELEMENTS = frozenset({"table", "tbody", "thead", "tfoot", "tr", "td", "a"})
+_RAW_TEXT_ELEMENTS = frozenset({
+    "iframe", "noembed", "noframes", "noscript", "plaintext", "script", "style", "template", "textarea", "title", "xmp",
+})
+
+_CHARSET_PATTERN = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?([-\w.:]+)", re.IGNORECASE)
+
+# Feed size while scanning, so the scan can stop at the end of the table.
+_HTML_CHUNK_SIZE = 64 * 1024
+
+
+class _UnexpectedMarkup(Exception):
+    """The airlines table is not shaped the way the fast path reads it."""
+
+
+class _AirlinesTableParser(HTMLParser):
     """
-    Parse the airlines listing HTML page into a list of airline dicts.
+    Read the rows of the first ``<tbody>`` straight off the tokenizer.
+
+    Nothing is built but the text of the cells: each row is kept as the text of
+    its ``<td>`` elements plus the airline link of its "notranslate" cell, which
+    is all ``parse_airlines_html`` looks at. Text is gathered the way
+    ``get_text(strip=True)`` does it, one stripped run between tags at a time.
+
+    The table is trusted only while it is well formed. Anything whose meaning
+    depends on how BeautifulSoup repairs markup raises ``_UnexpectedMarkup``.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=False)
+
+        self.found = False
+        self.done = False
+        self.rows: List[Tuple[Optional[str], List[str]]] = []
+
+        self.__stack: List[str] = []
+        self.__data: List[str] = []
+        self.__cells: Optional[List[str]] = None
+        self.__cell: Optional[List[str]] = None
+        self.__link: Optional[List[str]] = None
+        self.__name: Optional[str] = None
+        self.__link_cell = -1
+
+    def __flush(self) -> None:
+        """Close the current run of text and hand it to the open cell and link."""
+        if not self.__data:
+            return
+
+        text = "".join(self.__data).strip()
+        self.__data = []
+
+        if text:
+            if self.__cell is not None:
+                self.__cell.append(text)
+
+            if self.__link is not None:
+                self.__link.append(text)
+
+    def __tracking(self) -> bool:
+        return self.found and not self.done
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if not self.__tracking():
+            if tag == "tbody" and not self.found:
+                self.found = True
+                self.__stack.append(tag)
+            return
+
+        self.__flush()
+
+        if tag in _RAW_TEXT_ELEMENTS or (tag in _STRUCTURAL_ELEMENTS and tag in self.__stack):
+            raise _UnexpectedMarkup(tag)
+
+        if tag in _VOID_ELEMENTS:
+            return
+
+        self.__stack.append(tag)
+
+        if tag == "tr":
+            self.__cells = []
+            self.__name = None
+            self.__link_cell = -1
+
+        elif tag == "td" and self.__cells is not None:
+            self.__cell = []
+            self.__cells.append("")
+
+            # Duplicate attributes: the last one wins, as in BeautifulSoup.
+            classes = (dict(attrs).get("class") or "").split()
+
+            if self.__link_cell < 0 and "notranslate" in classes:
+                self.__link_cell = len(self.__cells) - 1
+
+        elif tag == "a" and self.__cell is not None and self.__name is None:
+            href = dict(attrs).get("href") or ""
+
+            if self.__link_cell == len(self.__cells or ()) - 1 and href.startswith("/data/airlines"):
+                self.__link = []
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self.handle_starttag(tag, attrs)
+
+        if tag not in _VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if not self.__tracking():
+            return
+
+        self.__flush()
+
+        # A stray or implied end tag closes whatever BeautifulSoup decides it does.
+        if not self.__stack or self.__stack[-1] != tag:
+            raise _UnexpectedMarkup(tag)
+
+        self.__stack.pop()
+
+        if tag == "a" and self.__link is not None:
+            self.__name = "".join(self.__link)
+            self.__link = None
+
+        elif tag == "td" and self.__cell is not None and self.__cells is not None:
+            self.__cells[-1] = "".join(self.__cell)
+            self.__cell = None
+
+        elif tag == "tr" and self.__cells is not None:
+            self.rows.append((self.__name, self.__cells))
+            self.__cells = None
+
+        elif tag == "tbody":
+            self.done = True
+
+    def handle_data(self, data: str) -> None:
+        if self.__tracking():
+            self.__data.append(data)
+
+    def handle_entityref(self, name: str) -> None:
+        if not self.__tracking():
+            return
+
+        # BeautifulSoup knows a longer list: past the HTML 4 set, defer to it.
+        if name not in name2codepoint:
+            raise _UnexpectedMarkup(f"&{name};")
+
+        self.__data.append(chr(name2codepoint[name]))
+
+    def handle_charref(self, name: str) -> None:
+        if not self.__tracking():
+            return
+
+        try:
+            codepoint = int(name[1:], 16) if name[:1] in ("x", "X") else int(name)
+        except ValueError:
+            raise _UnexpectedMarkup(f"&#{name};")
+
+        # C1 controls are read as windows-1252, and NUL or surrogates replaced:
+        # leave those repairs to BeautifulSoup.
+        if not 0 < codepoint < 0x110000 or 0x80 <= codepoint <= 0x9F or 0xD800 <= codepoint <= 0xDFFF:
+            raise _UnexpectedMarkup(f"&#{name};")
+
+        self.__data.append(chr(codepoint))
+
+    def handle_comment(self, data: str) -> None:
+        # Not text, but it does end the current run of text.
+        if self.__tracking():
+            self.__flush()
+
+    def handle_decl(self, decl: str) -> None:
+        if self.__tracking():
+            raise _UnexpectedMarkup(decl)
+
+    def handle_pi(self, data: str) -> None:
+        if self.__tracking():
+            raise _UnexpectedMarkup(data)
+
+    def unknown_decl(self, data: str) -> None:
+        if self.__tracking():
+            raise _UnexpectedMarkup(data)
+
+
+def _decode_html(html: Union[bytes, str]) -> str:
+    """Decode the page as UTF-8, or raise _UnexpectedMarkup if it may be something else."""
+    if isinstance(html, str):
+        return html
+
+    if not html.isascii():
+        match = _CHARSET_PATTERN.search(html)
+
+        if match and match.group(1).lower() not in (b"utf-8", b"utf8"):
+            raise _UnexpectedMarkup(match.group(1).decode("ascii"))
+
+    try:
+        return html.decode("utf-8-sig")
+    except UnicodeDecodeError as error:
+        raise _UnexpectedMarkup(str(error))
+
+
+def _airline_entry(airline_name: str, codes_text: Optional[str], aircrafts_text: Optional[str]) -> Optional[Dict]:
+    """Build an airline dict from the text of its row, or None for a row that is not an airline."""
+    if len(airline_name) < 2:
+        return None
+
+    iata = None
+    icao = None
+
+    if codes_text is not None:
+        if " / " in codes_text:
+            parts = codes_text.split(" / ")
+            if len(parts) == 2:
+                iata = parts[0].strip()
+                icao = parts[1].strip()
+        elif len(codes_text) == 2:
+            iata = codes_text
+        elif len(codes_text) == 3:
+            icao = codes_text
+
+    n_aircrafts = None
+
+    if aircrafts_text:
+        n_aircrafts = int(aircrafts_text.split(" ", maxsplit=1)[0].strip())
+
+    return {"Name": airline_name, "ICAO": icao, "IATA": iata, "n_aircrafts": n_aircrafts}
+
+
+def _warn_missing_airlines_table() -> None:
+    _logger.warning(
+        "parse_airlines_html: no <tbody> in response — FR24 page layout may have changed."
+    )
+
+
+def _parse_airlines_html_fast(html: Union[bytes, str]) -> List[Dict]:
+    """
+    Parse the airlines table without building a document tree.
+
+    Raises _UnexpectedMarkup when the page needs BeautifulSoup to be read right.
     """
+    text = _decode_html(html)
+    parser = _AirlinesTableParser()
+
+    # The table sits near the top of a long page: stop reading once it closes.
+    for start in range(0, len(text), _HTML_CHUNK_SIZE):
+        parser.feed(text[start:start + _HTML_CHUNK_SIZE])
+
+        if parser.done:
+            break
+    else:
+        parser.close()
+
+    if not parser.found:
+        _warn_missing_airlines_table()
+        return []
+
+    if not parser.done:
+        raise _UnexpectedMarkup("unclosed <tbody>")
+
+    airlines = []
+
+    for airline_name, cells in parser.rows:
+        if airline_name is None:
+            continue
+
+        entry = _airline_entry(
+            airline_name,
+            cells[3] if len(cells) >= 4 else None,
+            cells[4] if len(cells) >= 5 else None,
+        )
+
+        if entry is not None:
+            airlines.append(entry)
+
+    return airlines
+
+
+def _parse_airlines_html_soup(html: Union[bytes, str]) -> List[Dict]:
+    """
+    Parse the airlines table from a full BeautifulSoup tree.
+
+    Slow on the real page, but reads whatever markup BeautifulSoup can repair.
+    """
+    # Imported on first use: the fast path reads the usual page without it.
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html, "html.parser")
     tbody = soup.find("tbody")
 
     if not tbody:
-        _logger.warning(
-            "parse_airlines_html: no <tbody> in response — FR24 page layout may have changed."
-        )
+        _warn_missing_airlines_table()
         return []
 
     airlines = []
@@ -50,38 +338,34 @@ def parse_airlines_html(html: bytes) -> List[Dict]:
         if not a_element:
             continue
 
-        airline_name = a_element.get_text(strip=True)
-
-        if len(airline_name) < 2:
-            continue
-
         td_elements = tr.find_all("td")
-        iata = None
-        icao = None
 
-        if len(td_elements) >= 4:
-            codes_text = td_elements[3].get_text(strip=True)
+        entry = _airline_entry(
+            a_element.get_text(strip=True),
+            td_elements[3].get_text(strip=True) if len(td_elements) >= 4 else None,
+            td_elements[4].get_text(strip=True) if len(td_elements) >= 5 else None,
+        )
 
-            if " / " in codes_text:
-                parts = codes_text.split(" / ")
-                if len(parts) == 2:
-                    iata = parts[0].strip()
-                    icao = parts[1].strip()
-            elif len(codes_text) == 2:
-                iata = codes_text
-            elif len(codes_text) == 3:
-                icao = codes_text
+        if entry is not None:
+            airlines.append(entry)
 
-        n_aircrafts = None
+    return airlines
 
-        if len(td_elements) >= 5:
-            aircrafts_text = td_elements[4].get_text(strip=True)
-            if aircrafts_text:
-                n_aircrafts = int(aircrafts_text.split(" ", maxsplit=1)[0].strip())
 
-        airlines.append({"Name": airline_name, "ICAO": icao, "IATA": iata, "n_aircrafts": n_aircrafts})
+def parse_airlines_html(html: bytes) -> List[Dict]:
+    """
+    Parse the airlines listing HTML page into a list of airline dicts.
 
-    return airlines
+    The table is read straight off the tokenizer, which is several times
+    faster than building the page's tree. Markup the fast path cannot be sure
+    of reading as BeautifulSoup would is handed to BeautifulSoup instead.
+    """
+    try:
+        return _parse_airlines_html_fast(html)
+    except _UnexpectedMarkup as error:
+        _logger.debug("parse_airlines_html: falling back to BeautifulSoup (%s)", error)
+
+    return _parse_airlines_html_soup(html)
 
 
 def country_to_slug(country: object) -> str:
@@ -90,18 +374,30 @@ def country_to_slug(country: object) -> str:
     rows can be matched against the Countries enum ("United States" -> "united-states").
     """
     # `.value` unwraps a Countries member, which str() would render as
-    # "Countries.BRAZIL". Diacritics are stripped so a future "Curaçao" still
-    # matches "curacao"; `is None` rather than truthiness because str(0 or "") is
-    # "" here while String(0 ?? "") is "0" in Node.
+    # "Countries.BRAZIL". `is None` rather than truthiness because str(0 or "")
+    # is "" here while String(0 ?? "") is "0" in Node.
     if isinstance(country, Enum):
         country = country.value
 
-    decomposed = unicodedata.normalize("NFKD", "" if country is None else str(country))
+    return _slugify("" if country is None else str(country))
+
+
+# Bounded, though the feed only spells a few hundred countries: the argument is
+# whatever a caller passes, and an unbounded cache would keep all of it.
+@functools.lru_cache(maxsize=1024)
+def _slugify(text: str) -> str:
+    """
+    Slugify ``text`` for country_to_slug(...), memoised: the airports feed repeats
+    each country name across thousands of rows, and normalising one is the
+    costliest step of a filtered parse.
+    """
+    # Diacritics are stripped so a future "Curaçao" still matches "curacao".
+    decomposed = unicodedata.normalize("NFKD", text)
     ascii_only = "".join(char for char in decomposed if not unicodedata.combining(char))
 
     # Punctuation becomes a hyphen rather than being deleted: FR24's own assets are
     # named that way, e.g. flags-small/cote-d-ivoire.svg.
-    return re.sub(r"[^a-z0-9]+", "-", ascii_only.lower()).strip("-")
+    return NON_SLUG_PATTERN.sub("-", ascii_only.lower()).strip("-")
 
 
 def _to_text(value: object) -> str:
@@ -160,47 +456,64 @@ def _to_number(value: object) -> Optional[Union[int, float]]:
     return exact if exact == number and abs(exact) <= MAX_EXACT_INTEGER else number
 
 
-def parse_airports_json(
-    payload: Union[bytes, str, Dict], countries: Optional[Iterable[object]] = None,
-) -> List[Airport]:
+def _airport_rows(payload: Union[bytes, str, Dict, Iterable[bytes]]) -> Iterator[object]:
     """
-    Parse the airports JSON feed into a list of Airport instances.
+    Yield the rows of the airports feed as they are decoded.
 
-    :param payload: Body of Core.airports_json_url.
-    :param countries: Country slugs, or Countries members. Every airport is kept when omitted.
+    Raises ValueError for a body that is not JSON, and LookupError for JSON
+    with no "rows" array.
     """
-    if isinstance(payload, (bytes, str)):
-        try:
-            data = json.loads(payload)
-        except ValueError:
-            _logger.warning("parse_airports_json: response is not valid JSON — FR24 feed may have changed.")
-            return []
-    else:
-        data = payload
+    if isinstance(payload, dict):
+        rows = payload.get("rows")
 
-    rows = data.get("rows") if isinstance(data, dict) else None
+        if not isinstance(rows, list):
+            raise LookupError('no "rows" array')
 
-    if not isinstance(rows, list):
-        _logger.warning('parse_airports_json: no "rows" array in response — FR24 feed may have changed.')
-        return []
+        yield from rows
+        return
+
+    # Streamed row by row: the document is never decoded whole, so peak memory
+    # is the body plus one row rather than the body plus a tree of every row.
+    stream = JSONStream(expand=("rows",))
+
+    for chunk in iter_chunks(payload):
+        for event, key, value in stream.feed(chunk):
+            if event == ITEM and key == "rows":
+                yield value
+
+    for event, key, value in stream.close():
+        if event == ITEM and key == "rows":
+            yield value
 
-    wanted = {country_to_slug(country) for country in countries} if countries is not None else None
-    matched = set()
-    unpositioned = []
-    airports = []
+    if "rows" not in stream.expanded:
+        raise LookupError('no "rows" array')
 
-    for row in rows:
+
+class _AirportBuilder:
+    """
+    Turns rows of the airports feed into Airports, one row at a time.
+
+    :param countries: Country slugs, or Countries members. Every airport is kept when None.
+    """
+
+    def __init__(self, countries: Optional[Iterable[object]]) -> None:
+        self.__wanted = {country_to_slug(country) for country in countries} if countries is not None else None
+        self.__matched: Set[str] = set()
+        self.__unpositioned: List[str] = []
+
+    def build(self, row: object) -> Optional[Airport]:
+        """Return the airport of a row, or None for a row skipped."""
         if not isinstance(row, dict):
-            continue
+            return None
 
-        # Slugified only when filtering: it is otherwise unused, and this loop
-        # runs over every airport in the feed.
-        if wanted is not None:
+        # Slugified only when filtering: it is otherwise unused, and this runs
+        # over every airport in the feed.
+        if self.__wanted is not None:
             slug = country_to_slug(row.get("country"))
 
-            if slug not in wanted:
-                continue
-            matched.add(slug)
+            if slug not in self.__wanted:
+                return None
+            self.__matched.add(slug)
 
         latitude = _to_number(row.get("lat"))
         longitude = _to_number(row.get("lon"))
@@ -208,9 +521,9 @@ def parse_airports_json(
         # One bad coordinate drops both: half a position reads as located.
         if latitude is None or longitude is None:
             latitude = longitude = None
-            unpositioned.append(_to_text(row.get("name")))
+            self.__unpositioned.append(_to_text(row.get("name")))
 
-        airports.append(Airport(basic_info={
+        return Airport(basic_info={
             "name": _to_text(row.get("name")),
             "icao": _to_text(row.get("icao")),
             "iata": _to_text(row.get("iata")),
@@ -218,22 +531,198 @@ def parse_airports_json(
             "lon": longitude,
             "alt": _to_number(row.get("alt")),
             "country": _to_text(row.get("country")),
-        }))
-
-    # One line, not one per row: the feed carries every airport.
-    if unpositioned:
-        _logger.warning(
-            "parse_airports_json: %d airport(s) had unusable coordinates and carry no position (e.g. %s).",
-            len(unpositioned), ", ".join(repr(name) for name in unpositioned[:3]),
-        )
+        })
 
-    if wanted is not None:
-        missing = sorted(wanted - matched)
-
-        if missing:
+    def finish(self) -> None:
+        """Log what the rows lacked, once every row was built."""
+        # One line, not one per row: the feed carries every airport.
+        if self.__unpositioned:
             _logger.warning(
-                "parse_airports_json: no airports found for %s — check the Countries enum.",
-                ", ".join(missing),
+                "parse_airports_json: %d airport(s) had unusable coordinates and carry no position (e.g. %s).",
+                len(self.__unpositioned), ", ".join(repr(name) for name in self.__unpositioned[:3]),
             )
 
-    return airports
+        if self.__wanted is not None:
+            missing = sorted(self.__wanted - self.__matched)
+
+            if missing:
+                _logger.warning(
+                    "parse_airports_json: no airports found for %s — check the Countries enum.",
+                    ", ".join(missing),
+                )
+
+
+def _iter_airports(
+    payload: Union[bytes, str, Dict, Iterable[bytes]], countries: Optional[Iterable[object]],
+) -> Iterator[Airport]:
+    """Yield the airports of the feed, raising as _airport_rows(...) does."""
+    builder = _AirportBuilder(countries)
+
+    for row in _airport_rows(payload):
+        airport = builder.build(row)
+
+        if airport is not None:
+            yield airport
+
+    builder.finish()
+
+
+def _warn_unreadable_airports(error: Exception) -> None:
+    if isinstance(error, LookupError):
+        _logger.warning('parse_airports_json: no "rows" array in response — FR24 feed may have changed.')
+    else:
+        _logger.warning("parse_airports_json: response is not valid JSON — FR24 feed may have changed.")
+
+
+def iter_airports_json(
+    payload: Union[bytes, str, Dict, Iterable[bytes]], countries: Optional[Iterable[object]] = None,
+) -> Iterator[Airport]:
+    """
+    Yield the Airport instances of the airports JSON feed as its rows are decoded.
+
+    Rows outside ``countries`` are skipped before any of their fields are
+    coerced or an Airport is built. Unlike parse_airports_json(...), a body
+    found malformed part-way ends the iteration after the airports already
+    yielded, with the same warning.
+
+    :param payload: Body of Core.airports_json_url, or an iterable of its chunks as they arrive.
+    :param countries: Country slugs, or Countries members. Every airport is kept when omitted.
+    """
+    try:
+        yield from _iter_airports(payload, countries)
+    except (ValueError, LookupError) as error:
+        _warn_unreadable_airports(error)
+
+
+def parse_airports_json(
+    payload: Union[bytes, str, Dict, Iterable[bytes]], countries: Optional[Iterable[object]] = None,
+) -> List[Airport]:
+    """
+    Parse the airports JSON feed into a list of Airport instances.
+
+    :param payload: Body of Core.airports_json_url, or an iterable of its chunks as they arrive.
+    :param countries: Country slugs, or Countries members. Every airport is kept when omitted.
+    """
+    try:
+        return list(_iter_airports(payload, countries))
+    except (ValueError, LookupError) as error:
+        # Nothing rather than the airports read before the fault.
+        _warn_unreadable_airports(error)
+        return []
+
+
+class AirportFeedParser:
+    """
+    Builds the airports of the airports JSON feed as its body is decoded.
+
+    The push counterpart of iter_airports_json(...), for APIRequest's
+    ``body_parser``: the body is fed in as it arrives and each row becomes an
+    Airport as soon as it is parsed, so neither the text nor a tree of every
+    row is ever held. Like parse_airports_json(...), a malformed body warns and
+    yields no airports rather than raising.
+
+    :param countries: Country slugs, or Countries members. Every airport is kept when omitted.
+    """
+
+    def __init__(self, countries: Optional[Iterable[object]] = None):
+        self.__stream = JSONStream(expand=("rows",))
+        self.__builder = _AirportBuilder(countries)
+        self.__error: Optional[Exception] = None
+
+        #: The airports built so far.
+        self.airports: List[Airport] = []
+
+    def __take(self, events: List[Tuple[str, str, Any]]) -> None:
+        for event, key, value in events:
+            if event == ITEM and key == "rows":
+                airport = self.__builder.build(value)
+
+                if airport is not None:
+                    self.airports.append(airport)
+
+    def feed(self, chunk: Union[bytes, str]) -> None:
+        """
+        Parse the next chunk of the body.
+
+        :param chunk: Next piece of the body
+        """
+        if self.__error is not None:
+            return
+
+        try:
+            self.__take(self.__stream.feed(chunk))
+        except ValueError as error:
+            self.__error = error
+
+    def close(self) -> List[Airport]:
+        """
+        Return the airports of the feed, or none when it was malformed.
+        """
+        try:
+            if self.__error is not None:
+                raise self.__error
+
+            self.__take(self.__stream.close())
+
+            if "rows" not in self.__stream.expanded:
+                raise LookupError('no "rows" array')
+        except (ValueError, LookupError) as error:
+            # Nothing rather than the airports read before the fault.
+            _warn_unreadable_airports(error)
+            return []
+
+        self.__builder.finish()
+        return self.airports
+
+
+class FlightFeedParser:
+    """
+    Builds the flights of a real-time feed (feed.js) body as it is decoded.
+
+    For APIRequest's ``body_parser``. Each flight is a top-level member of the
+    feed, so it is built as soon as its row is parsed, and the decoded text is
+    never held beyond the row being read.
+
+    :param build: Called with the id and row of each flight; Flight by default.
+        Any callable taking the same two arguments will do, such as the append
+        of a columnar store that never builds a Flight at all.
+    """
+
+    def __init__(self, build: Callable[[str, List[Any]], Any] = Flight):
+        self.__stream = JSONStream()
+        self.__build = build
+
+        #: What ``build`` returned for each flight, in feed order.
+        self.flights: List[Any] = []
+
+        #: The other top-level members: "full_count", "version", "stats", ...
+        self.members: Dict[str, Any] = {}
+
+    def __take(self, events: List[Tuple[str, str, Any]]) -> None:
+        for _, key, value in events:
+            # Flights are keyed by their id, which starts with a digit.
+            if key[:1].isnumeric():
+                self.flights.append(self.__build(key, value))
+            else:
+                self.members[key] = value
+
+    def feed(self, chunk: Union[bytes, str]) -> None:
+        """
+        Parse the next chunk of the body.
+
+        :param chunk: Next piece of the body
+        """
+        self.__take(self.__stream.feed(chunk))
+
+    def close(self) -> "FlightFeedParser":
+        """
+        Finish parsing and return this parser, its flights complete.
+
+        Raises ValueError when the body is malformed or not a JSON object.
+        """
+        self.__take(self.__stream.close())
+
+        if not self.__stream.is_object:
+            raise ValueError("The feed is not a JSON object.")
+
+        return self
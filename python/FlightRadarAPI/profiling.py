@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+import cProfile
+import functools
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+import tracemalloc
+from collections import deque
+from typing import Any, Callable, Deque, Iterable, Optional, TypeVar
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_METHODS = ("get_flights", "get_airports", "get_flight_details")
+
+# Frames tracemalloc keeps per allocation: enough to tell the parser from the entity.
+TRACEMALLOC_FRAMES = 10
+
+_Method = TypeVar("_Method", bound=Callable[..., Any])
+
+
+class Profiler:
+    """
+    Samples calls of FlightRadar24API methods and saves a profile of each sampled one.
+
+    A sampled call runs under cProfile, and with ``memory`` under tracemalloc
+    as well. Its stats are written to ``directory`` as "<time>-<method>-<n>.prof",
+    readable with pstats or snakeviz, and the tracemalloc snapshot taken as it
+    returns as ".tracemalloc", readable with tracemalloc.Snapshot.load(). Only
+    the newest ``max_files`` files this profiler wrote are kept.
+
+    One call is profiled at a time, process-wide: a call made while another is
+    being profiled, such as the get_flight_details() calls a sampled
+    get_flights(details=True) makes, runs unprofiled. cProfile sees the thread
+    that made the call only, so the work of the threads it fans out to is not
+    in its stats.
+
+    :param directory: Where the profiles are written; created if missing
+    :param sample_rate: Fraction of the calls profiled, from 0 to 1
+    :param methods: Names of the FlightRadar24API methods to sample
+    :param memory: Also trace allocations, which slows the sampled call down several times
+    :param max_files: Number of files kept before the oldest are deleted
+    :param seed: Seed of the sampling, for reproducible runs
+    """
+
+    __active = threading.Lock()
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        sample_rate: float = 0.01,
+        methods: Iterable[str] = DEFAULT_METHODS,
+        memory: bool = False,
+        max_files: int = 100,
+        seed: Optional[int] = None,
+    ):
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1.")
+
+        if max_files < 1:
+            raise ValueError("max_files must be >= 1.")
+
+        os.makedirs(directory, exist_ok=True)
+
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.methods = frozenset(methods)
+        self.memory = memory
+        self.max_files = max_files
+
+        #: Calls profiled so far.
+        self.profiled = 0
+
+        self.__rng = random.Random(seed)
+        self.__sequence = itertools.count(1)
+        self.__files: Deque[str] = deque()
+        self.__files_lock = threading.Lock()
+
+    def should_sample(self, method: str) -> bool:
+        """
+        Decide whether to profile this call of ``method``.
+
+        :param method: Name of the method being called
+        """
+        return method in self.methods and self.__rng.random() < self.sample_rate
+
+    def run(self, method: str, function: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Call ``function`` and save its profile, unless another call is being profiled.
+
+        :param method: Name of the method, for the file names
+        :param function: The call to profile
+        """
+        if not self.__active.acquire(blocking=False):
+            return function(*args, **kwargs)
+
+        try:
+            return self.__profile(method, function, *args, **kwargs)
+        finally:
+            self.__active.release()
+
+    def __profile(self, method: str, function: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        stem = os.path.join(self.directory, f"{int(time.time() * 1000)}-{method}-{next(self.__sequence)}")
+
+        # Someone else's tracing is left running, and their traces end up in the snapshot too.
+        started_tracing = self.memory and not tracemalloc.is_tracing()
+
+        if started_tracing:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+
+        profile = cProfile.Profile()
+        profile.enable()
+
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profile.disable()
+            snapshot = tracemalloc.take_snapshot() if self.memory else None
+
+            if started_tracing:
+                tracemalloc.stop()
+
+            # A profile that cannot be written must not fail the call it profiled.
+            try:
+                self.__save(profile.dump_stats, stem + ".prof")
+
+                if snapshot is not None:
+                    self.__save(snapshot.dump, stem + ".tracemalloc")
+            except OSError:
+                _logger.exception("Profiler: could not write the profile of %s to %s.", method, self.directory)
+
+            self.profiled += 1
+
+    def __save(self, dump: Callable[[str], None], path: str) -> None:
+        dump(path)
+
+        with self.__files_lock:
+            self.__files.append(path)
+            expired = [self.__files.popleft() for _ in range(len(self.__files) - self.max_files)]
+
+        for old in expired:
+            try:
+                os.remove(old)
+            except FileNotFoundError:
+                pass
+
+
+def profiled(method: _Method) -> _Method:
+    """
+    Let the profiler of a FlightRadar24API sample calls of this method.
+
+    Costs one attribute lookup per call while profiling is off.
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        profiler: Optional[Profiler] = self.profiler
+
+        if profiler is None or not profiler.should_sample(name):
+            return method(self, *args, **kwargs)
+
+        return profiler.run(name, method, self, *args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
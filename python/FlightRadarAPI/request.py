@@ -1,18 +1,43 @@
 # -*- coding: utf-8 -*-
 
+import abc
+import datetime
+import email.utils
+import importlib.util
+import io
+import itertools
 import json
 import logging
 import random
+import threading
 import time
 import zlib
-from typing import Any, Dict, List, Optional, Union
-from urllib.parse import urlencode
-
-import brotli
-from curl_cffi import CurlECode, CurlOpt, requests
-from curl_cffi.requests import Session
-
-from .errors import CloudflareError, DecompressionLimitError
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import urlencode, urlsplit
+
+from curl_cffi import CurlECode, CurlInfo, CurlOpt, requests
+from curl_cffi.curl import CURL_WRITEFUNC_ERROR
+from curl_cffi.requests import Headers, Session
+
+from .cassette import Cassette, set_response_cookies
+from .circuit import OPEN, CircuitBreaker
+from .deadline import Deadline
+from .errors import CloudflareError, DeadlineExceededError, DecompressionLimitError
+from .json_backends import JSONLoads, get_json_loads
+from .json_stream import iter_chunks
+from .negotiation import EncodingNegotiator
+from .scheduler import NORMAL, RequestScheduler, current_priority
+from .timing import (
+    CIRCUIT_OPENED,
+    RETRY_BUDGET_EXHAUSTED,
+    EventHook,
+    RequestHook,
+    RequestMonitor,
+    RequestTiming,
+    endpoint_name,
+)
 
 _logger = logging.getLogger(__name__)
 
@@ -25,17 +50,45 @@ DEFAULT_IMPERSONATE = "chrome136"
 # away from libcurl (see `_keep_body_encoded`): left to itself it expands the body
 # before any of this code runs, and the only other way to intervene —
 # `stream=True` — was measured to cost more than the bomb it stops: `timeout`
-# degrades to a >=1 byte/sec liveness check, which alone rules it out, and the
-# session stops reusing connections (the standalone path already opens one per
-# call, so that second cost lands on the session path only).
+# degrades to a >=1 byte/sec liveness check, which alone rules it out, and
+# sessions stop reusing connections.
+# What it would have bought, decoding while the body arrives, comes instead from
+# a write callback (`_BodySink`) on an ordinary blocking request.
 # Owning the decoding is why `deflate` is implemented below rather than left to
 # the transport: whatever `accept-encoding` advertises, this module must decode.
 MAX_RESPONSE_BYTES = 64 * 1024 * 1024
+DEFAULT_TIMEOUT = 30
 _ZLIB_WBITS = 15         # zlib-wrapped deflate, as RFC 9110 specifies
 _RAW_DEFLATE_WBITS = -15  # raw deflate, as many servers actually send
 _GZIP_WBITS = 31  # 16 + MAX_WBITS: gzip wrapper rather than raw deflate
 _GZIP_MAGIC = b"\x1f\x8b"
 
+# Templates an APIClient keeps before starting over; see APIClient.template().
+_MAX_TEMPLATES = 256
+
+# Sessions kept for standalone requests between uses, each with its open
+# connections and TLS sessions; a fan-out wider than this opens the rest anew.
+MAX_IDLE_SESSIONS = 16
+
+# Seconds an idle connection is kept for reuse. libcurl's own limit, 118, is
+# shorter than a poller's quiet spells, and than the keep-alive pings' interval
+# has to be to be cheap; the server still closes it when it likes.
+IDLE_CONNECTION_SECONDS = 300
+
+# get_content() has not parsed the body yet; None is a valid JSON document.
+_UNPARSED = object()
+
+# What a lean response keeps of the headers: enough to read its content type
+# and caching, and to tell a Cloudflare block from the origin's own error.
+LEAN_HEADERS = (
+    "Content-Type", "Content-Encoding", "Content-Length", "Date", "Age", "Cache-Control",
+    "ETag", "Last-Modified", "Retry-After", "Server", "cf-mitigated", "cf-ray",
+)
+
+# Of a failed response's body, a lean one keeps this much: a challenge page
+# says what it is in its first few hundred bytes.
+LEAN_ERROR_BODY_BYTES = 4096
+
 
 def _bound_download(session: Session, limit: int) -> None:
     """Have libcurl abort a response body larger than ``limit``.
@@ -47,6 +100,28 @@ def _bound_download(session: Session, limit: int) -> None:
     session.curl.setopt(CurlOpt.MAXFILESIZE_LARGE, limit)
 
 
+# libcurl's phase times, collected with every response; see `_read_curl_times`.
+_TIMING_INFOS = (
+    CurlInfo.NAMELOOKUP_TIME, CurlInfo.CONNECT_TIME, CurlInfo.APPCONNECT_TIME,
+    CurlInfo.STARTTRANSFER_TIME, CurlInfo.TOTAL_TIME,
+)
+
+
+def _read_curl_times(response: Any, timing: RequestTiming) -> None:
+    """Copy libcurl's phase times of a response into ``timing``.
+
+    Session.request resets the handle before returning, so the times cannot
+    be read off it afterwards: they come from the ``curl_infos`` the session
+    was created with, which curl_cffi copies into ``response.infos`` first.
+    """
+    infos = response.infos
+    timing.namelookup = infos.get(CurlInfo.NAMELOOKUP_TIME, 0.0)
+    timing.connect = infos.get(CurlInfo.CONNECT_TIME, 0.0)
+    timing.appconnect = infos.get(CurlInfo.APPCONNECT_TIME, 0.0)
+    timing.starttransfer = infos.get(CurlInfo.STARTTRANSFER_TIME, 0.0)
+    timing.total = infos.get(CurlInfo.TOTAL_TIME, 0.0)
+
+
 def _keep_body_encoded(session: Session) -> None:
     """Stop libcurl decompressing this session's next response.
 
@@ -63,6 +138,17 @@ def _keep_body_encoded(session: Session) -> None:
     session.curl.setopt(CurlOpt.HTTP_CONTENT_DECODING, 0)
 
 
+def _keep_connection_alive(session: Session) -> None:
+    """Keep this session's connection open for reuse after its next request.
+
+    TCP keep-alive holds it through NATs and load balancers while idle, and
+    libcurl reuses it for up to IDLE_CONNECTION_SECONDS. Per request, for the
+    reason given in `_keep_body_encoded`.
+    """
+    session.curl.setopt(CurlOpt.TCP_KEEPALIVE, 1)
+    session.curl.setopt(CurlOpt.MAXAGE_CONN, IDLE_CONNECTION_SECONDS)
+
+
 def _decompress_deflate(data: bytes, limit: int = MAX_RESPONSE_BYTES) -> bytes:
     """Inflate a deflate body in either shape it arrives in.
 
@@ -150,6 +236,9 @@ def _decompress_brotli(data: bytes, limit: int = MAX_RESPONSE_BYTES) -> bytes:
     the decoded size at peak, against 1x here — the usual single-piece response
     is returned without being copied at all.
     """
+    # Imported on first use: most processes never see a brotli body.
+    import brotli
+
     decompressor = brotli.Decompressor()
     pieces = []
     decoded = 0
@@ -184,14 +273,589 @@ def _decompress_brotli(data: bytes, limit: int = MAX_RESPONSE_BYTES) -> bytes:
     return pieces[0] if len(pieces) == 1 else b"".join(pieces)
 
 
+# zstd is an optional extra ("pip install FlightRadarAPI[zstd]"). Looked up
+# rather than imported, so the check costs nothing at import time.
+ZSTD_AVAILABLE = importlib.util.find_spec("zstandard") is not None
+
+
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_ZSTD_SKIPPABLE_MAGIC_TAIL = b"\x2a\x4d\x18"  # 0x184D2A5?, the low nibble free.
+
+
+def _zstd_frames_complete(data: bytes) -> bool:
+    """Tell whether ``data`` is a run of whole zstd frames.
+
+    zstandard's stream reader ends quietly at a truncated frame, so this walks
+    the frame and block headers (RFC 8878) to find out. That costs a few
+    reads per 128 KiB block, against decompressing the body a second time.
+    """
+    position = 0
+
+    while position < len(data):
+        magic = data[position:position + 4]
+
+        if len(magic) < 4:
+            return False
+
+        if magic[1:] == _ZSTD_SKIPPABLE_MAGIC_TAIL and magic[0] & 0xF0 == 0x50:
+            if position + 8 > len(data):
+                return False
+            position += 8 + int.from_bytes(data[position + 4:position + 8], "little")
+            continue
+
+        if magic != _ZSTD_MAGIC or position + 5 > len(data):
+            return False
+
+        descriptor = data[position + 4]
+        single_segment = descriptor >> 5 & 1
+        content_size_bytes = (single_segment, 2, 4, 8)[descriptor >> 6]
+        position += 5 + (not single_segment) + (0, 1, 2, 4)[descriptor & 3] + content_size_bytes
+
+        while True:
+            if position + 3 > len(data):
+                return False
+
+            header = int.from_bytes(data[position:position + 3], "little")
+            block_type, block_size = header >> 1 & 3, header >> 3
+
+            if block_type == 3:  # Reserved.
+                return False
+
+            # An RLE block stores its byte once, whatever size it expands to.
+            position += 3 + (1 if block_type == 1 else block_size)
+
+            if header & 1:  # Last block.
+                break
+
+        position += 4 * (descriptor >> 2 & 1)  # Content checksum.
+
+    return position == len(data)
+
+
+def _decompress_zstd(data: bytes, limit: int = MAX_RESPONSE_BYTES) -> bytes:
+    """Decompress zstd bytes, refusing a body that expands past ``limit``.
+
+    Read through a stream reader in bounded pieces, like the brotli helper, so
+    a frame that declares no content size, or lies about it, still stops at
+    ``limit``. Frames are read across, as a body may hold several.
+    """
+    import zstandard
+
+    reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data), read_across_frames=True)
+    pieces = []
+    decoded = 0
+
+    with reader:
+        while True:
+            piece = reader.read(limit + 1 - decoded)
+
+            if not piece:
+                break
+
+            pieces.append(piece)
+            decoded += len(piece)
+
+            if decoded > limit:
+                raise DecompressionLimitError(
+                    f"zstd body expands past the {limit} byte decompression limit."
+                )
+
+    # Same contract as the gzip helper: a partial body must not pass as whole.
+    if not _zstd_frames_complete(data):
+        raise zstandard.ZstdError("zstd stream ended mid-frame")
+
+    return pieces[0] if len(pieces) == 1 else b"".join(pieces)
+
+
+# Encodings decoded as libcurl delivers them, overlapping the decode with the
+# transfer; any other is collected and decoded once the transfer ends. zstd is
+# not among them: zstandard's decompressobj cannot cap the output of one call,
+# so a single chunk of a bomb would be expanded whole.
+_STREAMED_ENCODINGS = ("gzip", "br")
+
+
+# Whether _received_headers() has found the header buffer out of reach, and said so.
+_header_buffer_missing = False
+
+
+def _received_headers(curl: Any) -> Optional[bytes]:
+    """The raw response headers libcurl has delivered so far, or None if unreachable.
+
+    curl_cffi parses the headers only after the transfer and offers no hook
+    before it, so the buffer it writes them to is read off the handle's header
+    context: a private part of curl_cffi, checked against the versions
+    pyproject.toml allows. Should a release move it, this logs a warning, once,
+    and returns None, and the body is decoded after the transfer, as before
+    streaming existed.
+    """
+    global _header_buffer_missing
+
+    try:
+        from curl_cffi._wrapper import ffi
+
+        return ffi.from_handle(curl._header_handle).callback.getvalue()
+    except Exception as err:
+        if not _header_buffer_missing:
+            _header_buffer_missing = True
+            _logger.warning(
+                "APIRequest: cannot read the response headers during the transfer (%r) with this "
+                "curl_cffi; bodies are decoded once they have arrived whole instead of as they arrive.",
+                err,
+            )
+
+        return None
+
+
+def _final_response_head(raw_headers: bytes) -> Tuple[int, str]:
+    """The status and Content-Encoding of the last response in a header buffer.
+
+    Redirects and interim (1xx) responses come first in it, each opening with
+    its status line, and only the last response carries the body.
+    """
+    status = 0
+    values: List[str] = []
+
+    for line in raw_headers.splitlines():
+        if line.startswith(b"HTTP/"):
+            parts = line.split(None, 2)
+            status = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0
+            values = []
+            continue
+
+        name, _, value = line.partition(b":")
+
+        if name.strip().lower() == b"content-encoding":
+            values.append(value.decode("latin-1"))
+
+    return status, ",".join(values)
+
+
+class _StreamDecoder(abc.ABC):
+    """An incremental decoder with the expansion budget of the helpers above.
+
+    Decoded pieces are kept, or handed to ``consumer`` as they come and not
+    kept at all.
+    """
+
+    name = ""
+
+    def __init__(self, limit: int, consumer: Optional[Callable[[bytes], Any]] = None) -> None:
+        self.limit = limit
+        self.pieces: List[bytes] = []
+        self.decoded = 0
+        self.consumer = consumer
+
+        #: Seconds spent in ``consumer``.
+        self.consumer_seconds = 0.0
+
+    def _room(self) -> int:
+        """Output allowed from the next call: one byte past the budget reveals a breach."""
+        return self.limit + 1 - self.decoded
+
+    def _append(self, piece: bytes) -> None:
+        self.decoded += len(piece)
+
+        if self.decoded > self.limit:
+            raise DecompressionLimitError(
+                f"{self.name} body expands past the {self.limit} byte decompression limit."
+            )
+
+        if self.consumer is None:
+            self.pieces.append(piece)
+        elif piece:
+            started = time.perf_counter()
+            self.consumer(piece)
+            self.consumer_seconds += time.perf_counter() - started
+
+    @abc.abstractmethod
+    def feed(self, data: bytes) -> None:
+        """Decode the next chunk of the stream."""
+
+    @abc.abstractmethod
+    def finish(self) -> bytes:
+        """Return the body, raising if it ended before the stream did."""
+
+    def _joined(self) -> bytes:
+        return self.pieces[0] if len(self.pieces) == 1 else b"".join(self.pieces)
+
+
+class _IdentityStreamDecoder(_StreamDecoder):
+    """Passes an unencoded body through, for a consumer to parse as it arrives."""
+
+    name = "identity"
+
+    def feed(self, data: bytes) -> None:
+        self._append(data)
+
+    def finish(self) -> bytes:
+        return self._joined()
+
+
+class _GzipStreamDecoder(_StreamDecoder):
+    """`_decompress_gzip`, fed a chunk at a time."""
+
+    name = "gzip"
+
+    def __init__(self, limit: int, consumer: Optional[Callable[[bytes], Any]] = None) -> None:
+        super().__init__(limit, consumer)
+        self.__decompressor = zlib.decompressobj(_GZIP_WBITS)
+        self.__tail = b""
+        self.__padding = False
+
+    def feed(self, data: bytes) -> None:
+        while data and not self.__padding:
+            if self.__decompressor.eof:
+                # Another member only when the tail looks like one, which may
+                # take more than one chunk to tell; anything else is padding.
+                self.__tail += data
+
+                if len(self.__tail) < len(_GZIP_MAGIC):
+                    return
+
+                if not self.__tail.startswith(_GZIP_MAGIC):
+                    self.__padding = True
+                    return
+
+                data, self.__tail = self.__tail, b""
+                self.__decompressor = zlib.decompressobj(_GZIP_WBITS)
+
+            self._append(self.__decompressor.decompress(data, self._room()))
+            data = self.__decompressor.unconsumed_tail or self.__decompressor.unused_data
+
+    def finish(self) -> bytes:
+        if not self.__decompressor.eof:
+            raise zlib.error("gzip stream ended mid-member")
+
+        return self._joined()
+
+
+class _BrotliStreamDecoder(_StreamDecoder):
+    """`_decompress_brotli`, fed a chunk at a time."""
+
+    name = "brotli"
+
+    def __init__(self, limit: int, consumer: Optional[Callable[[bytes], Any]] = None) -> None:
+        super().__init__(limit, consumer)
+        import brotli
+
+        self.__brotli = brotli
+        self.__decompressor = brotli.Decompressor()
+
+    def feed(self, data: bytes) -> None:
+        decompressor = self.__decompressor
+        self._append(decompressor.process(data, self._room()))
+
+        # Output held back by the cap must be drained before more input is taken.
+        while not decompressor.is_finished() and not decompressor.can_accept_more_data():
+            piece = decompressor.process(b"", self._room())
+            self._append(piece)
+
+            if not piece:
+                break
+
+    def finish(self) -> bytes:
+        if not self.__decompressor.is_finished():
+            raise self.__brotli.error("brotli stream ended mid-message")
+
+        return self._joined()
+
+
+_STREAM_DECODERS = {"gzip": _GzipStreamDecoder, "br": _BrotliStreamDecoder}
+
+
+class _BodySink:
+    """
+    Write callback of a transfer: decodes the body as libcurl delivers it.
+
+    Installed as curl_cffi's ``content_callback``, which keeps the request an
+    ordinary blocking one: its timeout and the session's connection reuse are
+    unaffected, unlike with ``stream=True``. Each chunk goes through the
+    decoder on arrival, so the decode overlaps the transfer, and the budget
+    is enforced as the body expands: a breach aborts the transfer at once.
+
+    The raw chunks are kept only until the decoder yields its first byte. A
+    body it rejects before then, such as one a transport decoded after all,
+    is handed to the after-transfer path whole; an encoding that is not
+    streamed, or no encoding, goes there too.
+
+    With a ``consumer``, the decoded pieces of a successful (2xx) response go
+    to it instead of being kept, identity bodies included.
+
+    :param curl: Handle the transfer runs on, to read the headers from
+    :param limit: Decompression budget of the body
+    :param consumer: Receives the decoded body piece by piece
+    """
+
+    def __init__(self, curl: Any, limit: int, consumer: Optional[Callable[[bytes], Any]] = None) -> None:
+        self.__curl = curl
+        self.__limit = limit
+        self.__consumer = consumer
+        self.__raw: List[bytes] = []
+        self.__started = False
+
+        #: Bytes received on the wire.
+        self.received = 0
+
+        #: Seconds spent decoding inside the callback.
+        self.decode_seconds = 0.0
+
+        #: Why the transfer was aborted, to be raised in place of libcurl's write error.
+        self.error: Optional[BaseException] = None
+
+        #: The decoder, while the body is being decoded in flight.
+        self.decoder: Optional[_StreamDecoder] = None
+
+    def __start(self) -> None:
+        self.__started = True
+        headers = _received_headers(self.__curl)
+
+        if headers is None:
+            return
+
+        status, content_encoding = _final_response_head(headers)
+        tokens = [token.strip().lower() for token in content_encoding.split(",")]
+        applied = [token for token in tokens if token and token != "identity"]
+        consumer = self.__consumer if 200 <= status < 300 else None
+
+        if len(applied) == 1 and applied[0] in _STREAMED_ENCODINGS:
+            self.decoder = _STREAM_DECODERS[applied[0]](self.__limit, consumer)
+        elif not applied and consumer is not None:
+            self.decoder = _IdentityStreamDecoder(self.__limit, consumer)
+
+    @property
+    def consumed(self) -> bool:
+        """
+        Whether the body went to the consumer as it arrived.
+        """
+        return self.decoder is not None and self.decoder.consumer is not None
+
+    def __call__(self, chunk: bytes) -> int:
+        if not self.__started:
+            self.__start()
+
+        self.received += len(chunk)
+        decoder = self.decoder
+
+        if decoder is None:
+            self.__raw.append(chunk)
+            return len(chunk)
+
+        if not decoder.decoded:
+            self.__raw.append(chunk)
+
+        started = time.perf_counter()
+
+        try:
+            decoder.feed(chunk)
+        except DecompressionLimitError as err:
+            self.error = err
+            return CURL_WRITEFUNC_ERROR
+        except Exception as err:
+            if decoder.decoded:
+                self.error = err
+                return CURL_WRITEFUNC_ERROR
+
+            # Not what the header claims: left to the after-transfer fallback.
+            self.decoder = None
+        finally:
+            self.decode_seconds += time.perf_counter() - started
+
+        if self.decoder is not None and decoder.decoded:
+            self.__raw = []
+
+        return len(chunk)
+
+    @property
+    def started(self) -> bool:
+        """
+        Whether any of the body came through this callback.
+        """
+        return self.__started
+
+    def raw_body(self) -> bytes:
+        """
+        Return the body as received, when it was not decoded in flight.
+        """
+        return b"".join(self.__raw)
+
+
+class _LeanResponse:
+    """
+    What a lean APIRequest keeps of a response in place of curl_cffi's.
+
+    Has the attributes of it that this package and a failed request's error
+    are read for, and nothing that holds the body as received.
+    """
+
+    __slots__ = ("url", "status_code", "reason", "ok", "headers", "content")
+
+    def __init__(self, response: Any, content: bytes) -> None:
+        self.url: str = response.url
+        self.status_code: int = response.status_code
+        self.reason: str = response.reason
+        self.ok: bool = response.ok
+        self.headers = Headers({name: response.headers[name] for name in LEAN_HEADERS if name in response.headers})
+        self.content = content
+
+    def raise_for_status(self) -> None:
+        """Raise an HTTPError for a 4xx or 5xx status, as curl_cffi's response does."""
+        if not self.ok:
+            raise requests.exceptions.HTTPError(f"HTTP Error {self.status_code}: {self.reason}", 0, self)
+
+
+# Classes of transient failure RetryPolicy tells apart; see classify_error().
+RETRY_CLASSES = ("timeout", "connection", "server", "rate_limit", "cloudflare", "other")
+
+# libcurl errors of a connection that dropped, rather than one refused or timed out.
+_CONNECTION_CODES = frozenset({
+    CurlECode.COULDNT_CONNECT, CurlECode.SEND_ERROR, CurlECode.RECV_ERROR,
+    CurlECode.GOT_NOTHING, CurlECode.PARTIAL_FILE,
+})
+
+
+def classify_error(err: BaseException) -> Optional[str]:
+    """
+    Return the class in RETRY_CLASSES of a failed attempt, or None if it is not transient.
+
+    :param err: What the attempt raised
+    """
+    if isinstance(err, CloudflareError):
+        return "cloudflare"
+
+    if not isinstance(err, requests.errors.RequestsError):  # type: ignore[attr-defined]
+        return None
+
+    response = getattr(err, "response", None)
+    status = getattr(response, "status_code", 0) if response is not None else 0
+
+    if status == 429:
+        return "rate_limit"
+    if status >= 500:
+        return "server"
+    if isinstance(err, requests.exceptions.Timeout):
+        return "timeout"
+    if isinstance(err, requests.exceptions.ConnectionError) or getattr(err, "code", None) in _CONNECTION_CODES:
+        return "connection"
+
+    return "other"
+
+
+def _retry_after(err: BaseException) -> Optional[float]:
+    """Seconds the response of a failed attempt asked to wait with Retry-After, if it did."""
+    response = getattr(err, "response", None)
+    value = response.headers.get("Retry-After") if response is not None else None
+
+    if not value:
+        return None
+
+    value = value.strip()
+
+    if value.isdigit():
+        return float(value)
+
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    # A date without a zone is not valid HTTP; read it as UTC rather than fail.
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=datetime.timezone.utc)
+
+    return max(0.0, (when - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+
+class RetryBudget:
+    """
+    Caps the retries of a client to a share of its requests.
+
+    Over the last ``window`` seconds, retries may add at most ``ratio`` of the
+    requests made, plus ``min_retries`` so that a quiet client can still retry.
+    Past that, a failed attempt raises rather than retries: when every request
+    is failing, retrying each one only multiplies the load on a backend that
+    is already struggling. Shared by every thread of the client whose
+    RetryPolicy holds it; share the policy to share it across clients.
+
+    :param ratio: Retries allowed per request in the window
+    :param window: Length of the window, in seconds
+    :param min_retries: Retries allowed in the window whatever the requests
+    """
+
+    # The window moves in this many steps; counts older than it drop a bucket at a time.
+    __BUCKETS = 10
+
+    def __init__(self, ratio: float = 0.1, window: float = 10.0, min_retries: int = 3):
+        if ratio < 0 or window <= 0 or min_retries < 0:
+            raise ValueError("ratio and min_retries must be >= 0, and window > 0.")
+
+        self.ratio = ratio
+        self.window = window
+        self.min_retries = min_retries
+
+        #: Retries refused for want of budget so far.
+        self.exhausted = 0
+
+        self.__width = window / self.__BUCKETS
+        self.__buckets: Deque[List[float]] = deque()  # [start, requests, retries]
+        self.__requests = 0.0
+        self.__retries = 0.0
+        self.__lock = threading.Lock()
+
+    def __bucket(self) -> List[float]:
+        now = time.monotonic()
+
+        while self.__buckets and self.__buckets[0][0] <= now - self.window:
+            _, requests_, retries = self.__buckets.popleft()
+            self.__requests -= requests_
+            self.__retries -= retries
+
+        if not self.__buckets or self.__buckets[-1][0] + self.__width <= now:
+            self.__buckets.append([now, 0.0, 0.0])
+
+        return self.__buckets[-1]
+
+    def record_request(self) -> None:
+        """Count a request, which earns the retries ``ratio`` of one."""
+        with self.__lock:
+            self.__bucket()[1] += 1
+            self.__requests += 1
+
+    def try_spend(self) -> bool:
+        """Count a retry and return True if the budget allows one, else return False."""
+        with self.__lock:
+            bucket = self.__bucket()
+
+            if self.__retries >= self.min_retries + self.ratio * self.__requests:
+                self.exhausted += 1
+                return False
+
+            bucket[2] += 1
+            self.__retries += 1
+            return True
+
+
 class RetryPolicy:
     """
     Retry policy for transient errors (CloudflareError + curl_cffi network errors).
 
+    Failures are told apart by classify_error(): "timeout", "connection",
+    "server" (5xx), "rate_limit" (429), "cloudflare" and "other" (any other
+    curl_cffi error, 4xx included). Only the classes in ``retry_on`` are
+    retried, each after its own base delay if ``base_delays`` names one.
+
     :param max_attempts: total number of attempts including the first one (>= 1).
     :param base_delay: seconds for the first backoff sleep.
     :param max_delay: cap for the exponential backoff.
     :param jitter: random factor [0, jitter) added to each sleep.
+    :param retry_on: classes of failure to retry; every one by default.
+    :param base_delays: base delay of some classes, in place of ``base_delay``.
+    :param decorrelated_jitter: draw each sleep between the base delay and three
+        times the previous one, in place of doubling it and adding ``jitter``.
+        Spreads out the retries of threads that failed together.
+    :param respect_retry_after: sleep at least as long as a response's
+        Retry-After asks, and give up when it asks for more than ``max_retry_after``.
+    :param max_retry_after: longest Retry-After waited for, in seconds.
+    :param budget: RetryBudget capping the retries of every request made under this policy.
     """
 
     def __init__(
@@ -200,43 +864,180 @@ class RetryPolicy:
         base_delay: float = 1.0,
         max_delay: float = 30.0,
         jitter: float = 0.5,
+        *,
+        retry_on: Iterable[str] = RETRY_CLASSES,
+        base_delays: Optional[Dict[str, float]] = None,
+        decorrelated_jitter: bool = False,
+        respect_retry_after: bool = True,
+        max_retry_after: float = 120.0,
+        budget: Optional[RetryBudget] = None,
     ):
         if max_attempts < 1:
             raise ValueError("max_attempts must be >= 1")
         if base_delay < 0 or max_delay < 0 or jitter < 0:
             raise ValueError("base_delay, max_delay and jitter must all be >= 0")
+
+        base_delays = dict(base_delays or {})
+        unknown = (set(retry_on) | set(base_delays)) - set(RETRY_CLASSES)
+
+        if unknown:
+            raise ValueError(f"Unknown retry classes: {', '.join(sorted(unknown))}. Choose from {', '.join(RETRY_CLASSES)}.")
+        if any(delay < 0 for delay in base_delays.values()) or max_retry_after < 0:
+            raise ValueError("base_delays and max_retry_after must all be >= 0")
+
         self.max_attempts = max_attempts
         self.base_delay = base_delay
         self.max_delay = max_delay
         self.jitter = jitter
+        self.retry_on = frozenset(retry_on)
+        self.base_delays = base_delays
+        self.decorrelated_jitter = decorrelated_jitter
+        self.respect_retry_after = respect_retry_after
+        self.max_retry_after = max_retry_after
+        self.budget = budget
+
+    def sleep_for(self, attempt_index: int, error_class: Optional[str] = None, previous: Optional[float] = None) -> float:
+        """
+        Return the backoff (in seconds) for the given 0-based attempt index.
+
+        :param attempt_index: Attempts failed before this one
+        :param error_class: Class of the failure, for its base delay
+        :param previous: The sleep before the last attempt, for decorrelated jitter
+        """
+        base = self.base_delays.get(error_class, self.base_delay) if error_class is not None else self.base_delay
+
+        if self.decorrelated_jitter:
+            return min(self.max_delay, random.uniform(base, max(base, previous or base) * 3))
 
-    def sleep_for(self, attempt_index: int) -> float:
-        """Return the backoff (in seconds) for the given 0-based attempt index."""
-        delay = min(self.base_delay * (2 ** attempt_index), self.max_delay)
+        delay = min(base * (2 ** attempt_index), self.max_delay)
         return delay + random.uniform(0, self.jitter)
 
+    def delay_after(self, attempt_index: int, err: BaseException, previous: Optional[float] = None) -> Optional[float]:
+        """
+        Return how long to sleep before retrying a failed attempt, or None not to retry it.
+
+        The attempt count and the budget are left to the caller.
+
+        :param attempt_index: Attempts failed before this one
+        :param err: What the attempt raised
+        :param previous: The sleep before the last attempt, if any
+        """
+        error_class = classify_error(err)
 
-def _run_with_retry(fn, retry: Optional[RetryPolicy]):
-    """Execute ``fn()`` with retry on CloudflareError / transient network errors."""
-    if retry is None or retry.max_attempts <= 1:
+        if error_class is None or error_class not in self.retry_on:
+            return None
+
+        delay = self.sleep_for(attempt_index, error_class, previous)
+        retry_after = _retry_after(err) if self.respect_retry_after else None
+
+        if retry_after is not None:
+            # Back sooner than asked only gets refused again.
+            if retry_after > self.max_retry_after:
+                return None
+
+            delay = max(delay, retry_after)
+
+        return delay
+
+
+def _run_with_retry(
+    fn, retry: Optional[RetryPolicy], monitor: Optional[RequestMonitor] = None,
+    deadline: Optional[Deadline] = None,
+):
+    """Execute ``fn()`` with retry on CloudflareError / transient network errors.
+
+    Under a Deadline, a failure once it has passed, or a retry whose sleep
+    would outlast it, raises DeadlineExceededError from the failure.
+    """
+    attempts = retry.max_attempts if retry is not None else 1
+
+    if attempts <= 1 and deadline is None:
         return fn()
 
-    last_error: Optional[Exception] = None
-    for attempt in range(retry.max_attempts):
+    budget = retry.budget if retry is not None and attempts > 1 else None
+
+    if budget is not None:
+        budget.record_request()
+
+    previous: Optional[float] = None
+
+    for attempt in range(attempts):
         try:
             return fn()
-        except CloudflareError as err:
-            last_error = err
-        except requests.errors.RequestsError as err:  # type: ignore[attr-defined]
-            last_error = err
-        if attempt < retry.max_attempts - 1:
-            time.sleep(retry.sleep_for(attempt))
-    # Defensive: with max_attempts > 1, last_error is always populated by the
-    # time we reach here, but don't rely on `assert` because it is stripped by
-    # `python -O` and would turn into `raise None` -> TypeError.
-    if last_error is None:
-        raise RuntimeError("retry loop exited without success or captured error")
-    raise last_error
+        except (CloudflareError, requests.errors.RequestsError) as err:  # type: ignore[attr-defined]
+            # Most often a timeout the deadline cut short: the deadline's doing, not the host's.
+            if deadline is not None and not deadline.allows():
+                raise DeadlineExceededError(f"Deadline reached: {err}") from err
+
+            delay = retry.delay_after(attempt, err, previous) if retry is not None else None
+
+            if delay is None or attempt == attempts - 1:
+                raise
+
+            if deadline is not None and not deadline.allows(delay):
+                raise DeadlineExceededError(f"No time left to retry before the deadline: {err}") from err
+
+            if budget is not None and not budget.try_spend():
+                if monitor is not None and monitor.event_hooks:
+                    monitor.event(RETRY_BUDGET_EXHAUSTED)
+                raise
+
+        time.sleep(delay)
+        previous = delay
+
+
+class _SessionPool:
+    """
+    Sessions for standalone requests, one request at a time each.
+
+    A session is reused, its handle with it, so a request finds the connection,
+    DNS entry and TLS session (for resumption) of the one before it, rather than
+    paying for them every time. Its cookies are cleared whenever it is taken:
+    standalone requests share no state.
+    """
+
+    def __init__(self, impersonate: str, max_idle: int = MAX_IDLE_SESSIONS) -> None:
+        self.__impersonate = impersonate
+        self.__max_idle = max_idle
+        self.__idle: List[Session] = []
+        self.__lock = threading.Lock()
+
+    def take(self) -> Session:
+        """Return an idle session, or a new one if none is."""
+        with self.__lock:
+            # The one given back last has the freshest connection.
+            session = self.__idle.pop() if self.__idle else None
+
+        if session is None:
+            # Not thread-local: the handle, and its connections, go wherever the session does.
+            return Session(
+                impersonate=self.__impersonate, curl_infos=list(_TIMING_INFOS),  # type: ignore[arg-type]
+                use_thread_local_curl=False,
+            )
+
+        session.cookies.clear()
+        return session
+
+    def give(self, session: Session) -> None:
+        """Put back a session from take(), once its request is over."""
+        with self.__lock:
+            if len(self.__idle) < self.__max_idle:
+                self.__idle.append(session)
+                return
+
+        session.close()
+
+    def upkeep(self) -> None:
+        """Ping the connections of the idle sessions, so the server keeps them open (HTTP/2 only)."""
+        with self.__lock:
+            sessions, self.__idle = self.__idle, []
+
+        try:
+            for session in sessions:
+                session.upkeep()
+        finally:
+            for session in sessions:
+                self.give(session)
 
 
 class APIClient:
@@ -250,22 +1051,197 @@ class APIClient:
         ``DEFAULT_IMPERSONATE`` (currently ``"chrome136"``). When FR24 updates its
         Cloudflare bot mitigation, pass a newer profile (e.g. ``"chrome137"``,
         ``"chrome138"``) without waiting for a library release.
+    :param cassette: Record every response to this cassette, or serve them
+        from it instead of the network, depending on its mode.
+    :param encoding_negotiator: Choose the Accept-Encoding of every request
+        by the measured cost of each encoding, overriding the one passed in.
+    :param json_backend: Library that parses JSON bodies: "orjson", "msgspec"
+        or "json". Defaults to the fastest one installed.
+    :param circuit_breaker: Fail requests to a host that keeps failing at once,
+        with CircuitOpenError, rather than let each one wait out its timeout.
+    :param scheduler: Bound the requests running at once, and start the most
+        urgent first, by the ``priority`` of each request.
     """
 
     def __init__(
         self,
         impersonate: str = DEFAULT_IMPERSONATE,
         retry: Optional[RetryPolicy] = None,
+        cassette: Optional[Cassette] = None,
+        encoding_negotiator: Optional[EncodingNegotiator] = None,
+        json_backend: Optional[str] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        scheduler: Optional[RequestScheduler] = None,
     ) -> None:
         self.__impersonate = impersonate
+        self.__json_backend, self.__json_loads = get_json_loads(json_backend)
         self.__retry = retry
-        self.__session: Session = Session(impersonate=impersonate)  # type: ignore[arg-type]
+        self.__cassette = cassette
+        self.__negotiator = encoding_negotiator
+        self.__breaker = circuit_breaker
+        self.__scheduler = scheduler
+        self.__monitor = RequestMonitor()
+        self.__templates: Dict[Tuple[Any, ...], RequestTemplate] = {}
+        self.__pool = _SessionPool(impersonate)
+        self.__keep_alive: Optional[Tuple[threading.Event, threading.Thread]] = None
+
+        if encoding_negotiator is not None:
+            self.__monitor.hooks.append(encoding_negotiator.observe)
+        self.__session: Session = Session(
+            impersonate=impersonate, curl_infos=list(_TIMING_INFOS),  # type: ignore[arg-type]
+        )
+
+    @property
+    def cassette(self) -> Optional[Cassette]:
+        """The cassette responses are recorded to or replayed from, if any."""
+        return self.__cassette
+
+    @property
+    def scheduler(self) -> Optional[RequestScheduler]:
+        """The scheduler requests wait for a slot in, if any."""
+        return self.__scheduler
+
+    @property
+    def json_backend(self) -> str:
+        """Name of the library that parses JSON bodies."""
+        return self.__json_backend
+
+    def add_hook(self, hook: RequestHook) -> None:
+        """Call ``hook`` with the RequestTiming of every request once it finishes, failed ones included."""
+        self.__monitor.hooks.append(hook)
+
+    def remove_hook(self, hook: RequestHook) -> None:
+        """Stop calling a hook added with add_hook()."""
+        self.__monitor.hooks.remove(hook)
+
+    def add_event_hook(self, hook: EventHook) -> None:
+        """Call ``hook`` with the name and value of every client event reported through emit()."""
+        self.__monitor.event_hooks.append(hook)
+
+    def remove_event_hook(self, hook: EventHook) -> None:
+        """Stop calling a hook added with add_event_hook()."""
+        self.__monitor.event_hooks.remove(hook)
+
+    def emit(self, name: str, value: float = 1.0) -> None:
+        """Report a client event to the event hooks."""
+        if self.__monitor.event_hooks:
+            self.__monitor.event(name, value)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return the request counts, sizes and phase times so far, by endpoint."""
+        return self.__monitor.stats.snapshot()
+
+    def reset_stats(self) -> None:
+        """Forget the requests counted by get_stats()."""
+        self.__monitor.stats.clear()
+
+    def __negotiate(self, url: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Put the negotiator's Accept-Encoding in the headers of a request."""
+        if self.__negotiator is None:
+            return kwargs
+
+        headers = {
+            name: value for name, value in (kwargs.get("headers") or {}).items()
+            if name.lower() != "accept-encoding"
+        }
+        headers["accept-encoding"] = self.__negotiator.accept_encoding(urlsplit(url).hostname or "")
+        return dict(kwargs, headers=headers)
+
+    def __attempt(
+        self,
+        url: str,
+        kwargs: Dict[str, Any],
+        deadline: Optional[Deadline],
+        priority: str,
+        make: Callable[[Dict[str, Any]], "APIRequest"],
+    ) -> "APIRequest":
+        """Make one attempt at a request, in a slot of the scheduler: a retry waits its turn again."""
+        scheduler = self.__scheduler
+
+        if scheduler is None:
+            return self.__guarded(url, kwargs, deadline, make)
+
+        with scheduler.slot(priority, kwargs.get("endpoint") or endpoint_name(url), deadline):
+            return self.__guarded(url, kwargs, deadline, make)
+
+    def __guarded(
+        self,
+        url: str,
+        kwargs: Dict[str, Any],
+        deadline: Optional[Deadline],
+        make: Callable[[Dict[str, Any]], "APIRequest"],
+    ) -> "APIRequest":
+        """Make one attempt at a request, in the time the deadline leaves and through the circuit breaker."""
+        if deadline is not None:
+            kwargs = dict(kwargs, timeout=deadline.timeout(kwargs.get("timeout", DEFAULT_TIMEOUT)))
+
+        breaker = self.__breaker
+
+        if breaker is None:
+            return make(kwargs)
+
+        key = breaker.key(url, kwargs.get("endpoint"))
+        breaker.before(key)
+
+        try:
+            request = make(kwargs)
+        except BaseException as err:
+            if deadline is not None and not deadline.allows():
+                # Cut short by the deadline: no verdict on the host.
+                breaker.abandon(key)
+            elif breaker.record(key, classify_error(err)) == OPEN:
+                self.emit(CIRCUIT_OPENED)
+            raise
+
+        breaker.record(key, None)
+        return request
+
+    def template(self, url: str, headers: Optional[Dict] = None, params: Optional[Dict] = None) -> "RequestTemplate":
+        """Return the RequestTemplate of these arguments, made on the first call with them."""
+        key = (url, tuple(headers.items()) if headers else (), tuple(params.items()) if params else ())
+        template = self.__templates.get(key)
+
+        if template is None:
+            # Bounded against a caller whose fixed parameters never repeat.
+            if len(self.__templates) >= _MAX_TEMPLATES:
+                self.__templates.clear()
+
+            template = self.__templates[key] = RequestTemplate(url, headers, params)
+
+        return template
+
+    def send(
+        self, template: "RequestTemplate", *fields: Any, params: Optional[Dict] = None, standalone: bool = False, **kwargs,
+    ) -> "APIRequest":
+        """
+        Make a request from a template: its URL with ``fields`` filled in, and ``params`` added to its own.
+
+        Through request(), or request_standalone() with ``standalone``.
+        """
+        url = template.url.format(*fields) if fields else template.url
+        request = self.request_standalone if standalone else self.request
+
+        return request(
+            url, params=template.query_for(params), headers=template.headers, endpoint=template.endpoint, **kwargs,
+        )
 
     def request(self, url: str, **kwargs) -> "APIRequest":
-        """Make a request through the shared session."""
+        """Make a request through the shared session.
+
+        A ``deadline`` (a Deadline, or seconds) bounds it and its retries. With a
+        scheduler, it waits for a slot at its ``priority``: the one set by
+        prioritised(), or "normal", when not given.
+        """
+        kwargs = self.__negotiate(url, kwargs)
+        deadline = Deadline.of(kwargs.pop("deadline", None))
+        priority = kwargs.pop("priority", None) or current_priority() or NORMAL
+        attempts = itertools.count()
         return _run_with_retry(
-            lambda: APIRequest(url, session=self.__session, **kwargs),
-            self.__retry,
+            lambda: self.__attempt(url, kwargs, deadline, priority, lambda bounded: APIRequest(
+                url, session=self.__session, cassette=self.__cassette, monitor=self.__monitor,
+                attempt=next(attempts), json_loads=self.__json_loads, **bounded,
+            )),
+            self.__retry, self.__monitor, deadline,
         )
 
     def request_standalone(self, url: str, **kwargs) -> "APIRequest":
@@ -273,12 +1249,135 @@ class APIClient:
 
         The TLS impersonation profile is inherited from this client so that
         thread-pool fan-outs still mimic the same browser as the session.
+        It is made on a pooled session with no cookies, so it reuses the
+        connections of the standalone requests before it.
         """
+        kwargs = self.__negotiate(url, kwargs)
+        deadline = Deadline.of(kwargs.pop("deadline", None))
+        priority = kwargs.pop("priority", None) or current_priority() or NORMAL
+        attempts = itertools.count()
         return _run_with_retry(
-            lambda: APIRequest(url, impersonate=self.__impersonate, **kwargs),
-            self.__retry,
+            lambda: self.__attempt(url, kwargs, deadline, priority, lambda bounded: self.__pooled(
+                url, next(attempts), bounded,
+            )),
+            self.__retry, self.__monitor, deadline,
         )
 
+    def __pooled(self, url: str, attempt: int, kwargs: Dict[str, Any]) -> "APIRequest":
+        """Make a request on a session of the pool."""
+        session = self.__pool.take()
+
+        try:
+            return APIRequest(
+                url, session=session, cassette=self.__cassette, monitor=self.__monitor,
+                attempt=attempt, json_loads=self.__json_loads, **kwargs,
+            )
+        finally:
+            self.__pool.give(session)
+
+    def warm_up(
+        self, urls: Iterable[str] = (), *, standalone_urls: Iterable[str] = (), sessions: int = 1,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> Dict[str, float]:
+        """
+        Open connections ahead of the requests that will need them.
+
+        A HEAD request to each URL resolves its host, connects and completes the
+        TLS handshake, and leaves the connection open for the next request there.
+        Those to ``urls`` are made on the shared session, for request() on this
+        thread: its connections belong to the thread that made them. Those to
+        ``standalone_urls`` are made on ``sessions`` pooled sessions at once,
+        for as many concurrent request_standalone().
+
+        Return the seconds each URL took, the slowest when warmed more than
+        once. A URL that fails is logged and left out: a cold start is no
+        reason to fail.
+
+        :param urls: URLs whose hosts request() will go to
+        :param standalone_urls: URLs whose hosts request_standalone() will go to
+        :param sessions: Pooled sessions to warm, up to MAX_IDLE_SESSIONS
+        :param timeout: Seconds each warm-up request may take
+        """
+        if self.__cassette is not None and not self.__cassette.recording:
+            return {}
+
+        warmed: Dict[str, float] = {}
+
+        def note(url: str, seconds: Optional[float]) -> None:
+            if seconds is not None:
+                warmed[url] = max(warmed.get(url, 0.0), seconds)
+
+        for url in urls:
+            note(url, self.__warm(self.__session, url, timeout))
+
+        standalone_urls = list(standalone_urls)
+        sessions = min(sessions, MAX_IDLE_SESSIONS) if standalone_urls else 0
+
+        if sessions > 0:
+            taken = [self.__pool.take() for _ in range(sessions)]
+
+            try:
+                with ThreadPoolExecutor(max_workers=sessions) as executor:
+                    for session_results in executor.map(
+                        lambda session: [(url, self.__warm(session, url, timeout)) for url in standalone_urls], taken,
+                    ):
+                        for url, seconds in session_results:
+                            note(url, seconds)
+            finally:
+                for session in taken:
+                    self.__pool.give(session)
+
+        return warmed
+
+    @staticmethod
+    def __warm(session: Session, url: str, timeout: float) -> Optional[float]:
+        """Make a HEAD request to ``url`` on ``session``, and return the seconds it took."""
+        started = time.perf_counter()
+
+        try:
+            _keep_connection_alive(session)
+            session.head(url, timeout=timeout)
+        except requests.errors.RequestsError as err:  # type: ignore[attr-defined]
+            _logger.warning("Could not warm up a connection to %s: %s", url, err)
+            return None
+
+        return time.perf_counter() - started
+
+    def start_keep_alive(self, interval: float = 30.0) -> None:
+        """
+        Ping the idle connections of request_standalone() every ``interval`` seconds, from a daemon thread.
+
+        So a server that drops idle connections keeps them open between polls.
+        Pings are HTTP/2 PING frames (libcurl's connection upkeep): they send no
+        request, and do nothing on an HTTP/1.1 connection. The shared session's
+        connections are out of their reach; call warm_up() again for those.
+
+        :param interval: Seconds between pings
+        """
+        if interval <= 0:
+            raise ValueError("interval must be > 0.")
+
+        self.stop_keep_alive()
+        stop, pool = threading.Event(), self.__pool
+
+        def ping() -> None:
+            while not stop.wait(interval):
+                pool.upkeep()
+
+        thread = threading.Thread(target=ping, name="FlightRadarAPI-keep-alive", daemon=True)
+        self.__keep_alive = (stop, thread)
+        thread.start()
+
+    def stop_keep_alive(self) -> None:
+        """Stop the pings started by start_keep_alive(), if any."""
+        if self.__keep_alive is None:
+            return
+
+        stop, thread = self.__keep_alive
+        self.__keep_alive = None
+        stop.set()
+        thread.join()
+
     def get_cookie(self, name: str) -> Optional[str]:
         """Return the value of a stored cookie by name."""
         return self.__session.cookies.get(name)
@@ -313,11 +1412,15 @@ class APIRequest:
         "br": _decompress_brotli,
     }
 
+    if ZSTD_AVAILABLE:
+        __content_encodings["zstd"] = _decompress_zstd
+
     #: Advertised on every request, because taking decoding from libcurl means
     #: only asking for what can be decoded here. curl_cffi's impersonation
-    #: otherwise defaults to "gzip, deflate, br, zstd", and a zstd reply would
-    #: arrive as bytes nothing here can read. Derived rather than written out,
-    #: so advertising an encoding without a decoder is not expressible.
+    #: otherwise defaults to "gzip, deflate, br, zstd", and without the zstd
+    #: extra a zstd reply would arrive as bytes nothing here can read. Derived
+    #: rather than written out, so advertising an encoding without a decoder is
+    #: not expressible.
     supported_encodings = ", ".join(
         name for name in __content_encodings if name not in ("", "identity")
     )
@@ -327,21 +1430,28 @@ class APIRequest:
         url: str,
         *,
         session: Optional[Session] = None,
-        params: Optional[Dict] = None,
+        params: Optional[Union[Dict, str]] = None,
         headers: Optional[Dict] = None,
-        timeout: int = 30,
+        timeout: float = DEFAULT_TIMEOUT,
         data: Optional[Dict] = None,
         allowed_error_codes: Optional[List[int]] = None,
         impersonate: str = DEFAULT_IMPERSONATE,
         max_response_bytes: int = MAX_RESPONSE_BYTES,
         max_download_bytes: Optional[int] = None,
+        cassette: Optional[Cassette] = None,
+        monitor: Optional[RequestMonitor] = None,
+        attempt: int = 0,
+        body_parser: Optional[Callable[[], Any]] = None,
+        json_loads: JSONLoads = json.loads,
+        lean: bool = False,
+        endpoint: Optional[str] = None,
     ):
         """
         Constructor of the APIRequest class.
 
         :param url: URL for the request
         :param session: session to reuse across requests; handles cookies automatically
-        :param params: params that will be inserted on the URL for the request
+        :param params: params that will be inserted on the URL for the request, or their query string
         :param headers: headers for the request
         :param data: data for the request. If "data" is None, request will be a GET. Otherwise, it will be a POST
         :param allowed_error_codes: status codes that should not raise an error
@@ -351,6 +1461,20 @@ class APIRequest:
             Defaults to ``max_response_bytes``. Separate because compression can
             grow incompressible data, so a body that expands to just under the
             budget may still arrive slightly over it.
+        :param cassette: Cassette that records the response as received, or
+            replays one in place of the request
+        :param monitor: Receives the timing record of the request once it finishes
+        :param attempt: Attempts made before this one under the retry policy
+        :param body_parser: Makes a parser with feed(chunk) and close() methods.
+            A successful (2xx) body is fed to one as it is decoded, and not kept:
+            get_body() is empty, and get_parsed() returns what close() returned.
+        :param json_loads: Parses a JSON body for get_content(); see json_backends
+        :param lean: Keep no more of the response than its result. A JSON body
+            is parsed as it arrives and then let go, so get_body() is empty;
+            get_response_object(), and the response of a raised error, keep
+            only the status, LEAN_HEADERS and at most LEAN_ERROR_BODY_BYTES
+            of a failed response's body.
+        :param endpoint: Name of the Core URL requested, for its timing; looked up from the URL when None
         """
         if max_response_bytes < 1:
             raise ValueError("max_response_bytes must be >= 1")
@@ -362,25 +1486,82 @@ class APIRequest:
 
         self.url = url
         self.__max_response_bytes = max_response_bytes
-        headers = self.__with_supported_encodings(headers)
+        headers = _with_supported_encodings(headers)
+
+        if params: url += "?" + (params if isinstance(params, str) else urlencode(params))
+
+        method = "GET" if data is None else "POST"
+        self.__monitor = monitor
+        self.__response: Any = None
+        self.__parser: Any = body_parser() if body_parser is not None else None
+        self.__parsed: Any = None
+        self.__json_loads = json_loads
+        self.__document: Any = _UNPARSED
+        self.__lean = lean
 
-        if params: url += "?" + urlencode(params)
+        #: Where the time of this request went; recorded only for a monitored request.
+        self.timing: Optional[RequestTiming] = None
+
+        if monitor is not None:
+            self.timing = RequestTiming(endpoint or endpoint_name(url), url, method, retries=attempt)
+
+        try:
+            self.__perform(
+                url, method, session=session, headers=headers, timeout=timeout, data=data,
+                allowed_error_codes=allowed_error_codes, impersonate=impersonate,
+                max_download_bytes=max_download_bytes, cassette=cassette,
+            )
+        except Exception as err:
+            if self.timing is not None:
+                self.timing.error = type(err).__name__
+            raise
+        finally:
+            if monitor is not None and self.timing is not None:
+                self.timing.status = self.__response.status_code if self.__response is not None else 0
+                monitor.finished(self.timing)
+
+                if self.timing.parse is not None:
+                    monitor.parsed(self.timing)
+
+    def __perform(
+        self,
+        url: str,
+        method: str,
+        *,
+        session: Optional[Session],
+        headers: Optional[Dict],
+        timeout: float,
+        data: Optional[Dict],
+        allowed_error_codes: Optional[List[int]],
+        impersonate: str,
+        max_download_bytes: int,
+        cassette: Optional[Cassette],
+    ) -> None:
+        """Send the request, or replay it, then decode and check the response."""
+        started = time.perf_counter()
+        sink: Optional[_BodySink] = None
 
         try:
-            if session is not None:
-                _keep_body_encoded(session)
-                _bound_download(session, max_download_bytes)
-                request_method = session.get if data is None else session.post
-                self.__response = request_method(url, headers=headers, data=data, timeout=timeout)
+            if cassette is not None and not cassette.recording:
+                # Everything past this point runs as for a live response.
+                self.__response = cassette.play(method, url, data)
+
+                if session is not None:
+                    set_response_cookies(session.cookies, self.__response)
+            elif session is not None:
+                sink = self.__sink(session, cassette)
+                self.__transfer(session, url, headers, data, timeout, max_download_bytes, sink)
             else:
                 # A throwaway session rather than the module-level helpers, whose
                 # internal handle this cannot reach.
-                with Session(impersonate=impersonate) as standalone:  # type: ignore[arg-type]
-                    _keep_body_encoded(standalone)
-                    _bound_download(standalone, max_download_bytes)
-                    request_method = standalone.get if data is None else standalone.post
-                    self.__response = request_method(url, headers=headers, data=data, timeout=timeout)
+                with Session(impersonate=impersonate, curl_infos=list(_TIMING_INFOS)) as standalone:  # type: ignore[arg-type]
+                    sink = self.__sink(standalone, cassette)
+                    self.__transfer(standalone, url, headers, data, timeout, max_download_bytes, sink)
         except requests.errors.RequestsError as err:  # type: ignore[attr-defined]
+            # The callback aborted the transfer, and libcurl only knows it as a write error.
+            if sink is not None and sink.error is not None:
+                raise sink.error from err
+
             # Not a transient failure, so it must not reach the retry policy as one.
             if getattr(err, "code", None) == CurlECode.FILESIZE_EXCEEDED:
                 raise DecompressionLimitError(
@@ -389,34 +1570,63 @@ class APIRequest:
                 ) from err
             raise
 
-        received = self.__response.content
+        if cassette is not None and cassette.recording:
+            cassette.record(method, url, data, self.__response, time.perf_counter() - started)
+
+        if sink is not None and sink.started:
+            wire_bytes = sink.received
+        else:
+            wire_bytes = len(self.__response.content)
 
         # Three checks guard the size, each covering what the others cannot:
         # MAXFILESIZE_LARGE stops the download at the socket, the decoders stop
         # an expansion as it happens, and this one is the backstop for a
         # transport that honours neither. Unreachable today, kept because it
         # costs one comparison.
-        if len(received) > max_download_bytes:
+        if wire_bytes > max_download_bytes:
             raise DecompressionLimitError(
-                f"Response body from {self.url} is {len(received)} bytes, "
+                f"Response body from {self.url} is {wire_bytes} bytes, "
                 f"past the {max_download_bytes} byte download limit."
             )
 
-        self.__content = self.__decode_body(received)
+        decode_started = time.perf_counter()
+        decoded_in_flight = parsed_in_flight = 0.0
+
+        if sink is not None and sink.decoder is not None:
+            # Decoded in flight; what is left is checking that the stream ended whole.
+            self.__content = sink.decoder.finish()
+            decoded_bytes = sink.decoder.decoded
+            parsed_in_flight = sink.decoder.consumer_seconds
+            decoded_in_flight = sink.decode_seconds - parsed_in_flight
+        else:
+            self.__content = self.__decode_body(sink.raw_body() if sink is not None and sink.started else self.__response.content)
+            decoded_bytes = len(self.__content)
+
+        if self.timing is not None:
+            self.timing.decode = time.perf_counter() - decode_started + decoded_in_flight
+            self.timing.wire_bytes = wire_bytes
+            self.timing.decoded_bytes = decoded_bytes
+            self.timing.encoding = (self.__response.headers.get("Content-Encoding") or "").strip().lower()
 
         # The decoders enforce the budget as they expand, but identity bodies
         # and encodings with no decoder never reach one. Checked here so the
         # budget means the same thing whatever arrived.
-        if len(self.__content) > max_response_bytes:
+        if len(self.__content) > self.__max_response_bytes:
             raise DecompressionLimitError(
                 f"Response body from {self.url} is {len(self.__content)} bytes, "
-                f"past the {max_response_bytes} byte limit."
+                f"past the {self.__max_response_bytes} byte limit."
             )
 
         # `get_response_object()` and `CloudflareError.response` are public, and
         # a challenge page is the first thing anyone reads when debugging a
         # block. Since libcurl no longer decodes, hand them the decoded body.
         self.__response.content = self.__content
+        ok = 200 <= self.get_status_code() < 300
+
+        if self.__lean:
+            # Before the checks below, so an error they raise holds the lean one.
+            kept = self.__content if ok else self.__content[:LEAN_ERROR_BODY_BYTES]
+            self.__response = _LeanResponse(self.__response, kept)
 
         # Cloudflare detection only when the caller did not opt-in to this status code.
         # `getAirlineLogo`/`getCountryFlag` allow 403 to mean "asset not found" on the CDN.
@@ -431,15 +1641,67 @@ class APIRequest:
         if self.get_status_code() not in (allowed_error_codes or []):
             self.__response.raise_for_status()
 
-    @classmethod
-    def __with_supported_encodings(cls, headers: Optional[Dict]) -> Optional[Dict]:
-        """Ask only for encodings this class can decode."""
-        if headers and any(name.lower() == "accept-encoding" for name in headers):
-            return headers
+        if self.__parser is not None and ok:
+            self.__finish_parse(sink is not None and sink.consumed, parsed_in_flight)
+        elif self.__lean and ok and "application/json" in self.__response.headers.get("Content-Type", ""):
+            self.__parse_lean()
+
+    def __parse_lean(self) -> None:
+        """Parse a lean request's JSON body now, and let the bytes go."""
+        started = time.perf_counter()
+        self.__document = self.__json_loads(self.__content)
+        self.__content = self.__response.content = b""
+
+        # The constructor reports it to the monitor, as any parse made before it returns.
+        if self.timing is not None:
+            self.timing.parse = time.perf_counter() - started
 
-        merged = dict(headers or {})
-        merged["accept-encoding"] = cls.supported_encodings
-        return merged
+    def __finish_parse(self, consumed: bool, parsed_in_flight: float) -> None:
+        """Have the body parser parse what it was not fed in flight, and close it."""
+        started = time.perf_counter()
+        parser = self.__parser
+
+        # Replayed, or in an encoding not decoded in flight: decoded whole, fed in slices.
+        if not consumed:
+            for chunk in iter_chunks(self.__content):
+                parser.feed(chunk)
+
+        self.__parsed = parser.close()
+        self.__content = self.__response.content = b""
+
+        if self.timing is not None:
+            self.timing.parse = time.perf_counter() - started + parsed_in_flight
+
+    def __sink(self, session: Session, cassette: Optional[Cassette]) -> Optional[_BodySink]:
+        """The write callback to decode the body of a request on ``session`` as it arrives."""
+        # A cassette records the body as received, so it is left to buffer whole.
+        if cassette is not None:
+            return None
+
+        consumer = self.__parser.feed if self.__parser is not None else None
+        return _BodySink(session.curl, self.__max_response_bytes, consumer)
+
+    def __transfer(
+        self,
+        session: Session,
+        url: str,
+        headers: Optional[Dict],
+        data: Optional[Dict],
+        timeout: float,
+        max_download_bytes: int,
+        sink: Optional[_BodySink],
+    ) -> None:
+        """Send the request on ``session``."""
+        _keep_body_encoded(session)
+        _keep_connection_alive(session)
+        _bound_download(session, max_download_bytes)
+        options: Dict[str, Any] = {} if sink is None else {"content_callback": sink}
+
+        request_method = session.get if data is None else session.post
+        self.__response = request_method(url, headers=headers, data=data, timeout=timeout, **options)
+
+        if self.timing is not None:
+            _read_curl_times(self.__response, self.timing)
 
     def __is_cloudflare_block(self) -> bool:
         """
@@ -546,10 +1808,28 @@ class APIRequest:
 
         # Return a dictionary if the content type is JSON.
         if "application/json" in content_type:
-            return json.loads(self.__content)
+            # Parsed once per response: get_json_content() and get_bytes_content()
+            # both come through here, and callers often ask more than once.
+            if self.__document is not _UNPARSED:
+                return self.__document
+
+            started = time.perf_counter()
+            self.__document = self.__json_loads(self.__content)
+
+            if self.timing is not None and self.timing.parse is None and self.__monitor is not None:
+                self.timing.parse = time.perf_counter() - started
+                self.__monitor.parsed(self.timing)
+
+            return self.__document
 
         return self.__content
 
+    def get_parsed(self) -> Any:
+        """
+        Return what the body parser built from the body, or None when none ran.
+        """
+        return self.__parsed
+
     def get_json_content(self) -> Dict[str, Any]:
         """
         Return the response content as a parsed JSON dictionary.
@@ -568,6 +1848,12 @@ class APIRequest:
             raise ValueError(f"Expected bytes response from {self.url}, got JSON")
         return content
 
+    def get_body(self) -> bytes:
+        """
+        Return the decoded response body as bytes, whatever its content type.
+        """
+        return self.__content
+
     def get_headers(self) -> Any:
         """
         Return the headers of the response.
@@ -585,3 +1871,53 @@ class APIRequest:
         Return the status code of the response.
         """
         return self.__response.status_code
+
+
+def _with_supported_encodings(headers: Optional[Dict]) -> Optional[Dict]:
+    """Ask only for encodings APIRequest can decode."""
+    if headers and any(name.lower() == "accept-encoding" for name in headers):
+        return headers
+
+    merged = dict(headers or {})
+    merged["accept-encoding"] = APIRequest.supported_encodings
+    return merged
+
+
+class RequestTemplate:
+    """
+    What every request to an endpoint has in common, worked out once.
+
+    Holds its headers, with Accept-Encoding settled, the query string of the
+    parameters that do not change between calls, and the endpoint's name for
+    the timing records. A call then only encodes its own parameters. Made and
+    kept by APIClient.template(), sent by APIClient.send().
+
+    The curl options of a request are not part of it: Session.request resets
+    the handle, so they are set again on every request whatever is cached.
+
+    :param url: URL of the endpoint; may hold "{}" fields, filled in by send()
+    :param headers: Headers of every request
+    :param params: Query parameters of every request, ahead of a call's own
+    """
+
+    __slots__ = ("url", "headers", "query", "endpoint")
+
+    def __init__(self, url: str, headers: Optional[Dict] = None, params: Optional[Dict] = None) -> None:
+        self.url = url
+        self.headers = _with_supported_encodings(headers)
+        self.query = urlencode(params) if params else ""
+        self.endpoint = endpoint_name(url)
+
+    def query_for(self, params: Optional[Dict] = None) -> str:
+        """
+        Return the query string of a request adding ``params`` to the fixed ones.
+
+        The same string urlencode() makes of both, as long as their keys differ.
+
+        :param params: Parameters of this call
+        """
+        if not params:
+            return self.query
+
+        extra = urlencode(params)
+        return f"{self.query}&{extra}" if self.query else extra
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, Iterator, Optional
+
+from .deadline import Deadline
+from .errors import DeadlineExceededError
+
+INTERACTIVE = "interactive"
+NORMAL = "normal"
+BACKGROUND = "background"
+
+# Highest first: a free slot goes to the first of these with a request waiting.
+PRIORITIES = (INTERACTIVE, NORMAL, BACKGROUND)
+
+_priority: ContextVar[Optional[str]] = ContextVar("flightradarapi_priority", default=None)
+
+
+def current_priority() -> Optional[str]:
+    """Return the priority set by the innermost prioritised() block, if any."""
+    return _priority.get()
+
+
+@contextmanager
+def prioritised(priority: str) -> Iterator[None]:
+    """
+    Make the requests of the block, in this thread or context, at ``priority``.
+
+    :param priority: "interactive", "normal" or "background"
+    """
+    if priority not in PRIORITIES:
+        raise ValueError(f"priority must be one of {PRIORITIES}, not {priority!r}.")
+
+    token = _priority.set(priority)
+
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class _Waiter:
+    __slots__ = ("granted", "event")
+
+    def __init__(self) -> None:
+        self.granted = False
+        self.event = threading.Event()
+
+
+class _Class:
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.active = 0
+        self.queued = 0
+        # Flow (endpoint) -> its waiters, in turn order: the flow served last goes to the back.
+        self.flows: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+
+
+class RequestScheduler:
+    """
+    Lets at most ``max_concurrent`` requests of an APIClient run at once, most urgent first.
+
+    Each request has a priority: "interactive", "normal" or "background".
+    When a slot frees up it goes to a waiting request of the highest priority
+    whose class is under its limit in ``limits``. Capping "background" (at
+    half the slots by default) keeps room for the others however deep its
+    queue, so a user-facing lookup waits for at most one request to finish
+    rather than for a whole crawl.
+
+    Within a priority, waiting requests take turns by endpoint, so one flooded
+    endpoint, such as a details fan-out, does not starve another.
+
+    Requests made with no priority run at "normal", or at the one set by
+    prioritised(). Give one to APIClient (or FlightRadar24API) ``scheduler``.
+
+    :param max_concurrent: Requests running at once, all priorities together
+    :param limits: Requests of a priority running at once, by priority
+    """
+
+    def __init__(self, max_concurrent: int = 8, limits: Optional[Dict[str, int]] = None):
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be >= 1.")
+
+        limits = dict({BACKGROUND: max(1, max_concurrent // 2)}, **(limits or {}))
+
+        for priority, limit in limits.items():
+            if priority not in PRIORITIES:
+                raise ValueError(f"limits must be by priority, one of {PRIORITIES}, not {priority!r}.")
+
+            if limit < 1:
+                raise ValueError("Every limit must be >= 1.")
+
+        self.max_concurrent = max_concurrent
+        self.__classes = {
+            priority: _Class(min(limits.get(priority, max_concurrent), max_concurrent))
+            for priority in PRIORITIES
+        }
+        self.__active = 0
+        self.__lock = threading.Lock()
+
+    def __dispatch(self) -> None:
+        """Hand free slots to waiting requests: by priority, then by turn of their flow."""
+        while self.__active < self.max_concurrent:
+            for klass in self.__classes.values():
+                if klass.flows and klass.active < klass.limit:
+                    break
+            else:
+                return
+
+            flow, waiters = next(iter(klass.flows.items()))
+            waiter = waiters.popleft()
+
+            if waiters:
+                klass.flows.move_to_end(flow)
+            else:
+                del klass.flows[flow]
+
+            klass.queued -= 1
+            klass.active += 1
+            self.__active += 1
+
+            waiter.granted = True
+            waiter.event.set()
+
+    def acquire(self, priority: str = NORMAL, flow: str = "", deadline: Optional[Deadline] = None) -> None:
+        """
+        Wait for a slot, and take it. Every slot taken must be given back with release().
+
+        :param priority: "interactive", "normal" or "background"
+        :param flow: What the request takes turns by within its priority, such as its endpoint
+        :param deadline: Stop waiting, with DeadlineExceededError, once too little of it is left for a request
+        """
+        klass = self.__classes.get(priority)
+
+        if klass is None:
+            raise ValueError(f"priority must be one of {PRIORITIES}, not {priority!r}.")
+
+        waiter = _Waiter()
+
+        with self.__lock:
+            klass.flows.setdefault(flow, deque()).append(waiter)
+            klass.queued += 1
+            self.__dispatch()
+
+        if waiter.granted:
+            return
+
+        if deadline is None:
+            waiter.event.wait()
+            return
+
+        if waiter.event.wait(max(0.0, deadline.remaining() - deadline.min_request_seconds)):
+            return
+
+        with self.__lock:
+            # Granted between the wait running out and the lock.
+            if waiter.granted:
+                return
+
+            waiters = klass.flows[flow]
+            waiters.remove(waiter)
+            klass.queued -= 1
+
+            if not waiters:
+                del klass.flows[flow]
+
+        raise DeadlineExceededError(f"Deadline reached while queued at {priority} priority: request not started.")
+
+    def release(self, priority: str = NORMAL) -> None:
+        """
+        Give back a slot taken by acquire().
+
+        :param priority: Priority it was taken at
+        """
+        with self.__lock:
+            self.__classes[priority].active -= 1
+            self.__active -= 1
+            self.__dispatch()
+
+    @contextmanager
+    def slot(self, priority: str = NORMAL, flow: str = "", deadline: Optional[Deadline] = None) -> Iterator[None]:
+        """Hold a slot for the block: acquire() then release()."""
+        self.acquire(priority, flow, deadline)
+
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """Return the requests running ("active") and waiting ("queued"), and the "limit", by priority."""
+        with self.__lock:
+            return {
+                priority: {"active": klass.active, "queued": klass.queued, "limit": klass.limit}
+                for priority, klass in self.__classes.items()
+            }
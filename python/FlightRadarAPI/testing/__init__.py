@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+
+"""
+Offline stand-ins for FlightRadar24, for load, soak and benchmark runs.
+
+Nothing here talks to FR24: the documents are generated locally, shaped like
+the ones the SDK parses.
+"""
+
+from .feeds import FeedGenerator
+from .server import StandInServer
+
+__all__ = [
+    "FeedGenerator",
+    "StandInServer",
+]
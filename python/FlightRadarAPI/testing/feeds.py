@@ -0,0 +1,401 @@
+# -*- coding: utf-8 -*-
+
+import math
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..entities.flight import _Field
+
+# (IATA, ICAO, name, latitude, longitude, altitude ft, country, country code, timezone, abbreviation, UTC offset s)
+AIRPORTS: List[Tuple[str, str, str, float, float, int, str, str, str, str, int]] = [
+    ("GRU", "SBGR", "Sao Paulo Guarulhos International Airport", -23.4356, -46.4731, 2461, "Brazil", "BR",
+     "America/Sao_Paulo", "-03", -10800),
+    ("GIG", "SBGL", "Rio de Janeiro Galeao International Airport", -22.8089, -43.2436, 28, "Brazil", "BR",
+     "America/Sao_Paulo", "-03", -10800),
+    ("ATL", "KATL", "Atlanta Hartsfield-Jackson International Airport", 33.6367, -84.4281, 1026, "United States", "US",
+     "America/New_York", "EST", -18000),
+    ("JFK", "KJFK", "New York John F. Kennedy International Airport", 40.6398, -73.7789, 13, "United States", "US",
+     "America/New_York", "EST", -18000),
+    ("LAX", "KLAX", "Los Angeles International Airport", 33.9425, -118.4081, 125, "United States", "US",
+     "America/Los_Angeles", "PST", -28800),
+    ("LHR", "EGLL", "London Heathrow Airport", 51.4706, -0.4619, 83, "United Kingdom", "GB",
+     "Europe/London", "GMT", 0),
+    ("FRA", "EDDF", "Frankfurt am Main Airport", 50.0333, 8.5706, 364, "Germany", "DE",
+     "Europe/Berlin", "CET", 3600),
+    ("IST", "LTFM", "Istanbul Airport", 41.2753, 28.7519, 325, "Turkey", "TR",
+     "Europe/Istanbul", "+03", 10800),
+    ("DXB", "OMDB", "Dubai International Airport", 25.2528, 55.3644, 62, "United Arab Emirates", "AE",
+     "Asia/Dubai", "+04", 14400),
+    ("SIN", "WSSS", "Singapore Changi Airport", 1.3502, 103.9940, 22, "Singapore", "SG",
+     "Asia/Singapore", "+08", 28800),
+    ("HND", "RJTT", "Tokyo Haneda International Airport", 35.5523, 139.7800, 35, "Japan", "JP",
+     "Asia/Tokyo", "JST", 32400),
+    ("SYD", "YSSY", "Sydney Kingsford Smith Airport", -33.9461, 151.1772, 21, "Australia", "AU",
+     "Australia/Sydney", "AEDT", 39600),
+]
+
+# (IATA, ICAO, name, aircraft codes it flies)
+AIRLINES: List[Tuple[str, str, str, Tuple[str, ...]]] = [
+    ("LA", "LAN", "LATAM Airlines", ("A320", "A321", "B789")),
+    ("G3", "GLO", "Gol Linhas Aereas", ("B737", "B38M")),
+    ("DL", "DAL", "Delta Air Lines", ("A321", "A359", "B739")),
+    ("AA", "AAL", "American Airlines", ("A321", "B738", "B77W")),
+    ("BA", "BAW", "British Airways", ("A320", "A35K", "B772")),
+    ("LH", "DLH", "Lufthansa", ("A20N", "A359", "B748")),
+    ("TK", "THY", "Turkish Airlines", ("A321", "A333", "B77W")),
+    ("EK", "UAE", "Emirates", ("A388", "B77W")),
+    ("SQ", "SIA", "Singapore Airlines", ("A359", "B78X")),
+    ("NH", "ANA", "All Nippon Airways", ("B788", "B789")),
+]
+
+# Radar sources the feed reports, with the share of aircraft each one sees.
+SOURCES = (("ads-b", 0.78), ("mlat", 0.12), ("faa", 0.05), ("flarm", 0.02), ("estimated", 0.03))
+
+FEED_VERSION = 4
+EARTH_RADIUS_KM = 6371.0
+
+# Flight ids are hex, and get_flights keeps only keys starting with a digit.
+_FIRST_FLIGHT_ID = 0x30000000
+
+
+class _Aircraft:
+    """
+    State of one simulated flight between snapshots.
+    """
+    __slots__ = (
+        "flight_id", "icao_24bit", "registration", "aircraft_code", "airline", "number", "origin", "destination",
+        "departed", "speed", "cruise_altitude", "progress", "squawk",
+    )
+
+    def __init__(self, flight_id: str, rng: random.Random, now: int):
+        airline = rng.choice(AIRLINES)
+        origin, destination = rng.sample(range(len(AIRPORTS)), 2)
+
+        self.flight_id = flight_id
+        self.icao_24bit = f"{rng.getrandbits(24):06X}"
+        self.registration = f"{rng.choice('DNPGJ')}-{''.join(rng.choice('ABCDEFGHJKLMNPRSTUVWXYZ') for _ in range(4))}"
+        self.aircraft_code = rng.choice(airline[3])
+        self.airline = airline
+        self.number = rng.randint(1, 9999)
+        self.origin = AIRPORTS[origin]
+        self.destination = AIRPORTS[destination]
+        self.speed = rng.randint(420, 510)
+        self.cruise_altitude = rng.randrange(31000, 41001, 1000)
+        self.squawk = "".join(rng.choice("01234567") for _ in range(4))  # Octal digits only.
+
+        # Somewhere along its route already, so a first snapshot is not all take-offs.
+        self.progress = rng.uniform(0.0, 0.95)
+        self.departed = now - int(self.progress * self.duration())
+
+    def distance_km(self) -> float:
+        return _distance_km(self.origin[3], self.origin[4], self.destination[3], self.destination[4])
+
+    def duration(self) -> float:
+        """Seconds from gate to gate at this aircraft's speed, in knots."""
+        return self.distance_km() / (self.speed * 1.852) * 3600
+
+    def position(self, progress: float) -> Tuple[float, float, int, int, int]:
+        """Return latitude, longitude, altitude, ground speed and heading at ``progress`` along the route."""
+        progress = min(max(progress, 0.0), 1.0)
+        latitude, longitude = _interpolate(self.origin[3], self.origin[4], self.destination[3], self.destination[4], progress)
+
+        # Climb over the first tenth of the route and descend over the last.
+        phase = min(progress, 1.0 - progress) * 10
+        altitude = int(self.cruise_altitude * min(phase, 1.0)) // 25 * 25
+        speed = int(self.speed * (0.4 + 0.6 * min(phase, 1.0))) if 0.0 < progress < 1.0 else 0
+
+        ahead = _interpolate(self.origin[3], self.origin[4], self.destination[3], self.destination[4], min(progress + 1e-3, 1.0))
+        heading = int(_bearing(latitude, longitude, *ahead)) % 360
+
+        return round(latitude, 4), round(longitude, 4), altitude, speed, heading
+
+
+def _distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(math.sqrt(a), 1.0))
+
+
+def _interpolate(lat1: float, lon1: float, lat2: float, lon2: float, fraction: float) -> Tuple[float, float]:
+    """Point ``fraction`` of the way along the great circle between two positions."""
+    phi1, lambda1, phi2, lambda2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    delta = _distance_km(lat1, lon1, lat2, lon2) / EARTH_RADIUS_KM
+
+    if delta == 0:
+        return lat1, lon1
+
+    a = math.sin((1 - fraction) * delta) / math.sin(delta)
+    b = math.sin(fraction * delta) / math.sin(delta)
+    x = a * math.cos(phi1) * math.cos(lambda1) + b * math.cos(phi2) * math.cos(lambda2)
+    y = a * math.cos(phi1) * math.sin(lambda1) + b * math.cos(phi2) * math.sin(lambda2)
+    z = a * math.sin(phi1) + b * math.sin(phi2)
+
+    return math.degrees(math.atan2(z, math.hypot(x, y))), math.degrees(math.atan2(y, x))
+
+
+def _bearing(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    delta = math.radians(lon2 - lon1)
+    x = math.sin(delta) * math.cos(phi2)
+    y = math.cos(phi1) * math.sin(phi2) - math.sin(phi1) * math.cos(phi2) * math.cos(delta)
+    return math.degrees(math.atan2(x, y)) % 360
+
+
+def _airport_details(airport: Tuple) -> Dict[str, Any]:
+    iata, icao, name, latitude, longitude, altitude, country, country_code, timezone, abbr, offset = airport
+    return {
+        "name": name,
+        "code": {"iata": iata, "icao": icao},
+        "position": {
+            "latitude": latitude,
+            "longitude": longitude,
+            "altitude": altitude,
+            "country": {"id": None, "name": country, "code": country_code},
+            "region": {"city": name.split()[0]},
+        },
+        "timezone": {
+            "name": timezone,
+            "offset": offset,
+            "offsetHours": f"{offset // 3600}:00",
+            "abbr": abbr,
+            "abbrName": None,
+            "isDst": False,
+        },
+        "visible": True,
+        "website": None,
+        "info": {"terminal": "1", "baggage": None, "gate": None},
+    }
+
+
+class FeedGenerator:
+    """
+    Deterministic stand-in for the live feed, for load and soak tests.
+
+    Simulates ``flights`` aircraft flying great-circle routes between a fixed
+    set of airports, and renders them as the documents FR24 serves: the
+    feed.js envelope of ``get_flights`` and the clickhandler document of
+    ``get_flight_details``. The same seed always produces the same documents.
+
+    Each call to ``advance`` moves the clock on, lands the aircraft that
+    reached their destination and replaces a further ``churn`` fraction of
+    them, so consecutive snapshots differ the way real ones do.
+
+    :param flights: Number of aircraft in the air at any time
+    :param seed: Seed for every random choice
+    :param churn: Fraction of aircraft replaced by new ones on each advance
+    :param start_time: Unix timestamp of the first snapshot
+    :param interval: Seconds between snapshots, unless advance is told otherwise
+    :param trail_points: Points in each clickhandler trail
+    """
+
+    def __init__(
+        self,
+        flights: int = 1000,
+        seed: int = 0,
+        churn: float = 0.02,
+        start_time: int = 1700000000,
+        interval: int = 8,
+        trail_points: int = 120,
+    ):
+        if flights < 0:
+            raise ValueError("flights must not be negative.")
+
+        if not 0.0 <= churn <= 1.0:
+            raise ValueError("churn must be between 0 and 1.")
+
+        self.__rng = random.Random(seed)
+        self.__next_id = _FIRST_FLIGHT_ID
+        self.__aircraft: Dict[str, _Aircraft] = {}
+
+        self.flights = flights
+        self.churn = churn
+        self.now = start_time
+        self.interval = interval
+        self.trail_points = trail_points
+
+        for _ in range(flights):
+            self.__add()
+
+    def __add(self) -> None:
+        flight_id = f"{self.__next_id:08x}"
+        self.__next_id += 1
+        self.__aircraft[flight_id] = _Aircraft(flight_id, self.__rng, self.now)
+
+    @property
+    def flight_ids(self) -> List[str]:
+        """
+        Ids of the aircraft in the current snapshot, in feed order.
+        """
+        return list(self.__aircraft)
+
+    def advance(self, seconds: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Move the simulation on and return the new snapshot.
+
+        :param seconds: Seconds to move the clock; defaults to the generator's interval
+        """
+        seconds = self.interval if seconds is None else seconds
+        self.now += seconds
+
+        landed = []
+
+        for flight_id, aircraft in self.__aircraft.items():
+            aircraft.progress = (self.now - aircraft.departed) / aircraft.duration()
+
+            if aircraft.progress >= 1.0:
+                landed.append(flight_id)
+
+        for flight_id in landed:
+            del self.__aircraft[flight_id]
+
+        # Sorted so the choice depends only on the seed, not on dict history.
+        remaining = sorted(self.__aircraft)
+        replaced = min(int(round(len(remaining) * self.churn)), len(remaining))
+
+        for flight_id in self.__rng.sample(remaining, replaced):
+            del self.__aircraft[flight_id]
+
+        while len(self.__aircraft) < self.flights:
+            self.__add()
+
+        return self.snapshot()
+
+    def row(self, flight_id: str) -> List[Any]:
+        """
+        Return the 19-element feed row of one aircraft, laid out as Flight reads it.
+
+        :param flight_id: Id of an aircraft in the current snapshot
+        """
+        aircraft = self.__aircraft[flight_id]
+        latitude, longitude, altitude, speed, heading = aircraft.position(aircraft.progress)
+        climb = 1 if aircraft.progress < 0.1 else -1 if aircraft.progress > 0.9 else 0
+        iata, icao = aircraft.airline[0], aircraft.airline[1]
+
+        row: List[Any] = [None] * (_Field.AIRLINE_ICAO + 1)
+        row[_Field.ICAO24BIT] = aircraft.icao_24bit
+        row[_Field.LATITUDE] = latitude
+        row[_Field.LONGITUDE] = longitude
+        row[_Field.HEADING] = heading
+        row[_Field.ALTITUDE] = altitude
+        row[_Field.GROUND_SPEED] = speed
+        row[_Field.SQUAWK] = aircraft.squawk
+        row[7] = f"F-{aircraft.origin[1]}1"
+        row[_Field.AIRCRAFT_CODE] = aircraft.aircraft_code
+        row[_Field.REGISTRATION] = aircraft.registration
+        row[_Field.TIME] = self.now
+        row[_Field.ORIGIN_IATA] = aircraft.origin[0]
+        row[_Field.DESTINATION_IATA] = aircraft.destination[0]
+        row[_Field.FLIGHT_NUMBER] = f"{iata}{aircraft.number}"
+        row[_Field.ON_GROUND] = int(altitude == 0)
+        row[_Field.VERTICAL_SPEED] = climb * 1536 if altitude < aircraft.cruise_altitude else 0
+        row[_Field.CALLSIGN] = f"{icao}{aircraft.number}"
+        row[17] = 0
+        row[_Field.AIRLINE_ICAO] = icao
+        return row
+
+    def snapshot(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Return the feed.js envelope of the current state.
+
+        :param limit: Most rows to include, as the feed's own "limit" parameter does
+        """
+        ids = self.flight_ids if limit is None else self.flight_ids[:limit]
+        visible = len(ids)
+        envelope: Dict[str, Any] = {"full_count": len(self.__aircraft), "version": FEED_VERSION}
+
+        for flight_id in ids:
+            envelope[flight_id] = self.row(flight_id)
+
+        envelope["stats"] = self.__stats(visible)
+        return envelope
+
+    def empty_snapshot(self) -> Dict[str, Any]:
+        """
+        Return the envelope a degraded feed backend serves: a full count but no rows.
+        """
+        return {"full_count": len(self.__aircraft), "version": FEED_VERSION, "stats": self.__stats(0)}
+
+    def __stats(self, visible: int) -> Dict[str, Dict[str, int]]:
+        total = len(self.__aircraft)
+        return {
+            "total": {source: int(total * share) for source, share in SOURCES},
+            "visible": {source: int(visible * share) for source, share in SOURCES},
+        }
+
+    def clickhandler(self, flight_id: str) -> Dict[str, Any]:
+        """
+        Return the clickhandler document of one aircraft, trail newest first.
+
+        :param flight_id: Id of an aircraft in the current snapshot
+        """
+        aircraft = self.__aircraft[flight_id]
+        iata, icao, airline_name = aircraft.airline[0], aircraft.airline[1], aircraft.airline[2]
+        duration = aircraft.duration()
+        step = max(duration * aircraft.progress / max(self.trail_points - 1, 1), 1.0)
+
+        trail = []
+
+        for i in range(self.trail_points):
+            elapsed = self.now - aircraft.departed - i * step
+
+            if elapsed < 0:
+                break
+
+            latitude, longitude, altitude, speed, heading = aircraft.position(elapsed / duration)
+            trail.append({"lat": latitude, "lng": longitude, "alt": altitude, "spd": speed, "ts": int(self.now - i * step),
+                          "hd": heading})
+
+        arrival = int(aircraft.departed + duration)
+        on_ground = aircraft.progress >= 1.0
+
+        return {
+            "identification": {
+                "id": flight_id,
+                "row": int(flight_id, 16),
+                "number": {"default": f"{iata}{aircraft.number}", "alternative": None},
+                "callsign": f"{icao}{aircraft.number}",
+                "codeshare": None,
+            },
+            "status": {
+                "live": not on_ground,
+                "text": "Landed" if on_ground else f"Estimated- {time.strftime('%H:%M', time.gmtime(arrival))}",
+                "icon": "green",
+                "estimated": None,
+                "ambiguous": False,
+                "generic": {"status": {"text": "landed" if on_ground else "estimated", "type": "arrival"}},
+            },
+            "level": "limited",
+            "promote": False,
+            "aircraft": {
+                "model": {"code": aircraft.aircraft_code, "text": aircraft.aircraft_code},
+                "countryId": None,
+                "registration": aircraft.registration,
+                "age": None,
+                "msn": None,
+                "images": [],
+                "hex": aircraft.icao_24bit.lower(),
+            },
+            "airline": {"name": airline_name, "short": airline_name.split()[0], "code": {"iata": iata, "icao": icao}},
+            "owner": None,
+            "airspace": None,
+            "airport": {
+                "origin": _airport_details(aircraft.origin),
+                "destination": _airport_details(aircraft.destination),
+                "real": None,
+            },
+            "flightHistory": {"aircraft": []},
+            "ems": None,
+            "availability": ["AGE", "MSN"],
+            "time": {
+                "scheduled": {"departure": aircraft.departed, "arrival": arrival},
+                "real": {"departure": aircraft.departed, "arrival": arrival if on_ground else None},
+                "estimated": {"departure": None, "arrival": arrival},
+                "other": {"eta": arrival, "updated": self.now},
+                "historical": None,
+            },
+            "trail": trail,
+            "firstTimestamp": aircraft.departed,
+            # A token in the real document; derived, so reading details never moves the seed.
+            "s": f"{int(flight_id, 16) * 0x9E3779B97F4A7C15 % 2 ** 64:016x}",
+        }
@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+
+import contextlib
+import gzip
+import importlib.util
+import json
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from ..core import Core
+from .feeds import AIRLINES, AIRPORTS, FeedGenerator, _airport_details
+
+CHALLENGE_PAGE = b"<!DOCTYPE html><html><head><title>Just a moment...</title></head><body></body></html>"
+ORIGIN_ERROR_PAGE = b"<!DOCTYPE html><html><head><title>520: Web server is returning an unknown error</title></head></html>"
+
+# Stickiness cookies of the feed's load balancer, as get_flights knows them.
+STICKY_COOKIES = ("AWSALB", "AWSALBCORS")
+
+# What encoding="auto" offers, in order of preference; zstd needs the zstandard package.
+AUTO_ENCODINGS = ("br", "gzip", "deflate") + (("zstd",) if importlib.util.find_spec("zstandard") else ())
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        import brotli
+        return brotli.compress(body, quality=5)
+
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6)
+
+    if encoding == "deflate":
+        return zlib.compress(body)
+
+    if encoding == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor(level=3).compress(body)
+
+    return body
+
+
+def _airport_page_details(airport: Tuple) -> Dict[str, Any]:
+    """The airport as airport.json and the traffic-stats page describe it."""
+    details = _airport_details(airport)
+    details["position"]["elevation"] = details["position"]["altitude"]
+    details["url"] = {"homepage": None, "webcam": None, "wikipedia": None}
+    return details
+
+
+def _find_airport(code: str) -> Optional[Tuple]:
+    code = code.upper()
+    return next((airport for airport in AIRPORTS if code in (airport[0], airport[1])), None)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_Server"
+
+    def do_GET(self) -> None:
+        self.server.stand_in._handle(self)
+
+    def do_HEAD(self) -> None:
+        self.server.stand_in._handle(self)
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        self.server.stand_in._handle(self)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    stand_in: "StandInServer"
+
+
+class StandInServer:
+    """
+    Local stand-in for the FlightRadar24 endpoints, for offline end-to-end runs.
+
+    Serves feed.js and clickhandler documents from a FeedGenerator, plus
+    airport.json, the traffic-stats page, airports.php and the airlines page,
+    over plain HTTP on a local port, from a background thread. Point a client
+    at it with FlightRadar24API(base_urls=server.base_urls), or every client
+    with use_core(), and every SDK call goes through the real request path:
+    curl, content decoding, the Cloudflare check and the feed re-roll.
+
+    Each feed request is routed to one of ``backends`` simulated backends and
+    pinned to it with AWSALB cookies, as FR24's load balancer does. The first
+    ``empty_backends`` of them serve a feed with a count but no rows.
+
+    Faults are injected at random from ``seed``: ``cloudflare_rate`` of the
+    requests get a 403 with ``cf-mitigated``, and ``origin_error_rate`` a 520.
+
+    :param feed: Generator of the feed and clickhandler documents
+    :param latency: Seconds every response is held back
+    :param jitter: Up to this many extra seconds, at random, on top of ``latency``
+    :param encoding: "br", "gzip", "deflate", "zstd" or None, used when the request accepts it;
+        "auto" answers with the first of AUTO_ENCODINGS the request accepts
+    :param backends: Number of feed backends behind the simulated load balancer
+    :param empty_backends: How many of those serve an empty feed
+    :param cloudflare_rate: Fraction of requests answered with a Cloudflare block
+    :param origin_error_rate: Fraction of requests answered with a 520
+    :param seed: Seed for the routing and fault choices
+    :param host: Interface to listen on
+    :param port: Port to listen on; 0 picks a free one
+    """
+
+    def __init__(
+        self,
+        feed: Optional[FeedGenerator] = None,
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        encoding: Optional[str] = "br",
+        backends: int = 4,
+        empty_backends: int = 0,
+        cloudflare_rate: float = 0.0,
+        origin_error_rate: float = 0.0,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        if encoding not in (None, "auto") + AUTO_ENCODINGS:
+            raise ValueError(f"Unsupported encoding: {encoding!r}.")
+
+        if not 0 <= empty_backends <= backends or backends < 1:
+            raise ValueError("backends must be >= 1 and empty_backends between 0 and backends.")
+
+        if not 0.0 <= cloudflare_rate + origin_error_rate <= 1.0:
+            raise ValueError("cloudflare_rate and origin_error_rate must add up to at most 1.")
+
+        self.feed = feed if feed is not None else FeedGenerator()
+        self.latency = latency
+        self.jitter = jitter
+        self.encoding = encoding
+        self.backends = backends
+        self.empty_backends = empty_backends
+        self.cloudflare_rate = cloudflare_rate
+        self.origin_error_rate = origin_error_rate
+
+        #: Requests served, by path.
+        self.requests: Counter = Counter()
+
+        #: Responses sent, by status code.
+        self.statuses: Counter = Counter()
+
+        #: Feed requests pinned to a backend afresh, by backend.
+        self.pinned: Counter = Counter()
+
+        self.__rng = random.Random(seed)
+        self.__lock = threading.Lock()
+        self.__address = (host, port)
+        self.__server: Optional[_Server] = None
+        self.__thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        """
+        Base URL the server answers on.
+        """
+        if self.__server is None:
+            raise RuntimeError("The stand-in server is not running.")
+
+        return f"http://{self.__address[0]}:{self.__server.server_port}"
+
+    @property
+    def base_urls(self) -> Dict[str, str]:
+        """
+        Core base URLs that lead to this server, for FlightRadar24API(base_urls=...) or Core.set_base_urls().
+        """
+        return {
+            "flightradar_base_url": self.url,
+            "data_live_base_url": self.url,
+            "data_cloud_base_url": self.url,
+            "cdn_flightradar_base_url": self.url,
+            "api_flightradar_base_url": self.url + "/common/v1",
+        }
+
+    def start(self) -> "StandInServer":
+        """
+        Start serving from a background thread.
+        """
+        if self.__server is not None:
+            return self
+
+        self.__server = _Server(self.__address, _Handler)
+        self.__server.stand_in = self
+        self.__thread = threading.Thread(target=self.__server.serve_forever, name="fr24-stand-in", daemon=True)
+        self.__thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop serving and close the socket.
+        """
+        if self.__server is None:
+            return
+
+        self.__server.shutdown()
+        self.__server.server_close()
+        self.__server = None
+        self.__thread = None
+
+    @contextlib.contextmanager
+    def use_core(self) -> Iterator["StandInServer"]:
+        """
+        Point Core at this server for the duration of a with block.
+
+        Process-wide, as Core.set_base_urls() is: every client in every thread
+        goes to this server until the block ends.
+        """
+        Core.set_base_urls(**self.base_urls)
+
+        try:
+            yield self
+        finally:
+            Core.reset_base_urls()
+
+    def _handle(self, handler: BaseHTTPRequestHandler) -> None:
+        parts = urlsplit(handler.path)
+        query = {name: values[0] for name, values in parse_qs(parts.query).items()}
+
+        with self.__lock:
+            self.requests[parts.path] += 1
+            roll = self.__rng.random()
+            delay = self.latency + self.__rng.uniform(0, self.jitter) if self.jitter else self.latency
+
+        if delay > 0:
+            time.sleep(delay)
+
+        headers: List[Tuple[str, str]] = []
+
+        if roll < self.cloudflare_rate:
+            status, content_type, body = 403, "text/html; charset=UTF-8", CHALLENGE_PAGE
+            headers.append(("cf-mitigated", "challenge"))
+        elif roll < self.cloudflare_rate + self.origin_error_rate:
+            status, content_type, body = 520, "text/html; charset=UTF-8", ORIGIN_ERROR_PAGE
+        else:
+            status, content_type, body = self.__route(handler, parts.path, query, headers)
+
+        self.__respond(handler, status, content_type, body, headers)
+
+    def __route(
+        self, handler: BaseHTTPRequestHandler, path: str, query: Dict[str, str], headers: List[Tuple[str, str]],
+    ) -> Tuple[int, str, bytes]:
+        if path == "/zones/fcgi/feed.js":
+            backend = self.__backend(handler, headers)
+            limit = int(query["limit"]) if query.get("limit", "").isdigit() else None
+
+            with self.__lock:
+                document = self.feed.empty_snapshot() if backend < self.empty_backends else self.feed.snapshot(limit)
+
+            return self.__json(document)
+
+        if path == "/clickhandler/":
+            with self.__lock:
+                if query.get("flight") not in self.feed.flight_ids:
+                    return 404, "application/json", b'{"error": "Not found"}'
+                return self.__json(self.feed.clickhandler(query["flight"]))
+
+        if path == "/common/v1/airport.json":
+            airport = _find_airport(query.get("code", ""))
+
+            if airport is None:
+                errors = {"errors": {"errors": {"parameters": {"code": {"notFound": "Airport not found"}}}}}
+                _, content_type, body = self.__json(errors)
+                return 400, content_type, body
+
+            plugin_data = {
+                "details": _airport_page_details(airport),
+                "runways": [{"name": "09L/27R", "length": {"ft": 12000, "m": 3658}}],
+                "schedule": {},
+                "flightdiary": {"ratings": {}},
+                "aircraftCount": {"onGround": {}},
+            }
+            return self.__json({"result": {"response": {"airport": {"pluginData": plugin_data}}}})
+
+        if path == "/airports/traffic-stats/":
+            airport = _find_airport(query.get("airport", ""))
+            return self.__json({"details": _airport_page_details(airport)} if airport else {})
+
+        if path == "/_json/airports.php":
+            rows = [
+                {"name": name, "iata": iata, "icao": icao, "lat": latitude, "lon": longitude, "country": country, "alt": altitude}
+                for iata, icao, name, latitude, longitude, altitude, country, *_ in AIRPORTS
+            ]
+            return self.__json({"version": "1", "rows": rows})
+
+        if path == "/data/airlines":
+            return 200, "text/html; charset=UTF-8", self.__airlines_page()
+
+        return 404, "text/html; charset=UTF-8", b"<html><body>Not found</body></html>"
+
+    def __backend(self, handler: BaseHTTPRequestHandler, headers: List[Tuple[str, str]]) -> int:
+        """Return the backend this request is pinned to, pinning it first if need be."""
+        cookies = dict(
+            part.strip().split("=", 1) for part in (handler.headers.get("Cookie") or "").split(";") if "=" in part
+        )
+        value = cookies.get("AWSALB", "")
+
+        if value.startswith("backend-") and value[8:].isdigit() and int(value[8:]) < self.backends:
+            return int(value[8:])
+
+        with self.__lock:
+            backend = self.__rng.randrange(self.backends)
+            self.pinned[backend] += 1
+
+        headers.extend(("Set-Cookie", f"{name}=backend-{backend}; Path=/") for name in STICKY_COOKIES)
+        return backend
+
+    @staticmethod
+    def __json(document: Any) -> Tuple[int, str, bytes]:
+        return 200, "application/json", json.dumps(document, separators=(",", ":")).encode()
+
+    @staticmethod
+    def __airlines_page() -> bytes:
+        rows = "".join(
+            f'<tr><td class="notranslate"><a href="/data/airlines/{iata.lower()}-{icao.lower()}">{name}</a></td>'
+            f"<td></td><td></td><td>{iata} / {icao}</td><td>{len(codes) * 40} aircraft</td></tr>"
+            for iata, icao, name, codes in AIRLINES
+        )
+        return f"<html><body><table><tbody>{rows}</tbody></table></body></html>".encode()
+
+    def __respond(
+        self, handler: BaseHTTPRequestHandler, status: int, content_type: str, body: bytes, headers: List[Tuple[str, str]],
+    ) -> None:
+        accepted = [token.split(";")[0].strip().lower() for token in (handler.headers.get("Accept-Encoding") or "").split(",")]
+        offered = AUTO_ENCODINGS if self.encoding == "auto" else (self.encoding,)
+        encoding = next((name for name in offered if name in accepted), None)
+
+        if encoding is not None:
+            body = _compress(body, encoding)
+
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(body)))
+
+        if encoding is not None:
+            handler.send_header("Content-Encoding", encoding)
+
+        for name, value in headers:
+            handler.send_header(name, value)
+
+        handler.end_headers()
+
+        if handler.command != "HEAD":
+            handler.wfile.write(body)
+
+        with self.__lock:
+            self.statuses[status] += 1
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+
+import dataclasses
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from .core import endpoint_table
+
+_logger = logging.getLogger(__name__)
+
+# Phases of a request, in seconds, that get_stats() sums and averages.
+TIMING_PHASES = ("namelookup", "connect", "appconnect", "starttransfer", "total", "decode", "parse")
+
+
+@dataclasses.dataclass
+class RequestTiming:
+    """
+    Where the time of one request went.
+
+    The libcurl times are cumulative from the start of the transfer, as libcurl
+    reports them: ``connect`` includes ``namelookup``, ``starttransfer`` (time to
+    first byte) includes the TLS handshake, and so on. They are 0 for a response
+    replayed from a cassette, and for a reused connection the name lookup,
+    connect and handshake times are 0 as well.
+
+    ``parse`` is filled in when the body is first parsed as JSON, which is after
+    the request hooks ran: read it from a record kept past the hook, or from
+    get_stats().
+    """
+
+    #: Name of the Core URL the request went to, e.g. "real_time_flight_tracker_data".
+    endpoint: str
+    url: str
+    method: str
+
+    #: Status code, or 0 when no response arrived.
+    status: int = 0
+
+    namelookup: float = 0.0
+    connect: float = 0.0
+    appconnect: float = 0.0
+    starttransfer: float = 0.0
+    total: float = 0.0
+
+    #: Seconds spent undoing the Content-Encoding.
+    decode: float = 0.0
+
+    #: Seconds spent parsing the body as JSON, once it is.
+    parse: Optional[float] = None
+
+    #: Body size as received, and after decoding.
+    wire_bytes: int = 0
+    decoded_bytes: int = 0
+
+    #: Content-Encoding the body arrived with, lowercased; "" for none.
+    encoding: str = ""
+
+    #: Attempts that came before this one under the retry policy.
+    retries: int = 0
+
+    #: Class name of the exception the request raised, if any.
+    error: Optional[str] = None
+
+
+RequestHook = Callable[[RequestTiming], Any]
+
+# Client events other than requests, reported to event hooks with a value.
+FEED_REROLL = "feed_reroll"  # get_flights() dropped a sticky backend that served an empty feed.
+FANOUT_QUEUE_DEPTH = "fanout_queue_depth"  # Detail requests of get_flights(details=True) still pending.
+RETRY_BUDGET_EXHAUSTED = "retry_budget_exhausted"  # A failed attempt was not retried for want of retry budget.
+CIRCUIT_OPENED = "circuit_opened"  # The circuit breaker cut off a failing host.
+DETAILS_SKIPPED = "details_skipped"  # Flights get_flights(details=True) returned without details, their host cut off.
+
+EventHook = Callable[[str, float], Any]
+
+
+def endpoint_name(url: str) -> str:
+    """
+    Return the name of the Core URL a request URL was built from.
+
+    Read off a table of Core's URLs, which follows Core.set_base_urls().
+
+    :param url: Full URL of a request
+    """
+    by_prefix, prefixes = endpoint_table()
+
+    # Most URLs are their Core URL plus a query string.
+    name = by_prefix.get(url.split("?", 1)[0])
+
+    if name is not None:
+        return name
+
+    for prefix, name in prefixes:
+        if url.startswith(prefix):
+            return name
+
+    return "unknown"
+
+
+class RequestStats:
+    """
+    Running totals of request timings, by endpoint.
+
+    Keeps sums rather than records, so its size does not grow with the number
+    of requests.
+    """
+
+    def __init__(self) -> None:
+        self.__lock = threading.Lock()
+        self.__endpoints: Dict[str, Dict[str, Any]] = {}
+
+    def __totals(self, endpoint: str) -> Dict[str, Any]:
+        totals = self.__endpoints.get(endpoint)
+
+        if totals is None:
+            totals = self.__endpoints[endpoint] = {
+                "requests": 0, "errors": 0, "retries": 0, "parsed": 0,
+                "wire_bytes": 0, "decoded_bytes": 0, "statuses": {},
+                "seconds": dict.fromkeys(TIMING_PHASES, 0.0),
+                "max_seconds": dict.fromkeys(TIMING_PHASES, 0.0),
+            }
+
+        return totals
+
+    def add(self, timing: RequestTiming) -> None:
+        """
+        Count a finished request.
+
+        :param timing: Its timing record
+        """
+        with self.__lock:
+            totals = self.__totals(timing.endpoint)
+            totals["requests"] += 1
+            totals["errors"] += timing.error is not None
+            totals["retries"] += timing.retries
+            totals["wire_bytes"] += timing.wire_bytes
+            totals["decoded_bytes"] += timing.decoded_bytes
+            totals["statuses"][timing.status] = totals["statuses"].get(timing.status, 0) + 1
+
+            for phase in TIMING_PHASES[:-1]:
+                seconds = getattr(timing, phase)
+                totals["seconds"][phase] += seconds
+                totals["max_seconds"][phase] = max(totals["max_seconds"][phase], seconds)
+
+    def add_parse(self, timing: RequestTiming) -> None:
+        """
+        Count the parse of a request already added.
+
+        :param timing: Its timing record, with ``parse`` set
+        """
+        with self.__lock:
+            totals = self.__totals(timing.endpoint)
+            totals["parsed"] += 1
+            totals["seconds"]["parse"] += timing.parse or 0.0
+            totals["max_seconds"]["parse"] = max(totals["max_seconds"]["parse"], timing.parse or 0.0)
+
+    def clear(self) -> None:
+        """
+        Forget every request counted so far.
+        """
+        with self.__lock:
+            self.__endpoints.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the totals by endpoint, with the mean of each phase.
+
+        Means are over the requests of the endpoint, except that of ``parse``,
+        which is over the responses that were parsed.
+        """
+        with self.__lock:
+            snapshot = {}
+
+            for endpoint, totals in self.__endpoints.items():
+                entry = dict(totals, statuses=dict(totals["statuses"]))
+                entry["seconds"] = dict(totals["seconds"])
+                entry["max_seconds"] = dict(totals["max_seconds"])
+                entry["mean_seconds"] = {
+                    phase: seconds / max(totals["parsed" if phase == "parse" else "requests"], 1)
+                    for phase, seconds in totals["seconds"].items()
+                }
+                snapshot[endpoint] = entry
+
+        return snapshot
+
+
+class RequestMonitor:
+    """
+    Receives the timing record of every request an APIClient makes.
+
+    Adds each one to ``stats`` and hands it to every hook, and passes client
+    events on to the event hooks. A failing hook is logged and skipped:
+    instrumentation must never fail the request it observes.
+    """
+
+    def __init__(self) -> None:
+        self.stats = RequestStats()
+        self.hooks: List[RequestHook] = []
+        self.event_hooks: List[EventHook] = []
+
+    def finished(self, timing: RequestTiming) -> None:
+        """
+        Report a request that got a response, or failed trying.
+
+        :param timing: Its timing record
+        """
+        self.stats.add(timing)
+
+        for hook in list(self.hooks):
+            try:
+                hook(timing)
+            except Exception:
+                _logger.exception("Request hook %r failed.", hook)
+
+    def parsed(self, timing: RequestTiming) -> None:
+        """
+        Report that the body of a finished request was parsed.
+
+        :param timing: Its timing record, with ``parse`` set
+        """
+        self.stats.add_parse(timing)
+
+    def event(self, name: str, value: float = 1.0) -> None:
+        """
+        Report a client event, such as FEED_REROLL.
+
+        :param name: Name of the event
+        :param value: Its value: 1 for a plain occurrence, or a level such as a queue depth
+        """
+        for hook in list(self.event_hooks):
+            try:
+                hook(name, value)
+            except Exception:
+                _logger.exception("Event hook %r failed.", hook)
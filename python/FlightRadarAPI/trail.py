@@ -0,0 +1,594 @@
+# -*- coding: utf-8 -*-
+
+import heapq
+import math
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union, overload
+
+# Clickhandler trail keys, in the order every encoded column is written.
+TRAIL_FIELDS = ("lat", "lng", "alt", "spd", "ts", "hd")
+
+# Coordinates are floats and the rest whole numbers. "q" for timestamps: "l" is
+# only 32 bits on Windows, and "i" is wide enough for feet, knots and degrees.
+_TYPECODES = {"lat": "d", "lng": "d", "alt": "i", "spd": "i", "ts": "q", "hd": "i"}
+
+_ENCODING_MAGIC = b"FRT"
+_ENCODING_VERSION = 1
+
+# Five decimals is about a metre, and what the clickhandler sends.
+DEFAULT_COORDINATE_PRECISION = 5
+
+EARTH_RADIUS_M = 6371000
+
+SIMPLIFY_METHODS = ("douglas-peucker", "visvalingam")
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    """Append ``value`` zigzag-folded and LEB128-encoded: small deltas, small bytes."""
+    value = value << 1 if value >= 0 else (-value << 1) - 1
+
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+
+    out.append(value)
+
+
+def _read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    """Return the zigzag varint at ``offset`` and the offset just past it."""
+    result = 0
+    shift = 0
+
+    while True:
+        if offset >= len(data):
+            raise ValueError("encoded trail ended mid-value")
+
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7F) << shift
+
+        if not byte & 0x80:
+            return (result >> 1) ^ -(result & 1), offset
+
+        shift += 7
+
+
+class Trail:
+    """
+    Compact flight trail, one typed array per clickhandler field.
+
+    A list of point dicts costs several hundred bytes a point; this holds the
+    same trail in 36. It reads like the list it replaces: indexing and
+    iteration yield point dicts, newest first as the clickhandler sends them.
+
+    Points are stored oldest first underneath, so newer ones append in place.
+    A point with no position is dropped, a missing integer field is held as 0,
+    and keys other than TRAIL_FIELDS are not kept.
+    """
+
+    __slots__ = ("_columns",)
+
+    def __init__(self, points: Optional[Iterable[Dict[str, Any]]] = None):
+        """
+        Constructor of the Trail class.
+
+        :param points: Trail points as received in the clickhandler "trail" list, in either order
+        """
+        self._columns: Dict[str, array] = {name: array(code) for name, code in _TYPECODES.items()}
+
+        if points is not None:
+            points = list(points)
+
+            # The clickhandler sends newest first; storage is oldest first.
+            if len(points) > 1 and (points[0].get("ts") or 0) > (points[-1].get("ts") or 0):
+                points.reverse()
+
+            self._extend(points)
+
+    @classmethod
+    def from_points(cls, points: Iterable[Dict[str, Any]]) -> "Trail":
+        """Build a Trail from clickhandler trail points."""
+        return cls(points)
+
+    def _extend(self, points: Iterable[Dict[str, Any]]) -> None:
+        """Append points, already oldest first, to the columns."""
+        columns = self._columns
+
+        for point in points:
+            # Half a position reads as located, so neither half is kept.
+            if point.get("lat") is None or point.get("lng") is None:
+                continue
+
+            for name, column in columns.items():
+                value = point.get(name)
+
+                if column.typecode == "d":
+                    column.append(float(point[name]))
+                else:
+                    column.append(int(value) if value is not None else 0)
+
+    def merge(self, points: Sequence[Dict[str, Any]]) -> int:
+        """
+        Append the points newer than the newest one held, and return how many were added.
+
+        Points are keyed by timestamp: any at or before the newest held point
+        is an overlap with a previous fetch and is skipped, as is a repeated
+        timestamp within ``points``. Scanning stops at the first overlap, so
+        merging a re-fetched trail costs only its new points.
+
+        :param points: Trail points as received in the clickhandler "trail" list, in either order
+        """
+        timestamps = self._columns["ts"]
+        newest = timestamps[-1] if timestamps else None
+
+        # The clickhandler sends newest first; walk from the newest end either way.
+        if len(points) > 1 and (points[0].get("ts") or 0) < (points[-1].get("ts") or 0):
+            points = points[::-1]
+
+        fresh: List[Dict[str, Any]] = []
+        previous = None
+
+        for point in points:
+            timestamp = point.get("ts")
+
+            if timestamp is None:
+                continue
+
+            timestamp = int(timestamp)
+
+            if newest is not None and timestamp <= newest:
+                break
+
+            if timestamp == previous:
+                continue
+
+            fresh.append(point)
+            previous = timestamp
+
+        fresh.reverse()
+        size = len(self)
+        self._extend(fresh)
+        return len(self) - size
+
+    def _select(self, positions: Iterable[int]) -> "Trail":
+        """Return a new Trail holding the points at public (newest first) ``positions``."""
+        size = len(self)
+        trail = Trail()
+
+        # Public positions are newest first; map them onto storage.
+        for position in sorted(positions, reverse=True):
+            for name, column in self._columns.items():
+                trail._columns[name].append(column[size - 1 - position])
+
+        return trail
+
+    def _point(self, index: int) -> Dict[str, Any]:
+        """Return the stored point at ``index``, counted oldest first."""
+        return {name: column[index] for name, column in self._columns.items()}
+
+    def __len__(self) -> int:
+        return len(self._columns["ts"])
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(len(self) - 1, -1, -1):
+            yield self._point(index)
+
+    @overload
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "Trail":
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict[str, Any], "Trail"]:
+        size = len(self)
+
+        if isinstance(index, slice):
+            return self._select(range(size)[index])
+
+        if index < 0:
+            index += size
+
+        if not 0 <= index < size:
+            raise IndexError("trail index out of range")
+
+        return self._point(size - 1 - index)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Trail):
+            return NotImplemented
+
+        return all(column == other._columns[name] for name, column in self._columns.items())
+
+    def __repr__(self) -> str:
+        return f"<Trail: {len(self)} points>"
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the point data itself."""
+        return sum(column.itemsize * len(column) for column in self._columns.values())
+
+    def column(self, name: str) -> array:
+        """
+        Return a copy of one field for every point, newest first.
+
+        :param name: One of TRAIL_FIELDS
+        """
+        if name not in self._columns:
+            raise KeyError(f"Unknown trail field: '{name}'")
+
+        values = array(self._columns[name].typecode, self._columns[name])
+        values.reverse()
+        return values
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """
+        Return the trail as the list of point dicts the clickhandler sent.
+        """
+        return list(self)
+
+    def to_numpy(self) -> Any:
+        """
+        Return the trail as a NumPy structured array, newest first.
+
+        NumPy is not a dependency of this package and must be installed to use this.
+        """
+        try:
+            import numpy
+        except ImportError as err:
+            raise ImportError("Trail.to_numpy() requires NumPy: pip install numpy") from err
+
+        dtype = [(name, numpy.dtype(code)) for name, code in _TYPECODES.items()]
+        result = numpy.empty(len(self), dtype=dtype)
+
+        for name, column in self._columns.items():
+            result[name] = numpy.frombuffer(column, dtype=result.dtype[name])[::-1]
+
+        return result
+
+    def encode(self, precision: int = DEFAULT_COORDINATE_PRECISION) -> bytes:
+        """
+        Serialise the trail as delta-encoded varints, for storage.
+
+        Each field is written as a column of differences from the previous
+        point, which are small along a trail and so take one or two bytes each.
+        Coordinates are rounded to ``precision`` decimal places; the other
+        fields are kept exactly.
+
+        :param precision: Decimal places kept on latitude and longitude
+        """
+        if not 0 <= precision <= 9:
+            raise ValueError("precision must be between 0 and 9")
+
+        scale = 10 ** precision
+        out = bytearray(_ENCODING_MAGIC)
+        out.append(_ENCODING_VERSION)
+        out.append(precision)
+        _write_varint(out, len(self))
+
+        for name, column in self._columns.items():
+            previous = 0
+
+            for value in column:
+                current = round(value * scale) if column.typecode == "d" else value
+                _write_varint(out, current - previous)
+                previous = current
+
+        return bytes(out)
+
+    @classmethod
+    def decode(cls, data: bytes) -> "Trail":
+        """
+        Rebuild a Trail from the bytes returned by encode().
+
+        :param data: Encoded trail
+        """
+        if data[:len(_ENCODING_MAGIC)] != _ENCODING_MAGIC:
+            raise ValueError("data is not an encoded trail")
+
+        offset = len(_ENCODING_MAGIC)
+
+        if len(data) < offset + 2 or data[offset] != _ENCODING_VERSION:
+            raise ValueError("unsupported encoded trail version")
+
+        precision = data[offset + 1]
+        scale = 10 ** precision
+        count, offset = _read_varint(data, offset + 2)
+
+        trail = cls()
+
+        for name, column in trail._columns.items():
+            current = 0
+
+            for _ in range(count):
+                delta, offset = _read_varint(data, offset)
+                current += delta
+                column.append(round(current / scale, precision) if column.typecode == "d" else current)
+
+        return trail
+
+
+TrailLike = Union[Trail, Sequence[Dict[str, Any]]]
+
+
+def _positions(trail: TrailLike) -> Tuple[List[int], List[float], List[float]]:
+    """Return the indices of the points that have a position, and their coordinates."""
+    if isinstance(trail, Trail):
+        return list(range(len(trail))), list(trail.column("lat")), list(trail.column("lng"))
+
+    indices = [
+        index for index, point in enumerate(trail)
+        if point.get("lat") is not None and point.get("lng") is not None
+    ]
+    return indices, [float(trail[i]["lat"]) for i in indices], [float(trail[i]["lng"]) for i in indices]
+
+
+def _unit_vectors(latitudes: Sequence[float], longitudes: Sequence[float]) -> List[Tuple[float, float, float]]:
+    """Place each point on the unit sphere.
+
+    Distances are taken on the sphere rather than on a map projection: no
+    projection is accurate along a long-haul trail, and none survives crossing
+    the antimeridian.
+    """
+    vectors = []
+
+    for latitude, longitude in zip(latitudes, longitudes):
+        lat, lng = math.radians(latitude), math.radians(longitude)
+        vectors.append((math.cos(lat) * math.cos(lng), math.cos(lat) * math.sin(lng), math.sin(lat)))
+
+    return vectors
+
+
+def _cross(a: Sequence[float], b: Sequence[float]) -> Tuple[float, float, float]:
+    return (a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0])
+
+
+def _dot(a: Sequence[float], b: Sequence[float]) -> float:
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def _douglas_peucker(vectors: Sequence[Sequence[float]], tolerance: float) -> List[int]:
+    """Return the indices Douglas-Peucker keeps, in pure Python.
+
+    Distance is cross-track: how far a point lies from the great circle through
+    the ends of the span. A chord would do for short spans, but the arc of a
+    50 km span already bows 58 m away from it.
+
+    Plain recursive splitting: n log n time when splits fall mid-span, n squared
+    at worst. The path-hull variant bounds that at n log n, but its hulls are
+    planar, and no projection keeps cross-track distances on a long-haul trail.
+    """
+    size = len(vectors)
+    keep = [False] * size
+    keep[0] = keep[-1] = True
+    limit = math.sin(min(tolerance / EARTH_RADIUS_M, math.pi / 2))
+
+    # A stack rather than recursion: a trail has thousands of points.
+    stack = [(0, size - 1)]
+
+    while stack:
+        first, last = stack.pop()
+        a = vectors[first]
+        normal = _cross(a, vectors[last])
+        normal_length = math.sqrt(_dot(normal, normal))
+        farthest, distance = -1, limit
+
+        for index in range(first + 1, last):
+            p = vectors[index]
+
+            if normal_length > 1e-12:
+                current = abs(_dot(p, normal)) / normal_length
+            else:
+                # A loop back to its start, such as a holding pattern.
+                offset = (p[0] - a[0], p[1] - a[1], p[2] - a[2])
+                current = math.sqrt(_dot(offset, offset))
+
+            if current > distance:
+                farthest, distance = index, current
+
+        if farthest != -1:
+            keep[farthest] = True
+            stack.append((first, farthest))
+            stack.append((farthest, last))
+
+    return [index for index in range(size) if keep[index]]
+
+
+def _douglas_peucker_numpy(vectors: Any, tolerance: float) -> List[int]:
+    """Return the indices Douglas-Peucker keeps, each span measured in one vectorised step.
+
+    The same splitting, and the same worst case, as _douglas_peucker().
+    """
+    import numpy
+
+    points = vectors.tolist()
+    size = len(vectors)
+    keep = numpy.zeros(size, dtype=bool)
+    keep[0] = keep[-1] = True
+    limit = math.sin(min(tolerance / EARTH_RADIUS_M, math.pi / 2))
+    stack = [(0, size - 1)]
+
+    while stack:
+        first, last = stack.pop()
+
+        if last - first < 2:
+            continue
+
+        # numpy.cross costs more than the whole span on short ones; three floats do not.
+        normal = _cross(points[first], points[last])
+        normal_length = math.sqrt(_dot(normal, normal))
+        span = vectors[first + 1:last]
+
+        if normal_length > 1e-12:
+            distances = numpy.abs(span @ numpy.array(normal)) / normal_length
+        else:
+            distances = numpy.linalg.norm(span - vectors[first], axis=1)
+
+        farthest = int(numpy.argmax(distances))
+
+        if distances[farthest] > limit:
+            farthest += first + 1
+            keep[farthest] = True
+            stack.append((first, farthest))
+            stack.append((farthest, last))
+
+    return [int(index) for index in numpy.flatnonzero(keep)]
+
+
+def _visvalingam(vectors: Sequence[Sequence[float]], tolerance: float) -> List[int]:
+    """Return the indices Visvalingam-Whyatt keeps, using a heap for n log n time."""
+    size = len(vectors)
+    limit = (tolerance / EARTH_RADIUS_M) ** 2
+    previous = list(range(-1, size - 1))
+    following = list(range(1, size + 1))
+    removed = [False] * size
+    areas = [math.inf] * size
+
+    def area(index: int) -> float:
+        # Spherical excess, so three points on one great circle enclose nothing.
+        a, b, c = vectors[previous[index]], vectors[index], vectors[following[index]]
+        triple = abs(_dot(a, _cross(b, c)))
+        return 2 * math.atan2(triple, 1 + _dot(a, b) + _dot(b, c) + _dot(c, a))
+
+    heap = []
+
+    for index in range(1, size - 1):
+        areas[index] = area(index)
+        heap.append((areas[index], index))
+
+    heapq.heapify(heap)
+
+    while heap:
+        current, index = heapq.heappop(heap)
+
+        # A stale entry: the point was removed, or its area changed since.
+        if removed[index] or current != areas[index]:
+            continue
+
+        if current >= limit:
+            break
+
+        removed[index] = True
+        before, after = previous[index], following[index]
+        following[before], previous[after] = after, before
+
+        for neighbour in (before, after):
+            if 0 < neighbour < size - 1:
+                # Never below the area just removed, so the order of removal holds.
+                areas[neighbour] = max(area(neighbour), current)
+                heapq.heappush(heap, (areas[neighbour], neighbour))
+
+    return [index for index in range(size) if not removed[index]]
+
+
+def _simplified_indices(vectors: Any, tolerance: float, method: str, vectorised: bool) -> List[int]:
+    if len(vectors) <= 2:
+        return list(range(len(vectors)))
+
+    if method == "visvalingam":
+        return _visvalingam(vectors.tolist() if vectorised else vectors, tolerance)
+
+    return _douglas_peucker_numpy(vectors, tolerance) if vectorised else _douglas_peucker(vectors, tolerance)
+
+
+def _rebuild(trail: TrailLike, indices: List[int]) -> TrailLike:
+    if isinstance(trail, Trail):
+        return trail._select(indices)
+
+    return [trail[index] for index in indices]
+
+
+def _check_simplify_args(tolerance: float, method: str) -> None:
+    if tolerance < 0:
+        raise ValueError("tolerance must be >= 0")
+
+    if method not in SIMPLIFY_METHODS:
+        raise ValueError(f"Unknown method: '{method}'. Use one of {', '.join(SIMPLIFY_METHODS)}.")
+
+
+def _numpy() -> Any:
+    try:
+        import numpy
+    except ImportError:
+        return None
+
+    return numpy
+
+
+def simplify_trail(trail: TrailLike, tolerance: float, method: str = "douglas-peucker") -> TrailLike:
+    """
+    Drop trail points that do not change its shape by more than ``tolerance`` metres.
+
+    Retained points are returned whole, altitude and timestamp included, in
+    their original order and as the same type that was passed: a Trail or a
+    list of point dicts. The first and last points are always kept, and points
+    with no position are dropped.
+
+    Douglas-Peucker keeps every point that lies further than ``tolerance`` from
+    the simplified line; it is vectorised when NumPy is installed. It takes
+    n log n time when its splits fall near the middle of their spans, as they
+    do along a flight path, but n squared at worst, on a trail that gives up
+    one point per split, such as a long spiral. Visvalingam drops points whose
+    triangle with their neighbours is smaller than ``tolerance`` squared, and
+    runs in n log n time on any trail: use it where that bound matters.
+
+    :param trail: A Trail, or the list of points of Flight.trail
+    :param tolerance: Largest deviation to simplify away, in metres
+    :param method: "douglas-peucker" or "visvalingam"
+    """
+    return simplify_trails([trail], tolerance, method)[0]
+
+
+def simplify_trails(
+    trails: Iterable[TrailLike], tolerance: float, method: str = "douglas-peucker",
+) -> List[TrailLike]:
+    """
+    Simplify many trails at once, as simplify_trail(...) does for one.
+
+    With NumPy installed, the points of every trail are placed on the sphere in
+    a single vectorised pass before each trail is simplified.
+
+    :param trails: Trails, or lists of points such as [flight.trail for flight in flights]
+    :param tolerance: Largest deviation to simplify away, in metres
+    :param method: "douglas-peucker" or "visvalingam"
+    """
+    _check_simplify_args(tolerance, method)
+
+    trails = list(trails)
+    positions = [_positions(trail) for trail in trails]
+    numpy = _numpy()
+
+    if numpy is None:
+        return [
+            _rebuild(trail, [indices[i] for i in _simplified_indices(
+                _unit_vectors(latitudes, longitudes), tolerance, method, vectorised=False,
+            )])
+            for trail, (indices, latitudes, longitudes) in zip(trails, positions)
+        ]
+
+    latitudes = numpy.radians(numpy.fromiter(
+        (value for _, lats, _ in positions for value in lats), dtype=float,
+    ))
+    longitudes = numpy.radians(numpy.fromiter(
+        (value for _, _, lngs in positions for value in lngs), dtype=float,
+    ))
+    vectors = numpy.column_stack((
+        numpy.cos(latitudes) * numpy.cos(longitudes),
+        numpy.cos(latitudes) * numpy.sin(longitudes),
+        numpy.sin(latitudes),
+    ))
+
+    simplified = []
+    start = 0
+
+    for trail, (indices, _, _) in zip(trails, positions):
+        end = start + len(indices)
+        kept = _simplified_indices(vectors[start:end], tolerance, method, vectorised=True)
+        simplified.append(_rebuild(trail, [indices[i] for i in kept]))
+        start = end
+
+    return simplified
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+End-to-end throughput and latency of get_flights() against the local stand-in server.
+
+Starts a StandInServer in-process, points a client at it per thread and calls get_flights()
+from --threads threads for --duration seconds, through the real request path.
+Prints the throughput and the latency percentiles as JSON:
+
+    python benchmarks/end_to_end.py --flights 5000 --latency 0.02 --threads 4
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import FlightRadarAPI  # noqa: E402
+from FlightRadarAPI import FlightRadar24API  # noqa: E402
+from FlightRadarAPI.errors import FlightRadarError  # noqa: E402
+from FlightRadarAPI.testing import FeedGenerator, StandInServer  # noqa: E402
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Return the value below which ``fraction`` of ``values`` fall, by nearest rank.
+
+    :param values: Sorted sample
+    :param fraction: Between 0 and 1
+    """
+    return values[min(int(fraction * len(values)), len(values) - 1)]
+
+
+def run(server: StandInServer, threads: int, duration: float) -> Dict[str, Any]:
+    """
+    Call get_flights() in a loop from ``threads`` threads and return the statistics.
+
+    :param server: Running stand-in server
+    :param threads: Number of concurrent callers, one client each
+    :param duration: Seconds to keep calling
+    """
+    latencies: List[float] = []
+    errors: List[str] = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker() -> None:
+        api = FlightRadar24API(base_urls=server.base_urls)
+
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+
+            try:
+                api.get_flights()
+            except FlightRadarError as error:
+                with lock:
+                    errors.append(type(error).__name__)
+                continue
+
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+
+    for thread in workers:
+        thread.start()
+
+    for thread in workers:
+        thread.join()
+
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    return {
+        "calls": len(latencies),
+        "errors": len(errors),
+        "calls_per_s": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3) if latencies else None,
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+        "mean_ms": round(statistics.mean(latencies) * 1000, 3) if latencies else None,
+        "server_requests": dict(server.requests),
+        "server_statuses": {str(status): count for status, count in server.statuses.items()},
+    }
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flights", type=int, default=1000, help="flights in the generated feed")
+    parser.add_argument("--threads", type=int, default=1, help="concurrent callers")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds to keep calling")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the server holds every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random seconds on top of --latency")
+    parser.add_argument("--encoding", default="br", help="br, gzip, deflate or none")
+    parser.add_argument("--empty-backends", type=int, default=0, help="feed backends, out of 4, serving an empty feed")
+    parser.add_argument("--cloudflare-rate", type=float, default=0.0, help="fraction of requests blocked by Cloudflare")
+    parser.add_argument("--origin-error-rate", type=float, default=0.0, help="fraction of requests answered with a 520")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the feed and the server")
+    args = parser.parse_args(argv)
+
+    logging.getLogger("FlightRadarAPI").setLevel(logging.ERROR)
+
+    server = StandInServer(
+        FeedGenerator(args.flights, seed=args.seed),
+        latency=args.latency,
+        jitter=args.jitter,
+        encoding=None if args.encoding == "none" else args.encoding,
+        empty_backends=args.empty_backends,
+        cloudflare_rate=args.cloudflare_rate,
+        origin_error_rate=args.origin_error_rate,
+        seed=args.seed,
+    )
+
+    with server:
+        report = run(server, args.threads, args.duration)
+
+    report.update(version=FlightRadarAPI.__version__, arguments=vars(args))
+    print(json.dumps(report, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
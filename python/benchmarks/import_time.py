@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Measure how long importing FlightRadarAPI takes in a fresh interpreter.
+
+Each statement runs in a new process, several times, and the median wall time
+of the statement alone is reported (interpreter start-up is excluded). Pass
+--max-ms to fail when a median goes over budget, e.g. in CI:
+
+    python benchmarks/import_time.py --repeat 15 --max-ms 40
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATEMENTS = {
+    "package": "import FlightRadarAPI",
+    "entities": "from FlightRadarAPI import Flight, Trail",
+    "client": "from FlightRadarAPI import FlightRadar24API",
+}
+
+_TIMER = "import time; start = time.perf_counter(); {statement}; print(time.perf_counter() - start)"
+
+
+def time_statement(statement: str, repeat: int) -> List[float]:
+    """
+    Run ``statement`` in ``repeat`` fresh interpreters and return each run's time in milliseconds.
+
+    :param statement: Python source to time
+    :param repeat: Number of interpreters to start
+    """
+    env = dict(os.environ, PYTHONPATH=PACKAGE_ROOT)
+    code = _TIMER.format(statement=statement)
+    timings = []
+
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", code], env=env, check=True, capture_output=True, text=True).stdout
+        timings.append(float(output.split()[-1]) * 1000)
+
+    return timings
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10, help="interpreters to start per statement")
+    parser.add_argument("--max-ms", type=float, help="fail if the 'package' median exceeds this many milliseconds")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Dict[str, float]] = {}
+
+    for name, statement in STATEMENTS.items():
+        timings = time_statement(statement, args.repeat)
+        results[name] = {"median_ms": round(statistics.median(timings), 3), "min_ms": round(min(timings), 3)}
+
+    print(json.dumps({"python": sys.version.split()[0], "import_time": results}, indent=2))
+
+    if args.max_ms is not None and results["package"]["median_ms"] > args.max_ms:
+        median = results["package"]["median_ms"]
+        print(f"import FlightRadarAPI took {median} ms, over the {args.max_ms} ms budget", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
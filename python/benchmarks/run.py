@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+Offline benchmarks for the parsers, the entities and the body decoders.
+
+Every case runs against the bundled test fixtures or against larger inputs
+generated here from a fixed seed, so two runs on the same machine measure the
+same work and no network is needed. Results are printed as JSON:
+
+    python benchmarks/run.py --output bench.json
+
+Save one run as a baseline and compare later runs against it. Cases whose
+median time grew past --max-regression times the baseline fail the run:
+
+    python benchmarks/run.py --baseline bench.json --max-regression 1.25
+"""
+
+import argparse
+import functools
+import gzip
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import brotli
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(PACKAGE_ROOT, "tests", "fixtures")
+
+sys.path.insert(0, PACKAGE_ROOT)
+
+import FlightRadarAPI  # noqa: E402
+from FlightRadarAPI import Cassette, Flight, FlightRadar24API  # noqa: E402
+from FlightRadarAPI.parsers import _parse_airlines_html_soup, parse_airlines_html, parse_airports_json  # noqa: E402
+from FlightRadarAPI.request import _decompress_brotli, _decompress_deflate, _decompress_gzip  # noqa: E402
+from FlightRadarAPI.testing import FeedGenerator, StandInServer  # noqa: E402
+
+SEED = 24
+
+# A case is built once, then its callable is timed: (function, items it handles per call).
+Case = Tuple[Callable[[], Any], int]
+
+AIRLINES = [("LA", "LAN"), ("G3", "GLO"), ("DL", "DAL"), ("AA", "AAL"), ("LH", "DLH"), ("TK", "THY")]
+
+
+def _load(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+
+def _airports_payload(count: int) -> bytes:
+    rng = random.Random(SEED)
+    rows = [
+        {
+            "name": f"Airport {i}", "iata": f"{i % 17576:03d}", "icao": f"X{i % 456976:04d}",
+            "lat": round(rng.uniform(-90, 90), 6), "lon": round(rng.uniform(-180, 180), 6),
+            "country": rng.choice(["Brazil", "United States", "Germany", "Turkey", "Japan"]),
+            "alt": rng.randint(-50, 4000),
+        }
+        for i in range(count)
+    ]
+    return json.dumps({"version": "1", "rows": rows}).encode()
+
+
+def _airlines_page(count: int) -> bytes:
+    rng = random.Random(SEED)
+    row = (
+        '<tr><td class="logo"><img src="/logo/{0}.png" alt=""></td>'
+        '<td class="notranslate"><a href="/data/airlines/{0}" title="Airline {0}">Airline &amp; Co {0}</a></td>'
+        "<td><span>x</span></td><td class=\"notranslate\">{1} / {2}</td><td>{3} aircraft</td></tr>\n"
+    )
+    rows = "".join(row.format(i, *rng.choice(AIRLINES), rng.randint(1, 900)) for i in range(count))
+    footer = "<div class=\"footer\"><p>Footer</p></div>\n" * (count * 2)
+    return f"<html><head><meta charset=\"utf-8\"></head><body><table><tbody>{rows}</tbody></table>{footer}</body></html>".encode()
+
+
+def _replay_case(feed: FeedGenerator, encoding: str, stream_parse: bool = False) -> Case:
+    """get_flights() replayed from a cassette: the whole request pipeline, minus the network."""
+    server = StandInServer(feed, encoding=encoding)
+    cassette = Cassette(mode="record")
+
+    with server:
+        base_urls = server.base_urls
+        FlightRadar24API(cassette=cassette, base_urls=base_urls).get_flights()
+
+    cassette.mode = "replay"
+    api = FlightRadar24API(cassette=cassette, stream_parse=stream_parse, base_urls=base_urls)
+    return api.get_flights, len(feed.flight_ids)
+
+
+def build_cases(scale: float, name_filter: str = "") -> Dict[str, Case]:
+    """
+    Build the benchmark cases whose name contains ``name_filter``.
+
+    Only what the selected cases use is built: a stand-in server recording a
+    cassette, or a generated input, costs seconds that a filtered run need not pay.
+
+    :param scale: Multiplier for the size of the generated inputs
+    :param name_filter: Text the name of a case must contain; every case when empty
+    """
+    def size(count: int) -> int:
+        return max(int(count * scale), 1)
+
+    # Inputs shared by several cases, each made on first use.
+    @functools.lru_cache(maxsize=None)
+    def airports_large() -> bytes:
+        return _airports_payload(size(50_000))
+
+    @functools.lru_cache(maxsize=None)
+    def airlines_large() -> bytes:
+        return _airlines_page(size(2_000))
+
+    @functools.lru_cache(maxsize=None)
+    def feed_rows() -> Tuple[FeedGenerator, List[Tuple[str, Any]], List[Flight]]:
+        feed = FeedGenerator(size(10_000), seed=SEED, trail_points=size(500))
+        snapshot = feed.snapshot()
+        rows = [(flight_id, snapshot[flight_id]) for flight_id in feed.flight_ids]
+        return feed, rows, [Flight(flight_id, info) for flight_id, info in rows]
+
+    def parse_airports_fixture() -> Case:
+        airports_fixture = _load("airports.json")
+        return (lambda: parse_airports_json(airports_fixture), 1)
+
+    def parse_airlines_fixture() -> Case:
+        airlines_fixture = _load("airlines.html")
+        return (lambda: parse_airlines_html(airlines_fixture), 1)
+
+    def flight_construct() -> Case:
+        rows = feed_rows()[1]
+        return (lambda: [Flight(flight_id, info) for flight_id, info in rows], len(rows))
+
+    def flight_set_details() -> Case:
+        feed, _, flights = feed_rows()
+        details = feed.clickhandler(feed.flight_ids[0])
+        return (lambda: flights[0].set_flight_details(details), 1)
+
+    def flight_check_info() -> Case:
+        flights = feed_rows()[2]
+        query = {"min_altitude": 10000, "max_altitude": 36000, "airline_icao": "GLO"}
+        return (lambda: [flight for flight in flights if flight.check_info(**query)], len(flights))
+
+    def decompress(encoding: str) -> Case:
+        body = airports_large()
+        compressors: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+            "gzip": (gzip.compress, _decompress_gzip),
+            "deflate": (zlib.compress, _decompress_deflate),
+            # Quality 5, about what servers use for dynamic responses; 11 takes seconds to build.
+            "br": (lambda data: brotli.compress(data, quality=5), _decompress_brotli),
+        }
+        compress, decode = compressors[encoding]
+        data = compress(body)
+        return (lambda: decode(data), len(body))
+
+    builders: Dict[str, Callable[[], Case]] = {
+        "parse_airports_json.fixture": parse_airports_fixture,
+        "parse_airports_json.large": lambda: (lambda: parse_airports_json(airports_large()), size(50_000)),
+        "parse_airports_json.large.filtered": lambda: (
+            lambda: parse_airports_json(airports_large(), ["Brazil"]), size(50_000),
+        ),
+        "parse_airlines_html.fixture": parse_airlines_fixture,
+        "parse_airlines_html.large": lambda: (lambda: parse_airlines_html(airlines_large()), size(2_000)),
+        "parse_airlines_html.large.soup": lambda: (lambda: _parse_airlines_html_soup(airlines_large()), size(2_000)),
+        "flight.construct": flight_construct,
+        "flight.set_flight_details": flight_set_details,
+        "flight.check_info": flight_check_info,
+        "pipeline.get_flights.replay.br": lambda: _replay_case(FeedGenerator(size(5_000), seed=SEED), "br"),
+        "pipeline.get_flights.replay.gzip": lambda: _replay_case(FeedGenerator(size(5_000), seed=SEED), "gzip"),
+        "pipeline.get_flights.replay.br.stream_parse": lambda: _replay_case(
+            FeedGenerator(size(5_000), seed=SEED), "br", True,
+        ),
+        "decompress.gzip": lambda: decompress("gzip"),
+        "decompress.deflate": lambda: decompress("deflate"),
+        "decompress.br": lambda: decompress("br"),
+    }
+
+    return {name: build() for name, build in builders.items() if name_filter in name}
+
+
+def measure(function: Callable[[], Any], min_time: float, rounds: int) -> Dict[str, Any]:
+    """
+    Time ``function`` and return the per-call statistics of its rounds.
+
+    Each round calls it enough times to last about ``min_time`` seconds, so
+    short calls are not dominated by timer resolution.
+
+    :param function: The call to time
+    :param min_time: Target duration of one round, in seconds
+    :param rounds: Number of rounds
+    """
+    function()  # Warm up caches and lazy imports outside the measurement.
+
+    start = time.perf_counter()
+    function()
+    once = time.perf_counter() - start
+    number = max(int(min_time / once), 1) if once > 0 else 1000
+
+    timings = []
+
+    for _ in range(rounds):
+        start = time.perf_counter()
+
+        for _ in range(number):
+            function()
+
+        timings.append((time.perf_counter() - start) / number)
+
+    return {
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "stdev_s": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "calls_per_round": number,
+        "rounds": rounds,
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], max_regression: float) -> Tuple[Dict[str, float], List[str]]:
+    """
+    Return each case's median as a ratio of the baseline's, and the cases past ``max_regression``.
+
+    :param results: Benchmarks of this run, by case name
+    :param baseline: Benchmarks of the baseline run, by case name
+    :param max_regression: Largest acceptable ratio
+    """
+    ratios = {
+        name: round(result["median_s"] / baseline[name]["median_s"], 3)
+        for name, result in results.items()
+        if name in baseline and baseline[name]["median_s"] > 0
+    }
+    regressions = sorted(name for name, ratio in ratios.items() if ratio > max_regression)
+    return ratios, regressions
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this text")
+    parser.add_argument("--scale", type=float, default=1.0, help="size multiplier for the generated inputs")
+    parser.add_argument("--rounds", type=int, default=5, help="rounds per case")
+    parser.add_argument("--min-time", type=float, default=0.2, help="target seconds per round")
+    parser.add_argument("--output", help="also write the results to this file")
+    parser.add_argument("--baseline", help="results file of an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, default=1.25, help="fail when a median grows past this ratio")
+    args = parser.parse_args(argv)
+
+    # The fixtures carry deliberately broken rows: their warnings are expected.
+    logging.getLogger("FlightRadarAPI").setLevel(logging.ERROR)
+
+    baseline: Optional[Dict[str, Dict]] = None
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["benchmarks"]
+
+    results: Dict[str, Dict] = {}
+
+    for name, (function, items) in build_cases(args.scale, args.filter).items():
+        result = measure(function, args.min_time, args.rounds)
+        result["items"] = items
+        results[name] = result
+        print(f"{name:40} {result['median_s'] * 1000:10.3f} ms", file=sys.stderr)
+
+    report: Dict[str, Any] = {
+        "version": FlightRadarAPI.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": args.scale,
+        "benchmarks": results,
+    }
+    regressions: List[str] = []
+
+    if baseline is not None:
+        report["baseline_ratio"], regressions = compare(results, baseline, args.max_regression)
+        report["regressions"] = regressions
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    print(text)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+    if regressions:
+        print(f"Slower than the baseline by more than {args.max_regression}x: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""Smoke tests for the offline benchmark suite.
+
+The benchmarks are not timed here, only kept runnable: a case that breaks when
+the code under it changes would otherwise go unnoticed until release.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import run as benchmarks  # noqa: E402
+
+
+def test_every_benchmark_case_runs_at_small_scale():
+    cases = benchmarks.build_cases(scale=0.01)
+
+    assert {name.split(".")[0] for name in cases} == {
+        "parse_airports_json", "parse_airlines_html", "flight", "pipeline", "decompress",
+    }
+
+    for name, (function, items) in cases.items():
+        function()
+        assert items >= 1, name
+
+
+def test_a_filtered_run_builds_only_the_cases_it_selects(monkeypatch):
+    built = []
+    monkeypatch.setattr(benchmarks, "_replay_case", lambda *args: built.append(args) or (lambda: None, 1))
+
+    cases = benchmarks.build_cases(scale=0.01, name_filter="decompress.gzip")
+
+    assert list(cases) == ["decompress.gzip"]
+    assert built == []
+
+
+def test_measure_reports_per_call_statistics():
+    result = benchmarks.measure(lambda: None, min_time=0.001, rounds=3)
+    assert result["rounds"] == 3
+    assert 0 <= result["min_s"] <= result["median_s"]
+
+
+def test_compare_flags_only_cases_past_the_threshold():
+    baseline = {"fast": {"median_s": 1.0}, "slow": {"median_s": 1.0}, "gone": {"median_s": 1.0}}
+    results = {"fast": {"median_s": 1.1}, "slow": {"median_s": 1.5}, "new": {"median_s": 1.0}}
+
+    ratios, regressions = benchmarks.compare(results, baseline, max_regression=1.25)
+
+    assert ratios == {"fast": 1.1, "slow": 1.5}
+    assert regressions == ["slow"]
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""Offline tests for the record/replay cassette of ``APIClient``.
+
+Responses are recorded from the local stand-in server, which is stopped
+before replaying, so every replay below provably runs without a network and
+still goes through decoding, the Cloudflare check and the status check.
+"""
+
+import contextlib
+import json
+
+import pytest
+
+from FlightRadarAPI import Cassette, CassetteMissError, CloudflareError, FlightRadar24API
+from FlightRadarAPI.core import Core
+from FlightRadarAPI.request import APIClient
+from FlightRadarAPI.testing import FeedGenerator, StandInServer
+
+
+def _record(path, **server_kwargs):
+    server = StandInServer(FeedGenerator(20, seed=2), **server_kwargs)
+    cassette = Cassette(str(path), mode="record")
+
+    with server, server.use_core():
+        base_urls = server.base_urls
+        api = FlightRadar24API(cassette=cassette)
+
+        try:
+            flights = api.get_flights()
+        finally:
+            cassette.save()
+
+    return server, base_urls, flights
+
+
+@contextlib.contextmanager
+def _recorded_urls(base_urls):
+    """Point Core where the recording went, with that server long stopped."""
+    Core.set_base_urls(**base_urls)
+
+    try:
+        yield
+    finally:
+        Core.reset_base_urls()
+
+
+def test_replay_matches_the_recording(tmp_path):
+    path = tmp_path / "feed.json"
+    server, base_urls, flights = _record(path, encoding="br")
+
+    with _recorded_urls(base_urls):
+        replayed = FlightRadar24API(cassette=Cassette(str(path))).get_flights()
+
+    assert [flight.id for flight in replayed] == [flight.id for flight in flights]
+    assert server.requests["/zones/fcgi/feed.js"] == 1
+
+
+def test_body_is_recorded_as_received(tmp_path):
+    path = tmp_path / "feed.json"
+    _record(path, encoding="gzip")
+
+    exchange = json.loads(path.read_text())["exchanges"][0]
+
+    assert ["Content-Encoding", "gzip"] in exchange["headers"]
+    assert exchange["body"].startswith("H4sI")  # Base64 of the gzip magic number.
+
+
+def test_repeated_requests_replay_in_order(tmp_path):
+    path = tmp_path / "feed.json"
+    server, base_urls, _ = _record(path, backends=2, empty_backends=2)
+    cassette = Cassette(str(path))
+
+    assert len(cassette) == server.requests["/zones/fcgi/feed.js"]
+
+    with _recorded_urls(base_urls):
+        assert FlightRadar24API(cassette=cassette).get_flights() == []
+        # The last exchange keeps answering once the sequence is used up.
+        assert FlightRadar24API(cassette=cassette).get_flights() == []
+
+
+def test_replayed_cloudflare_block_raises(tmp_path):
+    path = tmp_path / "blocked.json"
+
+    server = StandInServer(cloudflare_rate=1.0)
+    cassette = Cassette(str(path), mode="record")
+
+    with server, server.use_core(), pytest.raises(CloudflareError):
+        FlightRadar24API(cassette=cassette).get_flights()
+
+    cassette.save()
+
+    with pytest.raises(CloudflareError):
+        APIClient(cassette=Cassette(str(path))).request(cassette.exchanges[0]["url"])
+
+
+def test_replayed_cookies_reach_the_jar(tmp_path):
+    path = tmp_path / "feed.json"
+    _record(path)
+    client = APIClient(cassette=Cassette(str(path)))
+    exchange = json.loads(path.read_text())["exchanges"][0]
+
+    client.request(exchange["url"])
+
+    assert client.get_cookie("AWSALB") is not None
+
+
+def test_unrecorded_request_raises(tmp_path):
+    path = tmp_path / "feed.json"
+    _record(path)
+
+    with pytest.raises(CassetteMissError):
+        FlightRadar24API(cassette=Cassette(str(path))).get_airlines()
+
+
+def test_post_data_is_not_stored():
+    cassette = Cassette(mode="record")
+    server = StandInServer()
+
+    with server, server.use_core():
+        APIClient(cassette=cassette).request(
+            server.url + "/user/login", data={"password": "hunter2"}, allowed_error_codes=[404],
+        )
+
+    assert "hunter2" not in json.dumps(cassette.exchanges)
+    assert cassette.exchanges[0]["data_sha256"]
+
+
+def test_invalid_mode_and_version(tmp_path):
+    with pytest.raises(ValueError):
+        Cassette(mode="rewind")
+
+    path = tmp_path / "future.json"
+    path.write_text(json.dumps({"version": 99, "exchanges": []}))
+
+    with pytest.raises(ValueError):
+        Cassette(str(path))
+
+    with pytest.raises(ValueError):
+        Cassette(mode="record").save()
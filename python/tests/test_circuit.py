@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""Offline tests for the per-host circuit breaker (``CircuitBreaker``).
+
+The state machine runs on a fake clock. End to end, the clickhandler host is
+pointed at a closed port while the feed stays on the stand-in server, so the
+detail fan-out fails fast and for real.
+"""
+
+import socket
+
+import pytest
+from curl_cffi.requests import exceptions as curl_errors
+
+from FlightRadarAPI import CircuitBreaker, CircuitOpenError, FlightRadar24API
+from FlightRadarAPI import circuit as circuit_module
+from FlightRadarAPI.core import Core
+from FlightRadarAPI.request import APIClient
+from FlightRadarAPI.testing import FeedGenerator, StandInServer
+from FlightRadarAPI.timing import CIRCUIT_OPENED, DETAILS_SKIPPED
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _closed_port_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def test_opens_at_the_failure_rate_then_probes(clock):
+    breaker = CircuitBreaker(failure_rate=0.5, min_requests=4, open_for=10.0)
+
+    for failure in (None, "timeout", None):
+        breaker.before("a.test")
+        assert breaker.record("a.test", failure) is None
+
+    breaker.before("a.test")
+    assert breaker.record("a.test", "server") == "open"
+
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.before("a.test")
+
+    assert excinfo.value.retry_in == pytest.approx(10.0)
+    breaker.before("b.test")  # Other hosts are untouched.
+
+    clock[0] += 10.0
+    breaker.before("a.test")
+    assert breaker.state("a.test") == "half_open"
+
+    # One probe at a time.
+    with pytest.raises(CircuitOpenError):
+        breaker.before("a.test")
+
+    assert breaker.record("a.test", None) == "closed"
+    breaker.before("a.test")
+
+
+def test_a_failed_probe_opens_it_again(clock):
+    breaker = CircuitBreaker(min_requests=1, open_for=5.0)
+    breaker.before("a.test")
+    breaker.record("a.test", "connection")
+
+    clock[0] += 5.0
+    breaker.before("a.test")
+    assert breaker.record("a.test", "timeout") == "open"
+    assert breaker.state("a.test") == "open"
+
+
+def test_only_trip_classes_count(clock):
+    breaker = CircuitBreaker(min_requests=1)
+
+    for failure in ("other", "cloudflare", "rate_limit"):
+        breaker.before("a.test")
+        assert breaker.record("a.test", failure) is None
+
+    assert breaker.state("a.test") == "closed"
+
+
+def test_old_failures_leave_the_window(clock):
+    breaker = CircuitBreaker(failure_rate=0.6, min_requests=2, window=10.0)
+    breaker.before("a.test")
+    breaker.record("a.test", "timeout")
+
+    clock[0] += 11.0
+    breaker.before("a.test")
+    assert breaker.record("a.test", None) is None
+    breaker.before("a.test")
+    assert breaker.record("a.test", "timeout") is None
+
+
+def test_circuits_per_endpoint():
+    breaker = CircuitBreaker(per="endpoint")
+    assert breaker.key(Core.flight_data_url.format("abc")) == "flight_data"
+    assert CircuitBreaker().key(Core.flight_data_url.format("abc")) == "data-live.flightradar24.com"
+
+    with pytest.raises(ValueError):
+        CircuitBreaker(per="path")
+
+
+def test_client_fails_fast_once_open():
+    breaker = CircuitBreaker(min_requests=2, open_for=60.0)
+    client = APIClient(circuit_breaker=breaker)
+    events = []
+    client.add_event_hook(lambda name, value: events.append(name))
+    url = _closed_port_url()
+
+    for _ in range(2):
+        with pytest.raises(curl_errors.RequestException):
+            client.request(url)
+
+    with pytest.raises(CircuitOpenError):
+        client.request(url)
+
+    assert events == [CIRCUIT_OPENED]
+
+
+def test_get_flights_returns_unenriched_flights_when_details_fail():
+    events = []
+
+    with StandInServer(FeedGenerator(40, seed=5)) as server, server.use_core():
+        Core.set_base_urls(data_live_base_url=_closed_port_url())
+        api = FlightRadar24API(circuit_breaker=CircuitBreaker(min_requests=3), max_workers=4)
+        api.add_event_hook(lambda name, value: events.append((name, value)))
+
+        flights = api.get_flights(details=True)
+
+    assert sorted(flight.id for flight in flights) == sorted(server.feed.flight_ids)
+    assert (DETAILS_SKIPPED, 40) in events
+    assert (CIRCUIT_OPENED, 1.0) in events
+    # Only the requests made before it opened reached the dead host.
+    assert api.get_stats()["flight_data"]["requests"] < 40
+
+
+def test_without_a_breaker_details_failures_still_raise():
+    with StandInServer(FeedGenerator(3, seed=5)) as server, server.use_core():
+        Core.set_base_urls(data_live_base_url=_closed_port_url())
+
+        with pytest.raises(curl_errors.RequestException):
+            FlightRadar24API().get_flights(details=True)
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""Offline tests for call deadlines (``Deadline``, ``get_flights(deadline=...)``).
+
+A deadline must bound the whole call: requests get no more than the time
+left, none is started without enough of it, and get_flights() hands back
+what it gathered, flagged incomplete, rather than raising. The feed may take
+only its share of it, however slow, so the details always get the rest.
+"""
+
+import time
+
+import pytest
+from curl_cffi.requests import exceptions as curl_errors
+
+from FlightRadarAPI import Deadline, DeadlineExceededError, FlightList, FlightRadar24API, RetryPolicy
+from FlightRadarAPI.api import FEED_DEADLINE_SHARE
+from FlightRadarAPI import deadline as deadline_module
+from FlightRadarAPI.request import _run_with_retry
+from FlightRadarAPI.testing import FeedGenerator, StandInServer
+
+
+class _FlakyFeed(StandInServer):
+    """Answers its first ``failures`` feed requests with a 520, ``feed_latency`` seconds late."""
+
+    def __init__(self, feed, failures, feed_latency, **kwargs):
+        super().__init__(feed, **kwargs)
+        self.failures = failures
+        self.feed_latency = feed_latency
+
+    def _handle(self, handler):
+        if handler.path.startswith("/zones/fcgi/feed.js") and self.failures:
+            self.failures -= 1
+            time.sleep(self.feed_latency)
+            handler.send_response(520)
+            handler.send_header("Content-Length", "0")
+            handler.end_headers()
+            return
+
+        super()._handle(handler)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(deadline_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_timeouts_are_cut_to_the_time_left(clock):
+    deadline = Deadline(2.0, min_request_seconds=0.5)
+    assert deadline.timeout(30) == pytest.approx(2.0)
+    assert deadline.timeout(1) == 1
+
+    clock[0] += 1.6
+    assert deadline.allows() is False
+
+    with pytest.raises(DeadlineExceededError):
+        deadline.timeout(30)
+
+    assert Deadline.of(None) is None
+    assert Deadline.of(deadline) is deadline
+    assert Deadline.of(5).remaining() == pytest.approx(5.0)
+
+
+def test_a_part_of_a_call_gets_its_share_of_the_time_left(clock):
+    deadline = Deadline(4.0, min_request_seconds=0.5)
+    clock[0] += 2.0
+
+    part = deadline.sub(0.25)
+    assert part.remaining() == pytest.approx(0.5)
+    assert part.min_request_seconds == 0.5
+    assert deadline.remaining() == pytest.approx(2.0)
+
+    with pytest.raises(ValueError):
+        deadline.sub(0)
+
+
+def test_no_retry_outlasts_the_deadline():
+    calls = []
+
+    def fail():
+        calls.append(1)
+        raise curl_errors.ConnectionError("refused")
+
+    retry = RetryPolicy(max_attempts=5, base_delay=10.0, jitter=0.0)
+
+    with pytest.raises(DeadlineExceededError) as excinfo:
+        _run_with_retry(fail, retry, deadline=Deadline(1.0))
+
+    assert len(calls) == 1
+    assert isinstance(excinfo.value.__cause__, curl_errors.ConnectionError)
+
+
+def test_get_flights_returns_what_it_has_at_the_deadline():
+    with StandInServer(FeedGenerator(40, seed=3), latency=0.2) as server, server.use_core():
+        api = FlightRadar24API(max_workers=4)
+
+        started = time.monotonic()
+        flights = api.get_flights(details=True, deadline=1.0)
+        elapsed = time.monotonic() - started
+
+    assert isinstance(flights, FlightList)
+    assert sorted(flight.id for flight in flights) == sorted(server.feed.flight_ids)
+    assert flights.complete is False
+    assert 0 < flights.missing_details < 40
+    assert elapsed < 1.5
+
+
+def test_get_flights_is_complete_in_time():
+    with StandInServer(FeedGenerator(5, seed=3)) as server, server.use_core():
+        flights = FlightRadar24API().get_flights(details=True, deadline=30.0)
+        undated = FlightRadar24API().get_flights()
+
+    assert flights.complete is True and flights.missing_details == 0
+    assert undated.complete is True
+
+
+def test_no_feed_in_time_raises():
+    with StandInServer(FeedGenerator(5), latency=1.0) as server, server.use_core():
+        with pytest.raises(DeadlineExceededError):
+            FlightRadar24API().get_flights(deadline=0.5)
+
+
+def test_a_slow_feed_and_its_retry_leave_the_details_time():
+    retry = RetryPolicy(max_attempts=2, base_delay=0.1, jitter=0.0)
+
+    with _FlakyFeed(FeedGenerator(20, seed=3), failures=1, feed_latency=0.8, latency=0.05) as server:
+        api = FlightRadar24API(base_urls=server.base_urls, retry=retry, max_workers=4)
+        flights = api.get_flights(details=True, deadline=3.0)
+
+    assert server.requests["/zones/fcgi/feed.js"] == 1  # The 520 is answered before it is counted.
+    assert len(flights) == 20
+    assert flights.missing_details < 20
+
+
+def test_a_failing_feed_gives_up_within_its_share():
+    retry = RetryPolicy(max_attempts=10, base_delay=0.05, jitter=0.0)
+
+    with _FlakyFeed(FeedGenerator(20, seed=3), failures=10, feed_latency=0.4) as server:
+        api = FlightRadar24API(base_urls=server.base_urls, retry=retry)
+        started = time.monotonic()
+
+        with pytest.raises(DeadlineExceededError):
+            api.get_flights(details=True, deadline=3.0)
+
+        elapsed = time.monotonic() - started
+
+    # Not the whole deadline: the rest was the details', had the feed come.
+    assert elapsed < 3.0 * FEED_DEADLINE_SHARE + 0.4
@@ -10,6 +10,7 @@ keeps guarding the behaviour while FR24 is healthy.
 from typing import Any, Dict, List
 
 from FlightRadarAPI import FlightRadar24API
+from FlightRadarAPI.request import RequestTemplate
 
 # One real feed row, trimmed to the positional fields Flight actually reads.
 FLIGHT_ROW = [
@@ -54,15 +55,26 @@ class _FakeClient:
         self._responses = responses
         self.calls: List[Dict[str, Any]] = []
         self.deleted: List[str] = []
+        self.events: List[str] = []
 
     def request(self, url: str, **kwargs: Any) -> _FakeResponse:
         self.calls.append({"url": url, **kwargs})
         index = min(len(self.calls) - 1, len(self._responses) - 1)
         return _FakeResponse(self._responses[index])
 
+    def template(self, url: str, headers: Any = None, params: Any = None) -> RequestTemplate:
+        return RequestTemplate(url, headers, params)
+
+    def send(self, template: RequestTemplate, *fields: Any, params: Any = None, **kwargs: Any) -> _FakeResponse:
+        # Records the call's own params, not the template's fixed ones.
+        return self.request(template.url.format(*fields), params=params, **kwargs)
+
     def delete_cookie(self, name: str) -> None:
         self.deleted.append(name)
 
+    def emit(self, name: str, value: float = 1.0) -> None:
+        self.events.append(name)
+
 
 def _api_with_feed_responses(responses: List[Dict[str, Any]]):
     api = FlightRadar24API()
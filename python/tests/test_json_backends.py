@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""Offline tests for the JSON backends and the parse-once contract of ``get_content``.
+
+Whichever library parses a body, callers must get what ``json.loads`` would
+give them, and the same ValueError when nothing can parse it. The faster
+backends are only exercised when installed.
+"""
+
+import importlib.util
+import json
+
+import pytest
+
+from FlightRadarAPI import FlightRadar24API
+from FlightRadarAPI.json_backends import JSON_BACKENDS, get_json_loads
+from FlightRadarAPI.request import APIClient, APIRequest
+from FlightRadarAPI.testing import FeedGenerator, StandInServer
+
+from _request_doubles import FakeResponse, StubSession
+
+INSTALLED = [name for name in JSON_BACKENDS if name == "json" or importlib.util.find_spec(name) is not None]
+
+DOCUMENTS = [
+    b'{"full_count": 12, "rows": [{"lat": -23.43, "name": "Guarulhos \\u00e9"}], "ok": true, "none": null}',
+    b'[1, 2.5, "three"]',
+    "﻿{\"bom\": 1}".encode("utf-8"),
+    b'{"nan": NaN, "big": 123456789012345678901234567890}',
+]
+
+
+@pytest.mark.parametrize("backend", INSTALLED)
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_every_backend_parses_what_json_parses(backend, document):
+    name, loads = get_json_loads(backend)
+    expected = json.loads(document)
+
+    assert name == backend
+    assert json.dumps(loads(document)) == json.dumps(expected)
+
+
+@pytest.mark.parametrize("backend", INSTALLED)
+def test_every_backend_rejects_with_value_error(backend):
+    _, loads = get_json_loads(backend)
+
+    with pytest.raises(ValueError):
+        loads(b'{"rows": [1, 2')
+
+
+def test_default_is_the_fastest_installed():
+    assert get_json_loads()[0] == INSTALLED[0]
+    assert APIClient().json_backend == INSTALLED[0]
+
+
+def test_unknown_and_missing_backends():
+    with pytest.raises(ValueError):
+        get_json_loads("simdjson")
+
+    missing = [name for name in JSON_BACKENDS if name not in INSTALLED]
+
+    for name in missing:
+        with pytest.raises(ImportError):
+            get_json_loads(name)
+
+
+def test_the_body_is_parsed_once():
+    calls = []
+
+    def loads(document):
+        calls.append(document)
+        return json.loads(document)
+
+    session = StubSession(FakeResponse(status_code=200, headers={"content-type": "application/json"}, content=b'{"a": 1}'))
+    request = APIRequest("https://example.com", session=session, json_loads=loads)  # type: ignore[arg-type]
+
+    first = request.get_json_content()
+    assert request.get_content() is first
+    assert request.get_json_content() is first
+
+    with pytest.raises(ValueError):
+        request.get_bytes_content()
+
+    assert calls == [b'{"a": 1}']
+
+
+def test_client_parses_with_the_chosen_backend():
+    with StandInServer(FeedGenerator(20, seed=2)) as server, server.use_core():
+        for backend in INSTALLED:
+            flights = FlightRadar24API(json_backend=backend).get_flights()
+            assert sorted(flight.id for flight in flights) == sorted(server.feed.flight_ids)
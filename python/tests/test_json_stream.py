@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Offline tests for the incremental JSON parser.
+
+``JSONStream`` must agree with ``json.loads`` on every document, however the
+text is split into chunks: the feeds it reads are served in whatever pieces the
+network delivers.
+"""
+
+import json
+
+import pytest
+
+from FlightRadarAPI.json_stream import ITEM, MEMBER, JSONStream, iter_json_events
+
+DOCUMENT = {
+    "version": 4,
+    "full_count": 12345678901234567890,
+    "stats": {"total": {"ads-b": 2.5e10}, "text": "x\"\u00e9\u2028"},
+    "rows": [{"name": "Aé", "lat": -23.4, "alt": 2436}, [1, [2]], None, True, -0.5e-3, ""],
+    "empty": [],
+}
+
+
+def _events(data: bytes, size: int, expand=("rows", "empty")):
+    stream = JSONStream(expand)
+    events = []
+
+    for start in range(0, len(data), size):
+        events += stream.feed(data[start:start + size])
+
+    return events + stream.close(), stream
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 1 << 20])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_stream_agrees_with_json_loads_at_any_chunk_size(size, indent):
+    data = json.dumps(DOCUMENT, indent=indent, ensure_ascii=False).encode()
+    events, stream = _events(data, size)
+
+    assert [value for event, key, value in events if event == ITEM and key == "rows"] == DOCUMENT["rows"]
+    assert {key: value for event, key, value in events if event == MEMBER} == {
+        key: value for key, value in DOCUMENT.items() if key not in ("rows", "empty")
+    }
+    assert stream.expanded == ["rows", "empty"]
+
+
+def test_stream_reports_members_as_soon_as_they_complete():
+    stream = JSONStream()
+    assert stream.feed(b'{"a": [1, 2], "b": 1') == [(MEMBER, "a", [1, 2])]
+    # "1" may still be the start of "12".
+    assert stream.feed(b"2}") == [(MEMBER, "b", 12)]
+    assert stream.close() == []
+
+
+def test_stream_reports_arrays_outside_expand_whole():
+    assert list(iter_json_events(b'{"rows": [1, 2]}')) == [(MEMBER, "rows", [1, 2])]
+
+
+def test_stream_skips_a_utf8_bom():
+    assert list(iter_json_events(b'\xef\xbb\xbf{"a": 1}')) == [(MEMBER, "a", 1)]
+
+
+def test_stream_reports_a_top_level_that_is_not_an_object():
+    stream = JSONStream(["rows"])
+    stream.feed(b"[1, 2]")
+    stream.close()
+    assert not stream.is_object
+
+
+@pytest.mark.parametrize("document", [
+    b"", b"{", b'{"a": 1,}', b'{"rows": [1,]}', b'{"rows": [1 2]}', b'{"a": 1} x', b'{"a" 1}', b"<html>",
+])
+def test_stream_rejects_what_json_loads_rejects(document):
+    with pytest.raises(ValueError):
+        json.loads(document)
+
+    with pytest.raises(ValueError):
+        list(iter_json_events(document, expand=["rows"]))
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""Import-cost tests for the package.
+
+``import FlightRadarAPI`` must stay cheap: public names are loaded on first use
+and the heavy dependencies only by the code paths that need them. Each check
+runs in a fresh interpreter, since this one has long since imported everything.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import FlightRadarAPI
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(FlightRadarAPI.__file__)))
+
+HEAVY_MODULES = ["bs4", "brotli", "curl_cffi", "FlightRadarAPI.api", "FlightRadarAPI.zones"]
+
+
+def _loaded_after(statement: str):
+    """Return which of HEAVY_MODULES a fresh interpreter holds after running ``statement``."""
+    code = f"import json, sys\n{statement}\nprint(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    env = dict(os.environ, PYTHONPATH=PACKAGE_ROOT)
+    output = subprocess.run([sys.executable, "-c", code], env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def test_importing_the_package_loads_nothing_heavy():
+    assert _loaded_after("import FlightRadarAPI") == []
+
+
+def test_entities_do_not_need_the_client():
+    assert _loaded_after("from FlightRadarAPI import Flight, Trail, FlightTrackerConfig") == []
+
+
+def test_the_client_defers_bs4_brotli_and_zones():
+    assert _loaded_after("from FlightRadarAPI import FlightRadar24API") == ["curl_cffi", "FlightRadarAPI.api"]
+
+
+def test_lazy_names_resolve_and_are_listed():
+    assert FlightRadarAPI.FlightRadar24API.__name__ == "FlightRadar24API"
+    assert set(FlightRadarAPI.__all__) <= set(dir(FlightRadarAPI))
+
+    namespace: dict = {}
+    exec("from FlightRadarAPI import *", namespace)
+    assert set(FlightRadarAPI.__all__) <= set(namespace)
+
+
+def test_unknown_names_still_raise_attribute_error():
+    with pytest.raises(AttributeError, match="NoSuchThing"):
+        FlightRadarAPI.NoSuchThing
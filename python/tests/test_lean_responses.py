@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""Offline tests for lean requests (``lean`` / ``lean_responses``).
+
+A lean request must hold its parsed result and nothing of the body it came
+in: no bytes of any size are reachable from it once it returns. Against the
+local stand-in server, so the response objects are curl_cffi's own.
+"""
+
+import gc
+import types
+
+import pytest
+from curl_cffi.requests.exceptions import HTTPError
+
+from FlightRadarAPI import CloudflareError, FlightRadar24API
+from FlightRadarAPI.core import Core
+from FlightRadarAPI.request import LEAN_ERROR_BODY_BYTES, LEAN_HEADERS, APIClient
+from FlightRadarAPI.testing import FeedGenerator, StandInServer
+
+_OPAQUE = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def _largest_bytes(root):
+    """Return the size of the largest bytes object reachable from ``root``, code and modules aside."""
+    seen, stack, largest = set(), [root], 0
+
+    while stack:
+        item = stack.pop()
+
+        if id(item) in seen or isinstance(item, _OPAQUE):
+            continue
+
+        seen.add(id(item))
+
+        if isinstance(item, (bytes, bytearray)):
+            largest = max(largest, len(item))
+        else:
+            stack.extend(gc.get_referents(item))
+
+    return largest
+
+
+def _feed_request(server, lean):
+    client = APIClient()
+    return client.request(Core.real_time_flight_tracker_data_url, headers=Core.json_headers, lean=lean)
+
+
+def test_a_lean_request_keeps_only_the_parsed_result():
+    with StandInServer(FeedGenerator(200, seed=1), encoding="gzip") as server, server.use_core():
+        full = _feed_request(server, lean=False)
+        lean = _feed_request(server, lean=True)
+
+    assert lean.get_json_content() == full.get_json_content()
+    assert lean.get_json_content() is lean.get_content()
+
+    assert _largest_bytes(full) > 10_000
+    assert _largest_bytes(lean) < 1024
+    assert lean.get_body() == b""
+
+    response = lean.get_response_object()
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/json")
+    assert set(name.lower() for name in response.headers) <= set(name.lower() for name in LEAN_HEADERS)
+
+
+def test_a_lean_request_reports_its_parse_once():
+    timings = []
+
+    with StandInServer(FeedGenerator(20)) as server, server.use_core():
+        client = APIClient()
+        client.add_hook(timings.append)
+        request = client.request(Core.real_time_flight_tracker_data_url, headers=Core.json_headers, lean=True)
+        request.get_json_content()
+
+    [timing] = timings
+    assert timing.parse is not None
+    assert client.get_stats()["real_time_flight_tracker_data"]["parsed"] == 1
+
+
+def test_errors_hold_a_lean_response():
+    with StandInServer(cloudflare_rate=1.0) as server, server.use_core():
+        with pytest.raises(CloudflareError) as blocked:
+            _feed_request(server, lean=True)
+
+    content = blocked.value.response.content
+    assert b"Just a moment" in content and len(content) <= LEAN_ERROR_BODY_BYTES
+    assert blocked.value.response.headers["cf-mitigated"] == "challenge"
+
+    with StandInServer() as server:
+        with pytest.raises(HTTPError) as failed:
+            APIClient().request(server.url + "/no/such/page", lean=True)
+
+    assert failed.value.response.status_code == 404
+    assert _largest_bytes(failed.value.response) <= LEAN_ERROR_BODY_BYTES
+
+
+@pytest.mark.parametrize("stream_parse", [False, True])
+def test_lean_responses_change_no_result(stream_parse):
+    with StandInServer(FeedGenerator(50, seed=4)) as server, server.use_core():
+        lean = FlightRadar24API(lean_responses=True, stream_parse=stream_parse)
+        flights = lean.get_flights()
+        airports = lean.get_airports()
+        expected_airports = FlightRadar24API().get_airports()
+
+    assert sorted(flight.id for flight in flights) == sorted(server.feed.flight_ids)
+    assert [vars(airport) for airport in airports] == [vars(airport) for airport in expected_airports]
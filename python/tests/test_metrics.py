@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""Offline tests for the Prometheus metrics of ``FlightRadarAPI.metrics``.
+
+The exposition format is checked on hand-made timing records; the wiring to
+the client, the re-roll counter and the fan-out gauge against the local
+stand-in server.
+"""
+
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from FlightRadarAPI import CloudflareError, FlightRadar24API
+from FlightRadarAPI.api import FEED_EMPTY_RETRIES
+from FlightRadarAPI.metrics import CONTENT_TYPE, Metrics
+from FlightRadarAPI.testing import FeedGenerator, StandInServer
+from FlightRadarAPI.timing import RequestTiming
+
+
+def _timing(**fields):
+    defaults = dict(endpoint="flight_data", url="http://x/clickhandler/", method="GET", status=200, total=0.03,
+                    wire_bytes=2000, decoded_bytes=9000)
+    return RequestTiming(**dict(defaults, **fields))
+
+
+def _samples(text):
+    """The sample lines of an exposition, as {name and labels: value}."""
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+
+
+def test_render_counters_and_histograms():
+    metrics = Metrics()
+    metrics.observe_request(_timing())
+    metrics.observe_request(_timing(total=0.2))
+    metrics.observe_request(_timing(status=403, error="CloudflareError", retries=1))
+
+    text = metrics.render()
+    samples = _samples(text)
+
+    assert "# TYPE flightradarapi_requests_total counter" in text
+    assert "# TYPE flightradarapi_request_duration_seconds histogram" in text
+    assert samples['flightradarapi_requests_total{endpoint="flight_data",status="200"}'] == "2"
+    assert samples['flightradarapi_request_errors_total{endpoint="flight_data",error="CloudflareError"}'] == "1"
+    assert samples['flightradarapi_request_retries_total{endpoint="flight_data"}'] == "1"
+    assert samples['flightradarapi_request_duration_seconds_bucket{endpoint="flight_data",le="0.05"}'] == "2"
+    assert samples['flightradarapi_request_duration_seconds_bucket{endpoint="flight_data",le="+Inf"}'] == "3"
+    assert samples['flightradarapi_request_duration_seconds_count{endpoint="flight_data"}'] == "3"
+    assert float(samples['flightradarapi_request_duration_seconds_sum{endpoint="flight_data"}']) == pytest.approx(0.26)
+    assert samples['flightradarapi_response_bytes_bucket{endpoint="flight_data",stage="decoded",le="16384"}'] == "3"
+
+
+def test_requests_without_a_response_skip_the_histograms():
+    metrics = Metrics()
+    metrics.observe_request(_timing(status=0, error="RequestException"))
+
+    samples = _samples(metrics.render())
+
+    assert samples['flightradarapi_requests_total{endpoint="flight_data",status="0"}'] == "1"
+    assert not any(name.startswith("flightradarapi_request_duration_seconds") for name in samples)
+
+
+def test_label_values_are_escaped():
+    metrics = Metrics(namespace="fr")
+    metrics.observe_request(_timing(endpoint='a"b\\c\nd'))
+
+    assert 'fr_requests_total{endpoint="a\\"b\\\\c\\nd",status="200"} 1' in metrics.render()
+
+
+def test_threads_record_into_their_own_shards():
+    metrics = Metrics()
+
+    def record():
+        for _ in range(1000):
+            metrics.observe_request(_timing())
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    samples = _samples(metrics.render())
+    assert samples['flightradarapi_requests_total{endpoint="flight_data",status="200"}'] == "8000"
+
+
+def test_the_shards_of_finished_threads_are_folded():
+    metrics = Metrics()
+
+    for _ in range(20):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: metrics.observe_request(_timing()), range(64)))
+
+    samples = _samples(metrics.render())
+    shards = metrics._Metrics__shards  # type: ignore[attr-defined]
+
+    assert samples['flightradarapi_requests_total{endpoint="flight_data",status="200"}'] == "1280"
+    assert samples['flightradarapi_request_duration_seconds_count{endpoint="flight_data"}'] == "1280"
+
+    assert len(shards) <= 8
+
+
+def test_feed_rerolls_and_fanout_depth():
+    metrics = Metrics()
+
+    with StandInServer(FeedGenerator(10), backends=1, empty_backends=1) as server, server.use_core():
+        api = FlightRadar24API()
+        metrics.attach(api)
+        api.get_flights()
+
+    samples = _samples(metrics.render())
+    assert samples["flightradarapi_feed_rerolls_total"] == str(FEED_EMPTY_RETRIES + 1)
+
+    with StandInServer(FeedGenerator(10)) as server, server.use_core():
+        depths = []
+        api = FlightRadar24API()
+        metrics.attach(api)
+        api.add_event_hook(lambda name, value: depths.append(value) if name == "fanout_queue_depth" else None)
+        api.get_flights(details=True)
+
+    assert depths == list(range(10, -1, -1))
+    assert _samples(metrics.render())["flightradarapi_fanout_queue_depth"] == "0"
+
+
+def test_detach_stops_recording():
+    metrics = Metrics()
+
+    with StandInServer(FeedGenerator(5), cloudflare_rate=1.0) as server, server.use_core():
+        api = FlightRadar24API()
+        metrics.attach(api)
+
+        with pytest.raises(CloudflareError):
+            api.get_flights()
+
+        metrics.detach(api)
+
+        with pytest.raises(CloudflareError):
+            api.get_flights()
+
+    samples = _samples(metrics.render())
+    assert samples['flightradarapi_requests_total{endpoint="real_time_flight_tracker_data",status="403"}'] == "1"
+
+
+def test_serve():
+    metrics = Metrics()
+    metrics.observe_request(_timing())
+
+    with metrics.serve() as server:
+        with urllib.request.urlopen(server.url) as response:
+            assert response.headers["Content-Type"] == CONTENT_TYPE
+            assert response.read().decode() == metrics.render()
+
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(server.url.replace("/metrics", "/other"))
+
+    with pytest.raises(RuntimeError):
+        server.url
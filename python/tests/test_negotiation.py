@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""Offline tests for the Accept-Encoding negotiation of ``EncodingNegotiator``.
+
+The choice is checked on hand-made timing records with a fixed link speed;
+the wiring to the client against the local stand-in server, which answers
+with whichever encoding it is asked for.
+"""
+
+import pytest
+
+from FlightRadarAPI import EncodingNegotiator, FlightRadar24API
+from FlightRadarAPI.testing import FeedGenerator, StandInServer
+from FlightRadarAPI.timing import RequestTiming
+
+# Per decoded byte: gzip is a fifth the size and costs a nanosecond to decode.
+_MEASURED = {"gzip": (0.2, 1e-9), "identity": (1.0, 0.0)}
+
+
+def _timing(encoding, host="feed.test", decoded=100_000):
+    ratio, decode = _MEASURED[encoding]
+    return RequestTiming(
+        endpoint="real_time_flight_tracker_data", url=f"https://{host}/zones/fcgi/feed.js", method="GET", status=200,
+        wire_bytes=int(decoded * ratio), decoded_bytes=decoded, decode=decoded * decode,
+        encoding="" if encoding == "identity" else encoding,
+    )
+
+
+def _drive(negotiator, requests, host="feed.test"):
+    """Ask and answer as a server honouring every encoding would; return the choices."""
+    choices = []
+
+    for _ in range(requests):
+        choice = negotiator.accept_encoding(host)
+        negotiator.observe(_timing(choice, host))
+        choices.append(choice)
+
+    return choices
+
+
+@pytest.mark.parametrize("bytes_per_second, expected", [(1e6, "gzip"), (1e10, "identity")])
+def test_the_cheapest_encoding_wins(bytes_per_second, expected):
+    negotiator = EncodingNegotiator(["gzip", "identity"], min_samples=2, explore_every=0, bytes_per_second=bytes_per_second)
+    choices = _drive(negotiator, 10)
+
+    # Each is measured first, then the link speed decides.
+    assert sorted(choices[:4]) == ["gzip", "gzip", "identity", "identity"]
+    assert choices[4:] == [expected] * 6
+
+    estimates = negotiator.estimates("feed.test")
+    assert min(estimates, key=lambda name: estimates[name] or 0.0) == expected
+
+
+def test_hosts_are_measured_apart():
+    negotiator = EncodingNegotiator(["gzip", "identity"], min_samples=1, explore_every=0, bytes_per_second=1e6)
+    _drive(negotiator, 4, host="a.test")
+
+    assert negotiator.estimates("b.test") == {"gzip": None, "identity": None}
+
+
+def test_periodic_exploration_remeasures_the_stalest():
+    negotiator = EncodingNegotiator(["gzip", "identity"], min_samples=1, explore_every=5, bytes_per_second=1e6)
+    choices = _drive(negotiator, 20)
+
+    assert [index + 1 for index, choice in enumerate(choices[2:], 2) if choice == "identity"] == [5, 10, 15, 20]
+
+
+def test_an_encoding_the_server_ignores_is_dropped():
+    negotiator = EncodingNegotiator(["zstd", "gzip"], min_samples=1, explore_every=0)
+    asked = []
+
+    for _ in range(10):
+        choice = negotiator.accept_encoding("feed.test")
+        asked.append(choice)
+        # This server has never heard of zstd and always answers with gzip.
+        negotiator.observe(_timing("gzip"))
+
+    assert asked.count("zstd") == 3
+    assert asked[-4:] == ["gzip"] * 4
+
+
+def test_failed_requests_are_not_measured():
+    negotiator = EncodingNegotiator(["gzip"])
+    negotiator.observe(RequestTiming(endpoint="x", url="https://feed.test/", method="GET", status=403, error="CloudflareError"))
+
+    assert negotiator.estimates("feed.test") == {"gzip": None}
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        EncodingNegotiator([])
+
+    with pytest.raises(ValueError):
+        EncodingNegotiator(min_samples=0)
+
+    with pytest.raises(ValueError):
+        EncodingNegotiator(smoothing=0.0)
+
+
+def test_client_advertises_the_negotiated_encoding():
+    negotiator = EncodingNegotiator(min_samples=1)
+    received = []
+
+    with StandInServer(FeedGenerator(50), encoding="auto") as server, server.use_core():
+        api = FlightRadar24API(encoding_negotiator=negotiator)
+        api.add_request_hook(lambda timing: received.append(timing.encoding or "identity"))
+
+        for _ in negotiator.encodings:
+            assert len(api.get_flights()) == 50
+
+        host = server.url.split("//")[1].split(":")[0]
+
+    # One request asking for each, and the server gave each one.
+    assert sorted(received) == sorted(negotiator.encodings)
+    assert all(estimate is not None for estimate in negotiator.estimates(host).values())
@@ -15,7 +15,13 @@ import os
 import pytest
 
 from FlightRadarAPI.core import Countries
-from FlightRadarAPI.parsers import country_to_slug, parse_airlines_html, parse_airports_json
+from FlightRadarAPI.parsers import (
+    _parse_airlines_html_soup,
+    country_to_slug,
+    iter_airports_json,
+    parse_airlines_html,
+    parse_airports_json,
+)
 
 FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
 
@@ -80,6 +86,44 @@ def test_parse_airlines_html_empty_input_returns_empty_list():
     assert parse_airlines_html(b"") == []
     assert parse_airlines_html(b"<html><body><p>no tbody here</p></body></html>") == []
 
+
+AIRLINE_ROW = (
+    '<tr><td class="logo notranslate"><a href="/data/airlines/%s">%s</a></td>'
+    "<td>x</td><td>x</td><td>%s</td><td>%s</td></tr>"
+)
+
+# Each is read by the fast path or handed to BeautifulSoup: the result must not tell which.
+AIRLINES_MARKUP_CASES = [
+    ("entities and inline tags", AIRLINE_ROW % ("ab", "A &amp; <b>B</b> &#233;", "AB / ABC", "2 aircraft")),
+    ("a comment splitting the name", AIRLINE_ROW % ("cd", " Cee <!-- x --> Dee ", "CD", "")),
+    ("a link that is not the airline's", (AIRLINE_ROW % ("", "Home", "EF", "1")).replace("/data/airlines/", "/")),
+    ("unclosed cells", "<tr><td class=notranslate><a href='/data/airlines/g'>Gee Air<td>x<td>x<td>GH<td>5</tr>"),
+    ("a script in a cell", AIRLINE_ROW % ("ij", "Eye Jay<script>var x = '<td>';</script>", "IJ", "3")),
+    ("an entity only BeautifulSoup knows", AIRLINE_ROW % ("kl", "Kay &NotEqualTilde; El", "KLM", "4")),
+]
+
+
+@pytest.mark.parametrize("rows", [case[1] for case in AIRLINES_MARKUP_CASES], ids=[case[0] for case in AIRLINES_MARKUP_CASES])
+def test_parse_airlines_html_fast_path_matches_beautifulsoup(rows):
+    html = f"<html><body><table><tbody>{rows}</tbody></table></body></html>".encode()
+    assert parse_airlines_html(html) == _parse_airlines_html_soup(html)
+
+
+def test_parse_airlines_html_reads_the_fixture_without_beautifulsoup(monkeypatch):
+    expected = _parse_airlines_html_soup(_load("airlines.html"))
+    monkeypatch.setattr("FlightRadarAPI.parsers._parse_airlines_html_soup", None)
+    assert parse_airlines_html(_load("airlines.html")) == expected
+
+
+def test_parse_airlines_html_hands_other_charsets_to_beautifulsoup():
+    html = (
+        '<html><head><meta charset="iso-8859-1"></head><body><table><tbody>'
+        + AIRLINE_ROW % ("cs", "Czech Airlines \xe9", "OK / CSA", "9")
+        + "</tbody></table></body></html>"
+    ).encode("latin-1")
+
+    assert parse_airlines_html(html)[0]["Name"] == "Czech Airlines \xe9"
+
 # --- parse_airports_json ---
 
 
@@ -229,6 +273,53 @@ def test_parse_airports_json_invalid_payload_returns_empty_list():
     assert parse_airports_json(b"<html>not json</html>") == []
 
 
+def test_parse_airports_json_accepts_chunks_as_they_arrive():
+    body = _load("airports.json")
+    chunks = [body[i:i + 7] for i in range(0, len(body), 7)]
+
+    assert [a.iata for a in parse_airports_json(iter(chunks))] == [a.iata for a in parse_airports_json(body)]
+
+
+def test_parse_airports_json_empty_rows_is_not_a_layout_change(caplog):
+    assert parse_airports_json(b'{"version": 1, "rows": []}') == []
+    assert "FR24 feed may have changed" not in caplog.text
+
+
+def test_parse_airports_json_rows_that_are_not_an_array_warn(caplog):
+    assert parse_airports_json(b'{"rows": {"name": "X"}}') == []
+    assert 'no "rows" array' in caplog.text
+
+
+def test_parse_airports_json_truncated_body_returns_empty_list():
+    body = _load("airports.json")
+    assert parse_airports_json(body[:len(body) // 2]) == []
+
+
+def test_iter_airports_json_matches_parse_airports_json():
+    body = _load("airports.json")
+    assert [a.iata for a in iter_airports_json(body, ["brazil"])] == [
+        a.iata for a in parse_airports_json(body, ["brazil"])
+    ]
+
+
+def test_iter_airports_json_yields_before_the_body_is_complete():
+    body = _load("airports.json")
+    chunks = iter([body[:400], body[400:]])
+    airports = iter_airports_json(chunks)
+
+    assert next(airports).iata == "GRU"
+    # The first airport came from the first chunk alone.
+    assert next(chunks) == body[400:]
+
+
+def test_iter_airports_json_stops_at_a_malformed_tail(caplog):
+    body = _load("airports.json")
+    airports = list(iter_airports_json(body[:len(body) // 2]))
+
+    assert airports and airports[0].iata == "GRU"
+    assert "not valid JSON" in caplog.text
+
+
 # --- country_to_slug ---
 
 def test_country_to_slug_matches_countries_enum_spelling():
@@ -252,3 +343,15 @@ def test_country_to_slug_strips_parentheses_for_flag_urls():
     assert country_to_slug("Cocos (Keeling) Islands") == "cocos-keeling-islands"
     assert country_to_slug("Falkland Islands (Malvinas)") == "falkland-islands-malvinas"
     assert country_to_slug("Timor-Leste (East Timor)") == "timor-leste-east-timor"
+
+
+def test_country_to_slug_is_memoised_per_spelling():
+    from FlightRadarAPI.parsers import _slugify
+
+    rows = [{"name": "X", "country": country, "lat": 1, "lon": 2} for country in ["Brazil", "Spain"] * 50]
+    _slugify.cache_clear()
+    assert len(parse_airports_json({"rows": rows}, ["brazil"])) == 50
+
+    # One normalisation per distinct spelling ("brazil", "Brazil", "Spain"), not one per row.
+    assert _slugify.cache_info().misses == 3
+    assert _slugify.cache_info().maxsize is not None
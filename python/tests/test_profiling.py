@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Offline tests for the sampled profiling of ``FlightRadar24API`` calls.
+
+Calls go to the local stand-in server; the profiles written for them are
+loaded back with pstats and tracemalloc to prove they are usable.
+"""
+
+import os
+import pstats
+import tracemalloc
+
+import pytest
+
+from FlightRadarAPI import FlightRadar24API
+from FlightRadarAPI.profiling import Profiler
+from FlightRadarAPI.testing import FeedGenerator, StandInServer
+
+
+@pytest.fixture
+def api():
+    with StandInServer(FeedGenerator(20)) as server, server.use_core():
+        yield FlightRadar24API()
+
+
+def test_profiles_are_written_and_loadable(api, tmp_path):
+    api.enable_profiling(str(tmp_path), sample_rate=1.0, memory=True)
+    api.get_flights()
+
+    names = sorted(os.listdir(tmp_path))
+    assert [os.path.splitext(name)[1] for name in names] == [".prof", ".tracemalloc"]
+    assert all("-get_flights-1" in name for name in names)
+
+    stats = pstats.Stats(str(tmp_path / names[0]))
+    assert any(function == "get_flights" for _, _, function in stats.stats)
+
+    snapshot = tracemalloc.Snapshot.load(str(tmp_path / names[1]))
+    assert snapshot.statistics("filename")
+    # Tracing was started for the call only.
+    assert not tracemalloc.is_tracing()
+
+
+def test_only_selected_methods_are_sampled(api, tmp_path):
+    profiler = api.enable_profiling(str(tmp_path), sample_rate=1.0, methods=["get_airlines"])
+    api.get_flights()
+    api.get_airlines()
+
+    assert profiler.profiled == 1
+    assert [name.split("-")[1] for name in os.listdir(tmp_path)] == ["get_airlines"]
+
+
+def test_nested_calls_are_not_profiled(api, tmp_path):
+    profiler = api.enable_profiling(str(tmp_path), sample_rate=1.0)
+    flights = api.get_flights(details=True)
+
+    assert all(flight.origin_airport_name != "N/A" for flight in flights)
+    # The get_flight_details() calls ran while get_flights() was being profiled.
+    assert profiler.profiled == 1
+
+
+def test_sample_rate_and_rotation(api, tmp_path):
+    profiler = api.enable_profiling(str(tmp_path), sample_rate=0.5, max_files=3, seed=7)
+
+    for _ in range(20):
+        api.get_airports()
+
+    assert 0 < profiler.profiled < 20
+    assert len(os.listdir(tmp_path)) == 3
+
+
+def test_disable_profiling(api, tmp_path):
+    api.enable_profiling(str(tmp_path), sample_rate=1.0)
+    api.disable_profiling()
+    api.get_flights()
+
+    assert api.profiler is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_invalid_options(tmp_path):
+    with pytest.raises(ValueError):
+        Profiler(str(tmp_path), sample_rate=1.5)
+
+    with pytest.raises(ValueError):
+        Profiler(str(tmp_path), max_files=0)
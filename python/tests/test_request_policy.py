@@ -5,6 +5,7 @@ These tests validate **product rules** that must hold regardless of which
 HTTP library is in use:
 
 - ``RetryPolicy`` math (exponential backoff, jitter bounds, validation).
+- Error classes, ``Retry-After`` and the ``RetryBudget`` shared by a client.
 - ``_run_with_retry`` semantics (when to retry, when to give up, which
   exception escapes).
 - Cloudflare-block detection (HTTP 520, HTTP 403 with ``cf-mitigated``,
@@ -15,11 +16,17 @@ Cloudflare tuning escalated again), these assertions should remain valid
 — only the test doubles in ``_request_doubles`` will need rewiring.
 """
 
+import email.utils
+import time
+
 import pytest
+from curl_cffi import CurlECode
+from curl_cffi.requests import exceptions as curl_errors
 
 from FlightRadarAPI import request as request_module
 from FlightRadarAPI.errors import CloudflareError
-from FlightRadarAPI.request import APIRequest, RetryPolicy, _run_with_retry
+from FlightRadarAPI.request import APIRequest, RetryBudget, RetryPolicy, _run_with_retry, classify_error
+from FlightRadarAPI.timing import RETRY_BUDGET_EXHAUSTED, RequestMonitor
 
 from _request_doubles import FakeResponse, StubSession
 
@@ -125,6 +132,123 @@ class TestRunWithRetry:
         assert calls["n"] == 1
 
 
+# --- Error classes and Retry-After -------------------------------------------
+
+def _http_error(status, headers=None):
+    return curl_errors.HTTPError(f"HTTP Error {status}", 0, FakeResponse(status_code=status, headers=headers))
+
+
+class TestErrorClasses:
+    @pytest.mark.parametrize("err, expected", [
+        (CloudflareError("blocked", response=None), "cloudflare"),
+        (_http_error(503), "server"),
+        (_http_error(429), "rate_limit"),
+        (_http_error(404), "other"),
+        (curl_errors.Timeout("timed out", CurlECode.OPERATION_TIMEDOUT), "timeout"),
+        (curl_errors.RequestException("reset", CurlECode.RECV_ERROR), "connection"),
+        (curl_errors.ConnectionError("refused", CurlECode.COULDNT_CONNECT), "connection"),
+        (ValueError("permanent"), None),
+    ])
+    def test_classify_error(self, err, expected):
+        assert classify_error(err) == expected
+
+    def test_only_the_chosen_classes_are_retried(self):
+        policy = RetryPolicy(max_attempts=3, base_delay=0, jitter=0, retry_on=["server"])
+        assert policy.delay_after(0, _http_error(502)) == 0
+        assert policy.delay_after(0, _http_error(404)) is None
+        assert policy.delay_after(0, ValueError("permanent")) is None
+
+    def test_each_class_can_have_its_own_base_delay(self):
+        policy = RetryPolicy(max_attempts=3, base_delay=1.0, jitter=0, base_delays={"cloudflare": 10.0})
+        assert policy.delay_after(1, CloudflareError("blocked", response=None)) == pytest.approx(20.0)
+        assert policy.delay_after(1, _http_error(500)) == pytest.approx(2.0)
+
+    def test_rejects_unknown_classes(self):
+        with pytest.raises(ValueError):
+            RetryPolicy(retry_on=["teapot"])
+
+    def test_retry_after_in_seconds_and_as_a_date(self):
+        policy = RetryPolicy(max_attempts=3, base_delay=0, jitter=0)
+        assert policy.delay_after(0, _http_error(429, {"Retry-After": "7"})) == 7.0
+
+        date = email.utils.formatdate(time.time() + 30, usegmt=True)
+        assert 28 <= policy.delay_after(0, _http_error(503, {"Retry-After": date})) <= 30
+
+        # Garbage is ignored, not fatal.
+        assert policy.delay_after(0, _http_error(503, {"Retry-After": "soon"})) == 0
+
+    def test_retry_after_past_the_limit_gives_up(self):
+        policy = RetryPolicy(max_attempts=3, base_delay=0, jitter=0, max_retry_after=60)
+        assert policy.delay_after(0, _http_error(429, {"Retry-After": "3600"})) is None
+
+        ignoring = RetryPolicy(max_attempts=3, base_delay=0, jitter=0, respect_retry_after=False)
+        assert ignoring.delay_after(0, _http_error(429, {"Retry-After": "3600"})) == 0
+
+    def test_decorrelated_jitter_stays_in_its_bounds(self):
+        policy = RetryPolicy(max_attempts=10, base_delay=1.0, max_delay=20.0, decorrelated_jitter=True)
+        previous = None
+
+        for attempt in range(200):
+            delay = policy.sleep_for(attempt, previous=previous)
+            assert 1.0 <= delay <= min(20.0, 3 * (previous or 1.0))
+            previous = delay
+
+
+# --- RetryBudget ---------------------------------------------------------------
+
+class TestRetryBudget:
+    def test_allows_min_retries_plus_a_share_of_requests(self):
+        budget = RetryBudget(ratio=0.5, window=10.0, min_retries=1)
+
+        for _ in range(4):
+            budget.record_request()
+
+        assert [budget.try_spend() for _ in range(4)] == [True, True, True, False]
+        assert budget.exhausted == 1
+
+    def test_the_window_moves_on(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(request_module.time, "monotonic", lambda: now[0])
+        budget = RetryBudget(ratio=0.0, window=10.0, min_retries=1)
+
+        assert budget.try_spend() and not budget.try_spend()
+
+        now[0] += 10.5
+        assert budget.try_spend()
+
+    def test_run_with_retry_stops_when_the_budget_is_spent(self, monkeypatch):
+        monkeypatch.setattr(request_module.time, "sleep", lambda _: None)
+        policy = RetryPolicy(max_attempts=5, base_delay=0, jitter=0, budget=RetryBudget(ratio=0.0, min_retries=2))
+        monitor = RequestMonitor()
+        events = []
+        monitor.event_hooks.append(lambda name, value: events.append(name))
+        calls = {"n": 0}
+
+        def fn():
+            calls["n"] += 1
+            raise _http_error(503)
+
+        with pytest.raises(curl_errors.HTTPError):
+            _run_with_retry(fn, policy, monitor)
+
+        # The first attempt, then the two retries the budget holds.
+        assert calls["n"] == 3
+        assert events == [RETRY_BUDGET_EXHAUSTED]
+
+    def test_run_with_retry_sleeps_what_retry_after_asks(self, monkeypatch):
+        slept = []
+        monkeypatch.setattr(request_module.time, "sleep", slept.append)
+        errors = iter([_http_error(429, {"Retry-After": "4"})])
+
+        def fn():
+            for err in errors:
+                raise err
+            return "ok"
+
+        assert _run_with_retry(fn, RetryPolicy(max_attempts=2, base_delay=0, jitter=0)) == "ok"
+        assert slept == [4.0]
+
+
 # --- Cloudflare detection ---------------------------------------------------
 #
 # These tests touch APIRequest because the rule lives there, but the rule
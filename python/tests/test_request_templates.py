@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""Offline tests for request templates (``RequestTemplate``, ``APIClient.send``).
+
+A request sent from a template must go out exactly as the same request made
+from scratch would: same URL, byte for byte, so cassettes and caches keyed on
+it still match, and same headers. And a template must follow what it was
+made from, such as a changed flight tracker config.
+"""
+
+import dataclasses
+from urllib.parse import urlencode
+
+from FlightRadarAPI import FlightRadar24API, FlightTrackerConfig
+from FlightRadarAPI.core import Core
+from FlightRadarAPI.request import APIClient, APIRequest, RequestTemplate
+from FlightRadarAPI.testing import FeedGenerator, StandInServer
+
+from _request_doubles import FakeResponse, StubSession
+
+
+def test_query_matches_encoding_everything_at_once():
+    fixed = dataclasses.asdict(FlightTrackerConfig())
+    extra = {"enc": "a/b+c", "bounds": "75.78,-75.78,-427.56,427.56", "airline": "DAL"}
+    template = RequestTemplate(Core.real_time_flight_tracker_data_url, Core.json_headers, fixed)
+
+    assert template.query_for(extra) == urlencode({**fixed, **extra})
+    assert template.query_for() == urlencode(fixed)
+    assert RequestTemplate("https://example.com").query_for(extra) == urlencode(extra)
+
+
+def test_headers_and_endpoint_are_settled_once():
+    template = RequestTemplate(Core.flight_data_url, {"accept": "application/json"})
+
+    assert template.headers == {"accept": "application/json", "accept-encoding": APIRequest.supported_encodings}
+    assert template.endpoint == "flight_data"
+
+    # Headers that already name an encoding are used as they are.
+    assert RequestTemplate(Core.flight_data_url, Core.json_headers).headers is Core.json_headers
+
+
+def test_a_query_string_is_sent_as_it_is():
+    session = StubSession(FakeResponse(status_code=200, headers={"content-type": "application/json"}, content=b"{}"))
+    APIRequest("https://example.com/api", session=session, params="code=ATL&limit=1")  # type: ignore[arg-type]
+
+    assert session.calls[0]["url"] == "https://example.com/api?code=ATL&limit=1"
+
+
+def test_client_keeps_one_template_per_arguments():
+    client = APIClient()
+    params = {"limit": "10"}
+    template = client.template(Core.real_time_flight_tracker_data_url, Core.json_headers, params)
+
+    assert client.template(Core.real_time_flight_tracker_data_url, Core.json_headers, {"limit": "10"}) is template
+
+    params["limit"] = "20"
+    assert client.template(Core.real_time_flight_tracker_data_url, Core.json_headers, params) is not template
+
+
+def test_send_fills_in_fields_and_times_the_endpoint():
+    timings = []
+
+    with StandInServer(FeedGenerator(5, seed=1)) as server, server.use_core():
+        client = APIClient()
+        client.add_hook(timings.append)
+        flight_id = server.feed.flight_ids[0]
+
+        template = client.template(Core.flight_data_url, Core.json_headers)
+        details = client.send(template, flight_id, standalone=True).get_json_content()
+
+    assert details["identification"]["id"] == flight_id
+    assert timings[0].url.endswith(f"/clickhandler/?flight={flight_id}")
+    assert timings[0].endpoint == "flight_data"
+
+
+def test_get_flights_follows_config_changes():
+    with StandInServer(FeedGenerator(50, seed=2)) as server, server.use_core():
+        api = FlightRadar24API()
+        assert len(api.get_flights()) == 50
+
+        api.set_flight_tracker_config(limit=10)
+        assert len(api.get_flights()) == 10
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""Offline tests for the per-request timing records and ``get_stats()``.
+
+Requests go to the local stand-in server, so the libcurl phase times, the
+wire and decoded sizes and the retry counts all come from real transfers.
+"""
+
+import pytest
+
+from FlightRadarAPI import CloudflareError, FlightRadar24API, RetryPolicy
+from FlightRadarAPI.core import Core, endpoint_table
+from FlightRadarAPI.testing import FeedGenerator, StandInServer
+from FlightRadarAPI.timing import endpoint_name
+
+
+@pytest.mark.parametrize("url, endpoint", [
+    ("https://data-cloud.flightradar24.com/zones/fcgi/feed.js?limit=10", "real_time_flight_tracker_data"),
+    ("https://data-live.flightradar24.com/clickhandler/?flight=3a2b", "flight_data"),
+    ("https://api.flightradar24.com/common/v1/airport.json?code=GRU", "api_airport_data"),
+    ("https://www.flightradar24.com/airports/traffic-stats/?airport=GRU", "airport_data"),
+    ("https://www.flightradar24.com/data/airlines", "airlines_data"),
+    ("https://cdn.flightradar24.com/assets/airlines/logotypes/LA_LAN.png", "airline_logo"),
+    ("https://example.com/", "unknown"),
+])
+def test_endpoint_name(url, endpoint):
+    assert endpoint_name(url) == endpoint
+
+
+def test_hook_gets_every_phase():
+    timings = []
+
+    with StandInServer(FeedGenerator(100), encoding="gzip") as server, server.use_core():
+        api = FlightRadar24API()
+        api.add_request_hook(timings.append)
+        api.get_flights()
+
+    [timing] = timings
+    assert timing.endpoint == "real_time_flight_tracker_data"
+    assert timing.status == 200 and timing.error is None and timing.retries == 0
+    assert 0 < timing.connect <= timing.starttransfer <= timing.total
+    assert 0 < timing.wire_bytes < timing.decoded_bytes
+    assert timing.decode > 0
+    # Parsed after the hook ran, on the same record.
+    assert timing.parse is not None and timing.parse > 0
+
+
+def test_failures_and_retries_are_recorded():
+    timings = []
+    retry = RetryPolicy(max_attempts=2, base_delay=0, jitter=0)
+
+    with StandInServer(cloudflare_rate=1.0) as server, server.use_core():
+        api = FlightRadar24API(retry=retry)
+        api.add_request_hook(timings.append)
+
+        with pytest.raises(CloudflareError):
+            api.get_flights()
+
+    assert [(timing.status, timing.error, timing.retries) for timing in timings] == [
+        (403, "CloudflareError", 0), (403, "CloudflareError", 1),
+    ]
+
+    stats = api.get_stats()["real_time_flight_tracker_data"]
+    assert stats["requests"] == 2 and stats["errors"] == 2 and stats["retries"] == 1
+    assert stats["statuses"] == {403: 2}
+    assert stats["parsed"] == 0
+
+
+def test_get_stats_aggregates_by_endpoint():
+    with StandInServer(FeedGenerator(20)) as server, server.use_core():
+        api = FlightRadar24API()
+        flights = api.get_flights()
+        api.get_flights()
+        api.get_flight_details(flights[0])
+
+    stats = api.get_stats()
+    feed = stats["real_time_flight_tracker_data"]
+
+    assert set(stats) == {"real_time_flight_tracker_data", "flight_data"}
+    assert feed["requests"] == 2 and feed["parsed"] == 2
+    assert feed["mean_seconds"]["total"] == pytest.approx(feed["seconds"]["total"] / 2)
+    assert feed["max_seconds"]["total"] >= feed["mean_seconds"]["total"]
+
+    api.reset_stats()
+    assert api.get_stats() == {}
+
+
+def test_failing_hook_does_not_fail_the_request(caplog):
+    def broken(timing):
+        raise RuntimeError("broken hook")
+
+    with StandInServer(FeedGenerator(5)) as server, server.use_core():
+        api = FlightRadar24API()
+        api.add_request_hook(broken)
+        assert len(api.get_flights()) == 5
+
+        api.remove_request_hook(broken)
+        api.get_flights()
+
+    assert len([record for record in caplog.records if record.name == "FlightRadarAPI.timing"]) == 1
+
+
+def test_endpoint_name_follows_the_base_urls():
+    table = endpoint_table()
+    assert endpoint_table() is table
+
+    Core.set_base_urls(data_cloud_base_url="http://127.0.0.1:1")
+
+    try:
+        assert endpoint_table() is not table
+        assert endpoint_name("http://127.0.0.1:1/zones/fcgi/feed.js") == "real_time_flight_tracker_data"
+    finally:
+        Core.reset_base_urls()
+
+    assert endpoint_name("http://127.0.0.1:1/zones/fcgi/feed.js") == "unknown"
@@ -19,11 +19,12 @@ Deliberately **not** here:
   because that logic is ours and a bomb slipping past it is a real failure.
 """
 
+import random
 from typing import Any, Dict
 
 import pytest
 
-from FlightRadarAPI.request import APIRequest
+from FlightRadarAPI.request import IDLE_CONNECTION_SECONDS, ZSTD_AVAILABLE, APIRequest
 
 from _request_doubles import FakeResponse, StubSession
 
@@ -244,6 +245,8 @@ class TestDecompressionLimit:
 
         assert session.curl.options == [
             (CurlOpt.HTTP_CONTENT_DECODING, 0),
+            (CurlOpt.TCP_KEEPALIVE, 1),
+            (CurlOpt.MAXAGE_CONN, IDLE_CONNECTION_SECONDS),
             (CurlOpt.MAXFILESIZE_LARGE, 4096),
         ] * 3
 
@@ -342,6 +345,44 @@ class TestDecompressionIntegrity:
             decompress(b'{"already": "json"}')
 
 
+class TestZstd:
+    """zstd goes through the same budget and integrity checks as brotli."""
+
+    BODY = b'{"rows": [' + b'{"name": "Guarulhos"},' * 500 + b'{}]}'
+
+    def test_round_trip_across_frames(self):
+        zstandard = pytest.importorskip("zstandard")
+
+        from FlightRadarAPI.request import _decompress_zstd
+
+        compressor = zstandard.ZstdCompressor()
+        # A skippable frame, then a frame without a declared content size.
+        skippable = b"\x50\x2a\x4d\x18" + (4).to_bytes(4, "little") + b"pad!"
+        unsized = zstandard.ZstdCompressor(write_content_size=False)
+        blob = compressor.compress(self.BODY) + skippable + unsized.compress(b"tail")
+
+        assert _decompress_zstd(blob, limit=1 << 20) == self.BODY + b"tail"
+
+    def test_bomb_is_refused(self):
+        zstandard = pytest.importorskip("zstandard")
+
+        from FlightRadarAPI.errors import DecompressionLimitError
+        from FlightRadarAPI.request import _decompress_zstd
+
+        with pytest.raises(DecompressionLimitError):
+            _decompress_zstd(zstandard.ZstdCompressor().compress(b"\x00" * (1024 * 1024)), limit=1024)
+
+    def test_a_truncated_body_raises(self):
+        zstandard = pytest.importorskip("zstandard")
+
+        from FlightRadarAPI.request import _decompress_zstd
+
+        blob = zstandard.ZstdCompressor(write_checksum=True).compress(self.BODY)
+
+        with pytest.raises(zstandard.ZstdError):
+            _decompress_zstd(blob[: len(blob) - 2], limit=1 << 20)
+
+
 class TestBudgetAgainstARealTransport:
     """Exercises the budget over a socket, not over a double.
 
@@ -462,6 +503,148 @@ class TestBudgetAgainstARealTransport:
             server.shutdown()
 
 
+class TestDecodingInFlight:
+    """gzip and brotli bodies are decoded from libcurl's write callback."""
+
+    # ~2 MB that compresses only by half, so it arrives in many chunks.
+    BODY = b'{"blob": "' + random.Random(0).randbytes(1024 * 1024).hex().encode() + b'"}'
+
+    @staticmethod
+    def _serve(blob: bytes, encoding: str, done=None):
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                self.send_response(200)
+                self.send_header("Content-Encoding", encoding)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(blob)))
+                self.end_headers()
+
+                try:
+                    for start in range(0, len(blob), 64 * 1024):
+                        self.wfile.write(blob[start:start + 64 * 1024])
+                        self.wfile.flush()
+                except OSError:
+                    if done is not None:
+                        done.set()
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    @pytest.mark.parametrize("encoding", ["br", "gzip"])
+    def test_chunks_are_decoded_as_they_arrive(self, encoding, monkeypatch):
+        import gzip as gzip_module
+
+        import brotli
+
+        from FlightRadarAPI import request as request_module
+
+        fed = []
+        streamed = request_module._STREAM_DECODERS[encoding]
+
+        class Recording(streamed):  # type: ignore[misc, valid-type]
+            def feed(self, data: bytes) -> None:
+                fed.append(len(data))
+                super().feed(data)
+
+        monkeypatch.setitem(request_module._STREAM_DECODERS, encoding, Recording)
+        blob = brotli.compress(self.BODY) if encoding == "br" else gzip_module.compress(self.BODY)
+        server = self._serve(blob, encoding)
+
+        try:
+            for call in ("request", "request_standalone"):
+                fed.clear()
+                response = getattr(request_module.APIClient(), call)(f"http://127.0.0.1:{server.server_port}/")
+
+                assert response.get_body() == self.BODY
+                assert len(fed) > 1 and sum(fed) == len(blob)
+        finally:
+            server.shutdown()
+
+    def test_the_header_buffer_is_reachable(self, monkeypatch):
+        """Decoding in flight rests on a private part of curl_cffi: this fails if a release moves it."""
+        import gzip as gzip_module
+
+        from FlightRadarAPI import request as request_module
+
+        received = []
+        read = request_module._received_headers
+        monkeypatch.setattr(request_module, "_received_headers", lambda curl: received.append(read(curl)) or received[-1])
+        server = self._serve(gzip_module.compress(self.BODY), "gzip")
+
+        try:
+            request_module.APIClient().request(f"http://127.0.0.1:{server.server_port}/")
+        finally:
+            server.shutdown()
+
+        assert len(received) == 1 and received[0] is not None
+        status, content_encoding = request_module._final_response_head(received[0])
+        assert (status, content_encoding.strip()) == (200, "gzip")
+
+    def test_an_unreachable_header_buffer_is_logged_once(self, monkeypatch, caplog):
+        from FlightRadarAPI import request as request_module
+
+        monkeypatch.setattr(request_module, "_header_buffer_missing", False)
+
+        assert request_module._received_headers(object()) is None
+        assert request_module._received_headers(object()) is None
+        assert sum("cannot read the response headers" in r.message for r in caplog.records) == 1
+
+    def test_stream_decoders_must_feed_and_finish(self):
+        from FlightRadarAPI.request import _StreamDecoder
+
+        with pytest.raises(TypeError):
+            _StreamDecoder(1024)  # type: ignore[abstract]
+
+    def test_a_bomb_aborts_the_transfer(self):
+        """The budget stops the download too, not just the expansion."""
+        import gzip as gzip_module
+        import threading
+
+        from FlightRadarAPI.errors import DecompressionLimitError
+        from FlightRadarAPI.request import APIClient
+
+        # 32 MB on the wire, 32 GB expanded.
+        blob = gzip_module.compress(b"\x00" * (8 * 1024 * 1024)) * 4096
+        aborted = threading.Event()
+        server = self._serve(blob, "gzip", aborted)
+
+        try:
+            with pytest.raises(DecompressionLimitError):
+                APIClient().request(
+                    f"http://127.0.0.1:{server.server_port}/",
+                    max_response_bytes=1024 * 1024, max_download_bytes=len(blob),
+                )
+
+            assert aborted.wait(10)
+        finally:
+            server.shutdown()
+
+    def test_a_truncated_stream_raises(self):
+        import gzip as gzip_module
+        import zlib as zlib_module
+
+        from FlightRadarAPI.request import APIClient
+
+        blob = gzip_module.compress(self.BODY)
+        server = self._serve(blob[: len(blob) // 2], "gzip")
+
+        try:
+            with pytest.raises(zlib_module.error):
+                APIClient().request(f"http://127.0.0.1:{server.server_port}/")
+        finally:
+            server.shutdown()
+
+
 class TestEncodingRobustness:
     """Owning the decoding means owning every shape the header arrives in."""
 
@@ -485,7 +668,7 @@ class TestEncodingRobustness:
             server.shutdown()
 
     def test_only_decodable_encodings_are_advertised(self):
-        """curl_cffi's impersonation asks for zstd, which nothing here decodes."""
+        """curl_cffi's impersonation asks for zstd, decoded only with zstandard installed."""
         import threading
         from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
@@ -519,7 +702,7 @@ class TestEncodingRobustness:
             client.request_standalone(url)
 
             assert seen == [APIRequest.supported_encodings] * 2
-            assert "zstd" not in APIRequest.supported_encodings
+            assert ("zstd" in APIRequest.supported_encodings) == ZSTD_AVAILABLE
         finally:
             server.shutdown()
 
@@ -528,13 +711,13 @@ class TestEncodingRobustness:
 
         from FlightRadarAPI.request import APIClient
 
-        server = self._serve(gzip_module.compress(b'{"ok": true}'), "zstd")
+        server = self._serve(gzip_module.compress(b'{"ok": true}'), "compress")
 
         try:
             with caplog.at_level("WARNING", logger="FlightRadarAPI.request"):
                 APIClient().request(
                     f"http://127.0.0.1:{server.server_port}/",
-                    headers={"accept-encoding": "gzip, zstd"},
+                    headers={"accept-encoding": "gzip, compress"},
                 )
             assert any("no decoder for Content-Encoding" in r.message for r in caplog.records)
         finally:
@@ -648,7 +831,7 @@ class TestAdvertisedEncodings:
             assert name in table
             assert table[name] is not table[""]
 
-        assert APIRequest.supported_encodings == "gzip, deflate, br"
+        assert APIRequest.supported_encodings == "gzip, deflate, br" + (", zstd" if ZSTD_AVAILABLE else "")
 
 
 class TestBudgetCoversEveryEncoding:
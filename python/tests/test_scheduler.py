@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""Offline tests for the priority request scheduler (``RequestScheduler``).
+
+Waiting requests are queued in a known order before a slot is freed, so the
+order they are let through in is the scheduler's alone. End to end, a lookup
+made at "interactive" priority during a details crawl must not wait for it.
+"""
+
+import threading
+import time
+
+import pytest
+
+from FlightRadarAPI import Deadline, DeadlineExceededError, FlightRadar24API, RequestScheduler
+from FlightRadarAPI.scheduler import current_priority, prioritised
+from FlightRadarAPI.testing import FeedGenerator, StandInServer
+
+
+def _queue(scheduler, order, *requests):
+    """Queue each (priority, flow) in turn, each thread noting its name in ``order`` once let through."""
+    threads = []
+
+    for priority, flow in requests:
+        def run(priority=priority, flow=flow):
+            with scheduler.slot(priority, flow):
+                order.append(f"{priority}:{flow}")
+
+        queued = sum(klass["queued"] for klass in scheduler.snapshot().values())
+        thread = threading.Thread(target=run)
+        thread.start()
+        threads.append(thread)
+
+        while sum(klass["queued"] for klass in scheduler.snapshot().values()) == queued:
+            time.sleep(0.001)
+
+    return threads
+
+
+def _drain(scheduler, priority, threads):
+    scheduler.release(priority)
+
+    for thread in threads:
+        thread.join(5)
+
+
+def test_a_free_slot_goes_to_the_most_urgent():
+    scheduler = RequestScheduler(max_concurrent=1)
+    order = []
+    scheduler.acquire("background")
+
+    threads = _queue(scheduler, order, ("background", "a"), ("normal", "a"), ("interactive", "a"))
+    _drain(scheduler, "background", threads)
+
+    assert order == ["interactive:a", "normal:a", "background:a"]
+
+
+def test_background_keeps_clear_of_the_other_slots():
+    scheduler = RequestScheduler(max_concurrent=4)
+    assert scheduler.snapshot()["background"]["limit"] == 2
+
+    scheduler.acquire("background")
+    scheduler.acquire("background")
+    order = []
+    threads = _queue(scheduler, order, ("background", "a"))
+
+    scheduler.acquire("interactive")  # Not queued behind it.
+    scheduler.acquire("normal")
+    assert scheduler.snapshot()["background"] == {"active": 2, "queued": 1, "limit": 2}
+
+    _drain(scheduler, "background", threads)
+    assert order == ["background:a"]
+
+
+def test_flows_take_turns_within_a_priority():
+    scheduler = RequestScheduler(max_concurrent=1)
+    order = []
+    scheduler.acquire("normal")
+
+    threads = _queue(scheduler, order, ("normal", "a"), ("normal", "a"), ("normal", "a"), ("normal", "b"))
+    _drain(scheduler, "normal", threads)
+
+    assert order == ["normal:a", "normal:b", "normal:a", "normal:a"]
+
+
+def test_a_deadline_stops_the_wait():
+    scheduler = RequestScheduler(max_concurrent=1)
+    scheduler.acquire()
+
+    with pytest.raises(DeadlineExceededError):
+        scheduler.acquire(deadline=Deadline(0.2, min_request_seconds=0.1))
+
+    assert scheduler.snapshot()["normal"] == {"active": 1, "queued": 0, "limit": 1}
+
+
+def test_priorities_are_checked():
+    with pytest.raises(ValueError):
+        RequestScheduler(limits={"urgent": 1})
+
+    with pytest.raises(ValueError):
+        RequestScheduler().acquire("urgent")
+
+    with prioritised("background"):
+        assert current_priority() == "background"
+
+    assert current_priority() is None
+
+
+def test_an_interactive_lookup_overtakes_a_details_crawl():
+    scheduler = RequestScheduler(max_concurrent=2)
+
+    with StandInServer(FeedGenerator(30, seed=6), latency=0.05) as server, server.use_core():
+        api = FlightRadar24API(scheduler=scheduler, max_workers=8)
+        flight = api.get_flights()[0]
+
+        crawl = threading.Thread(target=api.get_flights, kwargs={"details": True})
+        crawl.start()
+
+        while scheduler.snapshot()["background"]["queued"] == 0:
+            time.sleep(0.001)
+
+        started = time.monotonic()
+
+        with api.priority("interactive"):
+            details = api.get_flight_details(flight)
+
+        elapsed = time.monotonic() - started
+        crawling = crawl.is_alive()
+        crawl.join(10)
+
+    assert details["identification"]["id"] == flight.id
+    assert crawling
+    assert elapsed < 0.5
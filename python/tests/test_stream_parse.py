@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""Offline tests for parsing the feeds as they are decoded (``stream_parse``).
+
+The push parsers must build exactly what the whole-body path builds, however
+the body is cut. End to end, the body goes from libcurl's write callback into
+the parser for every encoding, and is never kept.
+"""
+
+import json
+
+import pytest
+
+from FlightRadarAPI import FlightRadar24API
+from FlightRadarAPI.cassette import Cassette
+from FlightRadarAPI.core import Core
+from FlightRadarAPI.entities import Flight
+from FlightRadarAPI.parsers import AirportFeedParser, FlightFeedParser, parse_airports_json
+from FlightRadarAPI.testing import FeedGenerator, StandInServer
+
+
+def _feed(parser, body, size):
+    for start in range(0, len(body), size):
+        parser.feed(body[start:start + size])
+
+    return parser.close()
+
+
+@pytest.mark.parametrize("size", [1, 7, 4096])
+def test_flight_feed_parser_matches_the_whole_body(size):
+    document = FeedGenerator(30, seed=3).snapshot()
+    feed = _feed(FlightFeedParser(), json.dumps(document).encode(), size)
+
+    expected = [Flight(key, value) for key, value in document.items() if key[0].isnumeric()]
+
+    assert [vars(flight) for flight in feed.flights] == [vars(flight) for flight in expected]
+    assert feed.members["full_count"] == document["full_count"]
+    assert not any(key[0].isnumeric() for key in feed.members)
+
+
+def test_flight_feed_parser_takes_any_builder():
+    document = FeedGenerator(5, seed=3).snapshot()
+    feed = _feed(FlightFeedParser(build=lambda flight_id, row: (flight_id, row[9])), json.dumps(document).encode(), 64)
+
+    assert feed.flights == [(key, value[9]) for key, value in document.items() if key[0].isnumeric()]
+
+
+def test_flight_feed_parser_rejects_what_is_not_an_object():
+    with pytest.raises(ValueError):
+        _feed(FlightFeedParser(), b"[1, 2]", 4)
+
+    with pytest.raises(ValueError):
+        _feed(FlightFeedParser(), b'{"1a": [1, 2', 4)
+
+
+def test_airport_feed_parser_matches_the_whole_body():
+    body = json.dumps({"version": 1, "rows": [
+        {"name": "Guarulhos", "iata": "GRU", "icao": "SBGR", "lat": -23.43, "lon": -46.47, "alt": 2461, "country": "Brazil"},
+        {"name": "Lisbon", "iata": "LIS", "icao": "LPPT", "lat": "38.77", "lon": "-9.13", "alt": 374, "country": "Portugal"},
+    ]}).encode()
+
+    for countries in (None, ["brazil"]):
+        airports = _feed(AirportFeedParser(countries), body, 5)
+        assert [vars(airport) for airport in airports] == [vars(airport) for airport in parse_airports_json(body, countries)]
+
+
+def test_airport_feed_parser_warns_instead_of_raising(caplog):
+    assert _feed(AirportFeedParser(), b'{"rows": [{"name": "x"}, oops', 3) == []
+    assert _feed(AirportFeedParser(), b'{"other": []}', 3) == []
+    assert len([record for record in caplog.records if record.name == "FlightRadarAPI.parsers"]) == 2
+
+
+@pytest.mark.parametrize("encoding", ["br", "gzip", "deflate", None])
+def test_get_flights_parses_every_encoding_in_flight(encoding):
+    timings = []
+
+    with StandInServer(FeedGenerator(200, seed=1), encoding=encoding) as server, server.use_core():
+        api = FlightRadar24API(stream_parse=True)
+        api.add_request_hook(timings.append)
+        flights = api.get_flights()
+
+    assert sorted(flight.id for flight in flights) == sorted(server.feed.flight_ids)
+    assert all(isinstance(flight, Flight) for flight in flights)
+
+    [timing] = timings
+    assert timing.decoded_bytes > 0 and timing.parse is not None
+    assert api.get_stats()["real_time_flight_tracker_data"]["parsed"] == 1
+
+
+def test_get_airports_parses_in_flight():
+    with StandInServer() as server, server.use_core():
+        streamed = FlightRadar24API(stream_parse=True).get_airports()
+        whole = FlightRadar24API().get_airports()
+
+    assert [vars(airport) for airport in streamed] == [vars(airport) for airport in whole]
+
+
+def test_failed_responses_are_not_parsed():
+    from FlightRadarAPI import CloudflareError
+
+    with StandInServer(cloudflare_rate=1.0) as server, server.use_core():
+        with pytest.raises(CloudflareError) as excinfo:
+            FlightRadar24API(stream_parse=True).get_flights()
+
+    # The challenge page stays readable, as without stream_parse.
+    assert b"Just a moment" in excinfo.value.response.content
+
+
+def test_replayed_bodies_are_parsed_too():
+    cassette = Cassette(mode="record")
+
+    with StandInServer(FeedGenerator(20, seed=1)) as server, server.use_core():
+        expected = sorted(flight.id for flight in FlightRadar24API(cassette=cassette).get_flights())
+        base_urls = server.base_urls
+
+    cassette.mode = "replay"
+    Core.set_base_urls(**base_urls)
+
+    try:
+        flights = FlightRadar24API(cassette=cassette, stream_parse=True).get_flights()
+    finally:
+        Core.reset_base_urls()
+
+    assert sorted(flight.id for flight in flights) == expected
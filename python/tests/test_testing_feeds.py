@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""Tests for the synthetic feed generator in ``FlightRadarAPI.testing``.
+
+Load and soak runs trust these documents to look like FR24's, so the tests
+check that the SDK reads them back as it reads the real feed, and that a seed
+always reproduces the same sequence of snapshots.
+"""
+
+import pytest
+
+from FlightRadarAPI import Flight
+from FlightRadarAPI.testing import FeedGenerator
+
+from test_feed_retry import _api_with_feed_responses
+
+
+def test_same_seed_gives_the_same_snapshots():
+    first, second = FeedGenerator(50, seed=7), FeedGenerator(50, seed=7)
+
+    assert first.snapshot() == second.snapshot()
+    assert first.advance() == second.advance()
+    assert first.clickhandler(first.flight_ids[0]) == second.clickhandler(second.flight_ids[0])
+    assert FeedGenerator(50, seed=8).snapshot() != first.snapshot()
+
+
+def test_snapshot_is_a_feed_envelope():
+    snapshot = FeedGenerator(20, seed=1).snapshot()
+    rows = {key: value for key, value in snapshot.items() if key[0].isnumeric()}
+
+    assert snapshot["full_count"] == 20
+    assert snapshot["version"] == 4
+    assert set(snapshot["stats"]) == {"total", "visible"}
+    assert len(rows) == 20
+    assert all(len(row) == 19 for row in rows.values())
+
+
+def test_rows_read_back_as_flights():
+    generator = FeedGenerator(10, seed=2)
+    flight_id = generator.flight_ids[0]
+    row = generator.row(flight_id)
+    flight = Flight(flight_id, row)
+
+    assert flight.callsign == row[16] and flight.airline_icao == row[18]
+    assert flight.number.startswith(flight.airline_iata)
+    assert -90 <= flight.latitude <= 90 and -180 <= flight.longitude <= 180
+    assert 0 <= flight.heading < 360
+
+
+def test_limit_keeps_full_count():
+    snapshot = FeedGenerator(30, seed=3).snapshot(limit=5)
+
+    assert snapshot["full_count"] == 30
+    assert sum(key[0].isnumeric() for key in snapshot) == 5
+
+
+def test_advance_replaces_the_churned_fraction():
+    generator = FeedGenerator(200, seed=4, churn=0.1)
+    before = set(generator.flight_ids)
+    generator.advance()
+    after = set(generator.flight_ids)
+
+    assert len(after) == 200
+    # Churn plus whatever landed in those eight seconds.
+    assert 20 <= len(before - after) <= 30
+
+
+def test_no_churn_keeps_the_flights_and_moves_them():
+    generator = FeedGenerator(20, seed=5, churn=0.0)
+    flight_id = generator.flight_ids[0]
+    before = generator.row(flight_id)
+    generator.advance(60)
+
+    assert flight_id in generator.flight_ids
+    assert generator.row(flight_id)[1:3] != before[1:3]
+    assert generator.row(flight_id)[10] == before[10] + 60
+
+
+def test_clickhandler_trail_is_newest_first_and_sets_details():
+    generator = FeedGenerator(5, seed=6, trail_points=40)
+    flight_id = generator.flight_ids[0]
+    details = generator.clickhandler(flight_id)
+    timestamps = [point["ts"] for point in details["trail"]]
+
+    assert timestamps == sorted(timestamps, reverse=True)
+    assert len(timestamps) <= 40
+
+    flight = Flight(flight_id, generator.row(flight_id))
+    flight.set_flight_details(details)
+    assert flight.origin_airport_iata == details["airport"]["origin"]["code"]["iata"]
+    assert flight.airline_name == details["airline"]["name"]
+
+
+def test_empty_snapshot_drives_the_feed_re_roll():
+    generator = FeedGenerator(25, seed=9)
+    api, client = _api_with_feed_responses([generator.empty_snapshot(), generator.snapshot()])
+
+    assert len(api.get_flights()) == 25
+    assert len(client.calls) == 2
+
+
+def test_rejects_bad_arguments():
+    with pytest.raises(ValueError):
+        FeedGenerator(-1)
+
+    with pytest.raises(ValueError):
+        FeedGenerator(10, churn=1.5)
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""Offline end-to-end tests against the local FR24 stand-in server.
+
+Every call here goes through the real request path: curl, content decoding,
+the Cloudflare check and the feed re-roll, with ``Core`` (or one client's
+base URLs) pointed at a ``StandInServer`` on a local port instead of
+FlightRadar24.
+"""
+
+import time
+
+import pytest
+
+from FlightRadarAPI import FlightRadar24API
+from FlightRadarAPI.api import FEED_EMPTY_RETRIES
+from FlightRadarAPI.core import Core
+from FlightRadarAPI.errors import AirportNotFoundError, CloudflareError
+from FlightRadarAPI.testing import FeedGenerator, StandInServer
+from FlightRadarAPI.timing import endpoint_name
+
+
+def _serve(**kwargs):
+    kwargs.setdefault("feed", FeedGenerator(50, seed=1))
+    return StandInServer(**kwargs)
+
+
+@pytest.mark.parametrize("encoding", ["br", "gzip", "deflate", None])
+def test_get_flights_decodes_every_encoding(encoding):
+    with _serve(encoding=encoding) as server, server.use_core():
+        flights = FlightRadar24API().get_flights()
+
+    assert len(flights) == 50
+    assert sorted(flight.id for flight in flights) == sorted(server.feed.flight_ids)
+
+
+def test_feed_keeps_its_backend_while_it_answers():
+    with _serve() as server, server.use_core():
+        api = FlightRadar24API()
+        api.get_flights()
+        api.get_flights()
+
+    assert server.requests["/zones/fcgi/feed.js"] == 2
+    assert sum(server.pinned.values()) == 1
+
+
+def test_empty_backend_is_dropped_and_rerolled():
+    with _serve(backends=2, empty_backends=2) as server, server.use_core():
+        flights = FlightRadar24API().get_flights()
+
+    assert flights == []
+    assert server.requests["/zones/fcgi/feed.js"] == FEED_EMPTY_RETRIES + 1
+    # Every retry went out without the AWSALB cookie, so each was pinned anew.
+    assert sum(server.pinned.values()) == FEED_EMPTY_RETRIES + 1
+
+
+def test_flight_details_and_unknown_flight():
+    with _serve() as server, server.use_core():
+        api = FlightRadar24API()
+        flight = api.get_flights()[0]
+        flight.set_flight_details(api.get_flight_details(flight))
+
+    assert flight.origin_airport_name != "N/A"
+    assert server.statuses[200] == 2
+
+
+def test_airport_airports_and_airlines():
+    with _serve() as server, server.use_core():
+        api = FlightRadar24API()
+        airport = api.get_airport("GRU", details=True)
+        airports = api.get_airports()
+        airlines = api.get_airlines()
+
+        with pytest.raises(AirportNotFoundError):
+            api.get_airport("ZZZ", details=True)
+
+    assert airport.icao == "SBGR"
+    assert len(airports) == 12
+    assert len(airlines) == 10
+    assert all(airline["ICAO"] for airline in airlines)
+
+
+@pytest.mark.parametrize("rates", [{"cloudflare_rate": 1.0}, {"origin_error_rate": 1.0}])
+def test_injected_faults_raise_cloudflare_error(rates):
+    with _serve(**rates) as server, server.use_core():
+        with pytest.raises(CloudflareError):
+            FlightRadar24API().get_flights()
+
+    assert set(server.statuses) == {403 if "cloudflare_rate" in rates else 520}
+
+
+def test_latency_is_applied():
+    with _serve(latency=0.05) as server, server.use_core():
+        start = time.perf_counter()
+        FlightRadar24API().get_flights()
+
+    assert time.perf_counter() - start >= 0.05
+
+
+def test_use_core_restores_the_base_urls():
+    feed_url = Core.real_time_flight_tracker_data_url
+    api_url = Core.api_airport_data_url
+
+    with _serve() as server, server.use_core():
+        assert Core.real_time_flight_tracker_data_url == server.url + "/zones/fcgi/feed.js"
+        assert Core.api_airport_data_url == server.url + "/common/v1/airport.json"
+
+    assert Core.real_time_flight_tracker_data_url == feed_url
+    assert Core.api_airport_data_url == api_url
+
+
+def test_set_base_urls_rejects_unknown_names():
+    with pytest.raises(ValueError, match="feed_base_url"):
+        Core.set_base_urls(feed_base_url="http://127.0.0.1")
+
+
+def test_a_client_can_have_its_own_base_urls():
+    feed_url = Core.real_time_flight_tracker_data_url
+
+    with _serve(feed=FeedGenerator(5, seed=1)) as server:
+        api = FlightRadar24API(base_urls=server.base_urls)
+        flights = api.get_flights()
+        details = api.get_flight_details(flights[0])
+
+        # Core is left as it is, for every other client.
+        assert Core.real_time_flight_tracker_data_url == feed_url
+        assert endpoint_name(server.url + "/zones/fcgi/feed.js?bounds=1") == "real_time_flight_tracker_data"
+
+    assert sorted(flight.id for flight in flights) == sorted(server.feed.flight_ids)
+    assert details["identification"]["id"] == flights[0].id
+
+    with pytest.raises(ValueError, match="feed_base_url"):
+        Core.with_base_urls(feed_base_url="http://127.0.0.1")
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        StandInServer(encoding="compress")
+
+    with pytest.raises(ValueError):
+        StandInServer(backends=2, empty_backends=3)
+
+    with pytest.raises(ValueError):
+        StandInServer(cloudflare_rate=0.6, origin_error_rate=0.6)
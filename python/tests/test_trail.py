@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""Offline tests for the compact trail type.
+
+``Trail`` stands in for the clickhandler's list of point dicts, so the tests
+here pin down that it reads back exactly what it was given, in the same order,
+and that the storage encoding round-trips.
+"""
+
+import pytest
+
+from FlightRadarAPI import Flight, Trail, simplify_trail, simplify_trails
+
+from test_feed_retry import FLIGHT_ROW
+
+# Newest first, as the clickhandler sends it.
+POINTS = [
+    {"lat": -22.81234, "lng": -43.25012, "alt": 1500, "spd": 180, "ts": 1700000300, "hd": 95},
+    {"lat": -22.90001, "lng": -43.40021, "alt": 800, "spd": 160, "ts": 1700000200, "hd": 92},
+    {"lat": -23.00123, "lng": -43.55678, "alt": 0, "spd": 12, "ts": 1700000100, "hd": 90},
+]
+
+
+def test_trail_reads_back_points_in_feed_order():
+    trail = Trail(POINTS)
+    assert len(trail) == 3
+    assert list(trail) == POINTS
+    assert trail[0] == POINTS[0]
+    assert trail[-1] == POINTS[-1]
+
+
+def test_trail_accepts_oldest_first_input():
+    assert list(Trail(list(reversed(POINTS)))) == POINTS
+
+
+def test_trail_slice_keeps_order():
+    assert list(Trail(POINTS)[1:]) == POINTS[1:]
+
+
+def test_trail_index_out_of_range_raises():
+    with pytest.raises(IndexError):
+        Trail(POINTS)[3]
+
+
+def test_trail_drops_points_without_position_and_zero_fills():
+    trail = Trail([{"lat": 1.0, "lng": 2.0, "ts": 5}, {"lat": None, "lng": 2.0, "ts": 4}])
+    assert list(trail) == [{"lat": 1.0, "lng": 2.0, "alt": 0, "spd": 0, "ts": 5, "hd": 0}]
+
+
+def test_trail_is_smaller_than_point_dicts():
+    assert Trail(POINTS).nbytes == 36 * len(POINTS)
+
+
+def test_trail_column_is_newest_first():
+    assert list(Trail(POINTS).column("ts")) == [1700000300, 1700000200, 1700000100]
+
+    with pytest.raises(KeyError):
+        Trail(POINTS).column("speed")
+
+
+def test_trail_encoding_round_trips():
+    trail = Trail(POINTS)
+    assert Trail.decode(trail.encode()) == trail
+
+
+def test_trail_encoding_rounds_coordinates_to_precision():
+    decoded = Trail.decode(Trail(POINTS).encode(precision=2))
+    assert decoded[0]["lat"] == -22.81
+    assert decoded[0]["ts"] == 1700000300
+
+
+def test_trail_encoding_is_compact():
+    # Deltas between neighbouring points take a few bytes, not eight.
+    trail = Trail([
+        {
+            "lat": round(10 + i * 0.001, 5), "lng": round(20 + i * 0.001, 5),
+            "alt": 30000, "spd": 450, "ts": 1700000000 + i * 10, "hd": 90,
+        }
+        for i in range(500)
+    ])
+    assert len(trail.encode()) < trail.nbytes / 4
+    assert Trail.decode(trail.encode()) == trail
+
+
+def test_trail_decode_rejects_foreign_bytes():
+    with pytest.raises(ValueError):
+        Trail.decode(b"not a trail")
+
+    with pytest.raises(ValueError):
+        Trail.decode(Trail(POINTS).encode()[:-1])
+
+
+def test_trail_to_numpy_is_newest_first():
+    pytest.importorskip("numpy")
+    array = Trail(POINTS).to_numpy()
+    assert list(array["ts"]) == [1700000300, 1700000200, 1700000100]
+    assert array["lat"][0] == POINTS[0]["lat"]
+
+
+def test_flight_compact_trail_replaces_the_list():
+    flight = Flight("3f6a31cd", FLIGHT_ROW)
+    flight.set_flight_details({"trail": POINTS})
+    trail = flight.compact_trail()
+    assert flight.trail is trail
+    assert list(trail) == POINTS
+    assert flight.compact_trail() is trail
+
+
+def test_trail_merge_appends_only_newer_points():
+    trail = Trail(POINTS[1:])
+    newer = {"lat": -22.7, "lng": -43.1, "alt": 2500, "spd": 200, "ts": 1700000400, "hd": 96}
+
+    assert trail.merge([newer] + POINTS) == 2
+    assert list(trail) == [newer] + POINTS
+
+
+def test_trail_merge_of_a_repeated_fetch_adds_nothing():
+    trail = Trail(POINTS)
+    assert trail.merge(POINTS) == 0
+    assert list(trail) == POINTS
+
+
+def test_trail_merge_skips_repeated_timestamps_and_accepts_either_order():
+    trail = Trail()
+    assert trail.merge(list(reversed(POINTS)) + [POINTS[0]]) == 3
+    assert list(trail) == POINTS
+
+
+def test_flight_merge_flight_details_grows_one_trail():
+    flight = Flight("3f6a31cd", FLIGHT_ROW)
+    assert flight.merge_flight_details({"trail": POINTS[1:], "status": {"text": "Scheduled"}}) == 2
+    trail = flight.trail
+
+    assert flight.merge_flight_details({"trail": POINTS, "status": {"text": "Landed"}}) == 1
+    assert flight.trail is trail
+    assert list(flight.trail) == POINTS
+    assert flight.status_text == "Landed"
+
+
+# --- simplify_trail ---
+
+def _line_with_corner():
+    """Newest first: east along the equator, then north, about 1.1 km a step."""
+    points = [{"lat": 0.0, "lng": i * 0.01, "alt": i, "spd": 400, "ts": 1700000000 + i, "hd": 90} for i in range(50)]
+    points += [{"lat": i * 0.01, "lng": 0.49, "alt": 50 + i, "spd": 400, "ts": 1700000049 + i, "hd": 0} for i in range(1, 50)]
+    return points[::-1]
+
+
+@pytest.fixture(params=["numpy", "pure"])
+def numpy_mode(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr("FlightRadarAPI.trail._numpy", lambda: None)
+    return request.param
+
+
+@pytest.mark.parametrize("method", ["douglas-peucker", "visvalingam"])
+def test_simplify_trail_keeps_only_the_corner(numpy_mode, method):
+    points = _line_with_corner()
+    simplified = simplify_trail(points, tolerance=10, method=method)
+
+    assert simplified == [points[0], points[49], points[-1]]
+    # Retained points come back whole, altitude and timestamp included.
+    assert simplified[1] is points[49]
+
+
+def test_simplify_trail_keeps_points_beyond_tolerance(numpy_mode):
+    points = _line_with_corner()
+    points[20] = dict(points[20], lng=0.4905)  # About 55 m off the line.
+
+    assert points[20] in simplify_trail(points, tolerance=10)
+    assert points[20] not in simplify_trail(points, tolerance=100)
+
+
+def test_simplify_trail_returns_a_trail_for_a_trail(numpy_mode):
+    points = _line_with_corner()
+    simplified = simplify_trail(Trail(points), tolerance=10)
+
+    assert isinstance(simplified, Trail)
+    assert list(simplified) == [points[0], points[49], points[-1]]
+
+
+def test_simplify_trail_handles_the_antimeridian(numpy_mode):
+    points = [{"lat": 10.0, "lng": lng, "ts": i} for i, lng in enumerate([179.98, 179.99, -180.0, -179.99])]
+    assert simplify_trail(points, tolerance=10) == [points[0], points[-1]]
+
+
+def test_simplify_trails_matches_one_at_a_time(numpy_mode):
+    first, second = _line_with_corner(), POINTS
+    assert simplify_trails([first, second, []], tolerance=10) == [
+        simplify_trail(first, tolerance=10), simplify_trail(second, tolerance=10), [],
+    ]
+
+
+def test_simplify_trail_rejects_bad_arguments():
+    with pytest.raises(ValueError):
+        simplify_trail(POINTS, tolerance=-1)
+
+    with pytest.raises(ValueError):
+        simplify_trail(POINTS, tolerance=10, method="ramer")
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Offline tests for connection warm-up and reuse (``warm_up``, keep-alive pings).
+
+A request on a connection already open reports a connect time of 0, so the
+tests read reuse off the RequestTiming of the first request after a warm-up.
+"""
+
+import socket
+import threading
+import time
+
+import pytest
+
+from FlightRadarAPI import FlightRadar24API
+from FlightRadarAPI.core import Core
+from FlightRadarAPI.request import APIClient
+from FlightRadarAPI.testing import FeedGenerator, StandInServer
+
+
+def _closed_port_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def test_first_calls_find_their_connections_open():
+    timings = []
+
+    with StandInServer(FeedGenerator(5, seed=7)) as server, server.use_core():
+        api = FlightRadar24API(max_workers=3)
+        warmed = api.warm_up()
+        heads, base_url = server.requests["/"], server.url
+
+        api.add_request_hook(timings.append)
+        flight = api.get_flights()[0]
+        api.get_flight_details(flight)
+
+    assert set(warmed) == {base_url + "/"}
+    assert heads == 2 + 3  # data-cloud and www, then data-live once per session.
+    assert [timing.connect for timing in timings] == [0.0, 0.0]
+
+
+def test_standalone_requests_reuse_connections():
+    timings = []
+
+    with StandInServer(FeedGenerator(5, seed=7)) as server, server.use_core():
+        client = APIClient()
+        client.add_hook(timings.append)
+        flight_ids = server.feed.flight_ids
+
+        for flight_id in flight_ids[:3]:
+            client.request_standalone(Core.flight_data_url.format(flight_id))
+
+    assert timings[0].connect > 0
+    assert [timing.connect for timing in timings[1:]] == [0.0, 0.0]
+
+
+def test_a_host_that_cannot_be_reached_is_left_out(caplog):
+    url = _closed_port_url()
+    warmed = APIClient().warm_up([url], standalone_urls=[url], sessions=2, timeout=2)
+
+    assert warmed == {}
+    assert "Could not warm up" in caplog.text
+
+
+def test_keep_alive_pings_until_stopped():
+    client = APIClient()
+
+    with pytest.raises(ValueError):
+        client.start_keep_alive(0)
+
+    client.start_keep_alive(0.01)
+    time.sleep(0.05)
+    assert any(thread.name == "FlightRadarAPI-keep-alive" for thread in threading.enumerate())
+
+    client.stop_keep_alive()
+    assert not any(thread.name == "FlightRadarAPI-keep-alive" for thread in threading.enumerate())